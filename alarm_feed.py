@@ -0,0 +1,176 @@
+# 알림 변경 피드
+# alarm 테이블 트리거가 보내는 NOTIFY(채널 'alarm_change', 페이로드 '작업:알림 ID')를 받아
+# 메모리의 알림 색인(AlarmIndex)과 지표 엔진(IndicatorEngine)에 바뀐 알림만 반영
+# 작업: 'I' (INSERT), 'U' (UPDATE), 'D' (DELETE)
+import sys
+import asyncio
+import threading
+
+from detector import AlarmRule
+from indicator import add_alarm_or_skip
+from pg_listener import NotificationListener
+
+
+ALARM_CHANGE_CHANNEL = 'alarm_change'
+
+# 변경 사항 조회에 실패했을 때 다시 시도하기 전 대기 시간 (초, 실패할 때마다 두 배로 늘려 최대 MAX_RETRY_DELAY까지)
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+
+# 두 알림의 감지 조건이 같은지 확인 (같으면 지표 상태를 초기화하지 않도록 다시 등록하지 않음)
+def is_same_alarm(alarm: AlarmRule, other: AlarmRule) -> bool:
+    return (
+        alarm.channel_id == other.channel_id and
+        alarm.get_market() == other.get_market() and
+        alarm.condition == other.condition
+    )
+
+
+class AlarmChangeFeed:
+    def __init__(self, database, database_url: str):
+        self.database = database
+
+        self.pending = {}           # 알림 ID -> 마지막 작업
+        self.needs_resync = False   # LISTEN을 (다시) 시작하기 전의 변경은 받지 못했으므로 전체를 다시 맞춰야 함
+        self.lock = threading.Lock()
+
+        self.loop = None
+        self.event = None
+
+        self.listener = NotificationListener(
+            database_url, [ALARM_CHANGE_CHANNEL], self.on_notification, on_listen=self.on_listen
+        )
+
+    
+    # 리스너 스레드에서 호출됨
+    def on_notification(self, channel: str, payload: str):
+        operation, _, alarm_id = payload.partition(':')
+
+        with self.lock:
+            self.pending[int(alarm_id)] = operation
+
+        self.wake_up()
+
+    
+    # 리스너 스레드에서 호출됨
+    def on_listen(self):
+        with self.lock:
+            self.needs_resync = True
+
+        self.wake_up()
+
+    
+    def wake_up(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+    
+    # 쌓인 변경 사항을 꺼냄: (전체 동기화 필요 여부, 변경된 알림 ID 집합, 삭제된 알림 ID 집합)
+    def take_changes(self) -> tuple:
+        with self.lock:
+            needs_resync, pending = self.needs_resync, self.pending
+            self.needs_resync, self.pending = False, {}
+
+        changed_ids = {alarm_id for alarm_id, operation in pending.items() if operation != 'D'}
+        deleted_ids = {alarm_id for alarm_id, operation in pending.items() if operation == 'D'}
+
+        return needs_resync, changed_ids, deleted_ids
+
+    
+    # 쌓인 변경 사항을 꺼내 바뀐 알림을 데이터베이스에서 조회
+    # 반환: (전체 동기화 여부, 알림 ID -> 활성화된 AlarmRule, 제거할 알림 ID 집합)
+    # 전체 동기화인 경우 활성화된 알림 전체를 반환하며, 제거할 알림은 apply_changes에서 정함
+    def fetch_changes(self) -> tuple:
+        needs_resync, changed_ids, deleted_ids = self.take_changes()
+
+        if needs_resync:
+            rows = self.database.iter_alarms(is_enabled=True)
+
+            return True, {alarm.alarm_id: alarm for alarm in map(AlarmRule.from_row, rows)}, set()
+
+        if len(changed_ids) == 0:
+            return False, {}, deleted_ids
+
+        rows = self.database.select_alarms_in(list(changed_ids)).values()
+        enabled_alarms = {row['alarm_id']: AlarmRule.from_row(row) for row in rows if row['is_enabled']}
+
+        # 비활성화되었거나 그 사이 삭제된 알림은 색인에서 제거
+        return False, enabled_alarms, deleted_ids | (changed_ids - set(enabled_alarms.keys()))
+
+    
+    # 조회한 변경 사항을 알림 색인과 지표 엔진에 반영하고, 감시 종목이 바뀌었는지 반환
+    # indicator_engine: add_alarm/remove_alarm을 가진 객체 (IndicatorEngine 또는 ShardedDetector)
+    def apply_changes(self, alarm_index, indicator_engine, needs_resync: bool, enabled_alarms: dict, deleted_ids: set) -> bool:
+        if needs_resync:
+            deleted_ids = set(alarm_index.alarms.keys()) - set(enabled_alarms.keys())
+
+        markets = alarm_index.get_markets()
+
+        for alarm_id in deleted_ids:
+            alarm_index.remove(alarm_id)
+            if indicator_engine is not None:
+                indicator_engine.remove_alarm(alarm_id)
+
+        for alarm_id, alarm in enabled_alarms.items():
+            current_alarm = alarm_index.alarms.get(alarm_id)
+            if current_alarm is not None and is_same_alarm(current_alarm, alarm):
+                continue
+
+            if alarm_index.add(alarm) and indicator_engine is not None:
+                try:
+                    add_alarm_or_skip(indicator_engine, alarm)
+
+                # 다시 시도할 때 이미 반영된 알림으로 보고 건너뛰지 않도록 색인에서도 제거
+                except Exception:
+                    alarm_index.remove(alarm_id)
+                    raise
+
+        return alarm_index.get_markets() != markets
+
+    
+    # 쌓인 변경 사항을 바로 반영
+    def apply(self, alarm_index, indicator_engine=None) -> bool:
+        return self.apply_changes(alarm_index, indicator_engine, *self.fetch_changes())
+
+    
+    # 변경 알림이 올 때마다 반영 (감시 종목이 바뀌면 on_markets_changed 호출)
+    async def watch(self, alarm_index, indicator_engine=None, on_markets_changed=None):
+        self.event = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+        # watch 시작 전에 쌓인 변경 사항도 반영
+        self.event.set()
+
+        retry_delay = RETRY_DELAY
+        while True:
+            await self.event.wait()
+            self.event.clear()
+
+            # 데이터베이스 조회는 이벤트 루프를 막지 않도록 별도 스레드에서 하고,
+            # 색인 변경은 체결 처리와 섞이지 않도록 이벤트 루프에서 함
+            try:
+                changes = await asyncio.to_thread(self.fetch_changes)
+                is_markets_changed = self.apply_changes(alarm_index, indicator_engine, *changes)
+
+            # 조회나 반영에 실패하면 꺼낸 변경 사항을 잃었거나 일부만 반영했으므로 전체를 다시 맞추도록 하고 잠시 후 다시 시도
+            except Exception as e:
+                print(f"alarm feed: failed to apply changes ({e!r}), retrying in {retry_delay:g}s", file=sys.stderr)
+
+                with self.lock:
+                    self.needs_resync = True
+
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+
+                self.event.set()
+                continue
+
+            retry_delay = RETRY_DELAY
+
+            if is_markets_changed and on_markets_changed is not None:
+                on_markets_changed()
+
+    
+    def stop(self):
+        self.listener.stop()
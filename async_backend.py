@@ -0,0 +1,115 @@
+# 비동기 백엔드 서버 (ASGI)
+# backend.py와 같은 라우트 표(routes.py)를 등록하며, 데이터베이스/거래소/텔레그램 요청을 모두 비동기로 처리
+# 실행: hypercorn async_backend:app --bind 0.0.0.0:5000
+from telebot import asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
+
+from quart import Quart, Response, request
+from quart_cors import cors
+
+from async_database import AsyncDatabase
+from async_exchange import create_async_session, get_async_exchange
+from config import tokens
+from serializer import JSON_CONTENT_TYPE, compress
+from routes import ROUTES, RouteRequest, run_route_async
+
+
+app = cors(Quart(__name__))
+
+database = AsyncDatabase(tokens['database_url'], listen_invalidations=True)
+
+http_session = None
+bot = None
+bot_token = None
+
+
+# 이벤트 루프가 시작된 뒤 커넥션 풀, HTTP 세션 생성
+@app.before_serving
+async def startup():
+    global http_session
+
+    await database.connect()
+    http_session = create_async_session()
+
+
+# 텔레그램 봇 반환 (telegram_client.get_bot처럼 토큰 파일의 봇 토큰이 바뀌면 다시 만듦)
+# 봇의 aiohttp 세션은 telebot이 모든 봇에 공유하므로 이전 봇을 닫지 않음
+def get_bot() -> AsyncTeleBot:
+    global bot, bot_token
+
+    token = tokens['telegram_token']
+    if bot is None or token != bot_token:
+        bot = AsyncTeleBot(token)
+        bot_token = token
+
+    return bot
+
+
+@app.after_serving
+async def shutdown():
+    await database.close()
+
+    if http_session is not None:
+        await http_session.close()
+
+    # 텔레그램 요청을 한 번도 보내지 않았으면 telebot의 세션이 없음 (AsyncTeleBot.close_session이 실패)
+    bot_session = asyncio_helper.session_manager.session
+    if bot_session is not None and not bot_session.closed:
+        await bot_session.close()
+
+
+# 처리기가 요청한 서비스 객체 반환
+def resolve(service):
+    if service == 'database':
+        return database
+
+    if service == 'bot':
+        return get_bot()
+
+    _, exchange_id = service
+
+    return get_async_exchange(exchange_id, http_session)
+
+
+# 공유 라우트 처리기를 실행하는 쿼트 뷰 함수 생성
+def make_view(handler):
+    async def view(**params):
+        route_request = RouteRequest(
+            args=request.args,
+            data=await request.get_data(),
+            if_none_match=request.if_none_match,
+            accept_encoding=request.headers.get('Accept-Encoding', '')
+        )
+
+        body, status, mimetype, headers = await run_route_async(handler, route_request, resolve, **params)
+
+        return Response(body, status=status, mimetype=mimetype, headers=headers)
+
+    return view
+
+
+for rule, methods, handler in ROUTES:
+    app.add_url_rule(rule, handler.__name__, make_view(handler), methods=methods)
+
+
+# 큰 JSON 응답은 클라이언트가 받을 수 있는 방식(brotli, gzip)으로 압축
+@app.after_request
+async def compress_response(response: Response):
+    if response.status_code != 200 or response.mimetype != JSON_CONTENT_TYPE:
+        return response
+
+    if 'Content-Encoding' in response.headers:
+        return response
+
+    body, encoding = compress(await response.get_data(), request.headers.get('Accept-Encoding', ''))
+    if encoding is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+
+    response.vary.add('Accept-Encoding')
+
+    return response
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,399 @@
+# 비동기 데이터베이스 API (asyncpg)
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import asyncpg
+
+from database import QueryBuilder, ResultSet, EXISTENCE_CACHE_TTL, INVALIDATION_CHANNEL, VERSION_CHANNEL, apply_notification
+from existence_cache import ExistenceCache
+from response_cache import ResourceVersions
+
+
+# 리소스 버전 변경 알림 커넥션이 끊어졌을 때 다시 연결하기 전 대기 시간 (초)
+RECONNECT_DELAY = 1.0
+
+# 다중 행 INSERT문 하나에 넣는 최대 행 수 (바인딩 값 개수 제한 65535를 넘지 않도록 나누어 실행)
+INSERT_PAGE_SIZE = 1000
+
+
+class AsyncDatabase(QueryBuilder):
+    # existence_cache_ttl: 존재 여부 캐시 유효 시간 (초, None이면 만료되지 않음)
+    # listen_invalidations: True이면 다른 프로세스와 LISTEN/NOTIFY로 존재 여부 캐시 무효화와 리소스 버전 변경을 주고받음
+    #                       (동기 Database와 같은 채널과 페이로드를 사용하므로 두 API를 쓰는 프로세스가 섞여 있어도 됨)
+    def __init__(self, database_url: str, debug=False, min_connections: int = 1, max_connections: int = 10,
+                 existence_cache_ttl: float = EXISTENCE_CACHE_TTL, listen_invalidations: bool = False):
+        self.database_url = database_url
+        self.debug = debug
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.listen_invalidations = listen_invalidations
+
+        self.pool = None
+        self.listener_task = None
+
+        # 현재 태스크에서 진행 중인 트랜잭션의 커넥션과 커밋 후 실행할 함수 목록
+        self.transaction_conn = ContextVar('transaction_conn', default=None)
+        self.after_commit = ContextVar('after_commit', default=None)
+
+        self.existence_cache = ExistenceCache(existence_cache_ttl)
+        self.resource_versions = ResourceVersions()
+
+    
+    # JSON 컬럼을 딕셔너리로 주고받도록 커넥션마다 코덱 등록
+    @staticmethod
+    async def init_connection(conn: asyncpg.Connection):
+        for type_name in ('json', 'jsonb'):
+            await conn.set_type_codec(
+                type_name,
+                encoder=json.dumps,
+                decoder=json.loads,
+                schema='pg_catalog'
+            )
+
+    
+    # 커넥션 풀 생성 (이벤트 루프 안에서 호출해야 함)
+    async def connect(self):
+        self.pool = await asyncpg.create_pool(
+            self.database_url,
+            min_size=self.min_connections,
+            max_size=self.max_connections,
+            init=self.init_connection
+        )
+
+        if self.listen_invalidations:
+            is_listening = asyncio.Event()
+            self.listener_task = asyncio.create_task(self.listen_invalidation(is_listening))
+            await is_listening.wait()
+
+    
+    # 별도 커넥션으로 존재 여부 캐시 무효화와 리소스 버전 변경 알림을 받음 (연결이 끊어지면 다시 연결)
+    # 연결이 끊긴 동안의 변경은 받지 못하므로 LISTEN을 (다시) 시작할 때마다 모든 ETag를 무효화
+    async def listen_invalidation(self, is_listening: asyncio.Event):
+        def on_notification(conn, pid, channel, payload):
+            self.on_invalidation(channel, payload)
+
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.database_url)
+
+                is_terminated = asyncio.Event()
+                conn.add_termination_listener(lambda _: is_terminated.set())
+                await conn.add_listener(INVALIDATION_CHANNEL, on_notification)
+                await conn.add_listener(VERSION_CHANNEL, on_notification)
+
+                self.resource_versions.renew_epoch()
+                is_listening.set()
+
+                await is_terminated.wait()
+
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                pass
+
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+            # 처음 연결에 실패해도 서비스 시작을 막지 않음
+            is_listening.set()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    
+    async def close(self):
+        if self.listener_task is not None:
+            self.listener_task.cancel()
+
+            try:
+                await self.listener_task
+
+            except asyncio.CancelledError:
+                pass
+
+        await self.pool.close()
+
+    
+    # 풀에서 커넥션을 빌려오고 사용이 끝나면 반납
+    # 현재 태스크에서 트랜잭션이 진행 중이면 트랜잭션의 커넥션을 사용
+    @asynccontextmanager
+    async def connection(self):
+        transaction_conn = self.transaction_conn.get()
+        if transaction_conn is not None:
+            yield transaction_conn
+            return
+
+        async with self.pool.acquire() as conn:
+            yield conn
+
+    
+    # 블록 안에서 실행되는 현재 태스크의 모든 쿼리문을 하나의 트랜잭션으로 묶음
+    # 예외가 발생하면 롤백되며, 이미 트랜잭션 안이라면 바깥 트랜잭션에 합쳐짐
+    @asynccontextmanager
+    async def transaction(self):
+        transaction_conn = self.transaction_conn.get()
+        if transaction_conn is not None:
+            yield transaction_conn
+            return
+
+        after_commit = []
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                token = self.transaction_conn.set(conn)
+                after_commit_token = self.after_commit.set(after_commit)
+                try:
+                    yield conn
+
+                finally:
+                    self.transaction_conn.reset(token)
+                    self.after_commit.reset(after_commit_token)
+
+        # 커밋된 변경 사항만 반영
+        for callback in after_commit:
+            callback()
+
+    
+    # 트랜잭션 안이라면 커밋된 뒤에, 아니라면 바로 callback을 실행
+    def on_commit(self, callback):
+        after_commit = self.after_commit.get()
+        if after_commit is not None:
+            after_commit.append(callback)
+
+        else:
+            callback()
+
+    
+    # 리소스 버전을 올림 (트랜잭션 안이라면 커밋된 뒤에 반영)
+    # scope가 None이면 테이블 전체
+    async def bump_version(self, table_name: str, scope=None):
+        self.on_commit(lambda: self.resource_versions.bump(table_name, scope))
+
+        # 트랜잭션 안에서 보낸 알림은 커밋될 때 전달됨
+        if self.listen_invalidations:
+            payload = self.resource_versions.to_payload(table_name, scope)
+            await self.execute("SELECT pg_notify($1, $2)", (VERSION_CHANNEL, payload))
+
+    
+    # 리소스의 현재 버전 (ETag 값) 반환
+    def get_version(self, table_name: str, scope=None) -> str:
+        return self.resource_versions.get(table_name, scope)
+
+    
+    # 존재 여부 캐시 무효화 (primary_key가 None이면 테이블 전체)
+    async def invalidate_existence(self, table_name: str, primary_key=None):
+        self.existence_cache.invalidate(table_name, primary_key)
+        self.on_commit(lambda: self.existence_cache.invalidate(table_name, primary_key))
+        await self.publish_invalidation(table_name, primary_key)
+
+    
+    # 다른 프로세스에 존재 여부 캐시 무효화를 알림 (페이로드: '테이블' 또는 '테이블:기본 키')
+    # 트랜잭션 안에서 보낸 알림은 커밋될 때 전달됨
+    async def publish_invalidation(self, table_name: str, primary_key=None):
+        if not self.listen_invalidations:
+            return
+
+        payload = table_name if primary_key is None else f"{table_name}:{primary_key}"
+        await self.execute("SELECT pg_notify($1, $2)", (INVALIDATION_CHANNEL, payload))
+
+    
+    # 다른 프로세스(또는 이 프로세스)에서 보낸 존재 여부 캐시 무효화 / 리소스 버전 변경 알림 처리
+    def on_invalidation(self, channel: str, payload: str):
+        apply_notification(self.existence_cache, self.resource_versions, channel, payload)
+
+    
+    # 쿼리문을 실행
+    # conn.fetch는 쿼리문별 prepared statement를 커넥션마다 캐시해 재사용함
+    # (conn.prepare는 캐시를 거치지 않고 매번 준비하므로 사용하지 않음)
+    async def execute(self, query: str, params: tuple = ()) -> ResultSet:
+        if self.debug:
+            print("================")
+            print(f"Query: {query}")
+            print(f"Params: {params}")
+
+        async with self.connection() as conn:
+            records = await conn.fetch(query, *params)
+
+        if len(records) == 0:
+            return ResultSet([], [])
+
+        result_set = ResultSet(list(records[0].keys()), records)
+        if self.debug:
+            print(result_set)
+
+        return result_set   # 결과 집합 반환
+
+    
+    # SELECT문 실행
+    async def select(self, table_name: str, **kwargs) -> ResultSet:
+        return await self.execute(*self.build_select_query(table_name, **kwargs))
+
+    
+    # 알림 정보와 해당 알림의 알림 규칙을 JOIN하여 한 번의 쿼리로 조회
+    async def select_alarms(self, **kwargs) -> ResultSet:
+        return await self.execute(*self.build_select_alarms_query(**kwargs))
+
+    
+    # 알림 ID 목록에 해당하는 알림 정보를 알림 규칙과 JOIN하여 한 번의 쿼리로 조회
+    async def select_alarms_in(self, alarm_ids: list) -> ResultSet:
+        return await self.execute(*self.build_select_alarms_in_query(alarm_ids))
+
+    
+    # 알림 규칙 종류와 내용으로 알림 조회
+    async def select_alarms_by_condition(self, kind: str, condition_params: dict = None, **kwargs) -> ResultSet:
+        return await self.execute(*self.build_select_alarms_by_condition_query(kind, condition_params, **kwargs))
+
+    
+    # INSERT문 실행
+    async def insert(self, table_name: str, **kwargs) -> int:
+        result_set = await self.execute(*self.build_insert_query(table_name, **kwargs))
+        primary_key = result_set.to_list()[0][0]
+
+        self.on_commit(lambda: self.existence_cache.set(table_name, primary_key, True))
+        await self.publish_invalidation(table_name, primary_key)
+        await self.bump_version(table_name, kwargs.get(self.version_scopes.get(table_name)))
+
+        return primary_key
+
+    
+    # 알림 규칙 INSERT문 실행 (내용이 같은 알림 규칙은 공유)
+    # 이미 있는 알림 규칙이면 기존 알림 규칙의 ID를 조회해 반환
+    async def insert_condition(self, condition: dict) -> int:
+        query, values = self.build_insert_condition_query(condition)
+
+        result_set = await self.execute(query, values)
+        if len(result_set.to_list()) > 0:
+            return result_set.to_list()[0][0]
+
+        result_set = await self.execute(*self.build_select_condition_ids_query([values[-1]]))
+
+        return result_set.to_list()[0][1]
+
+    
+    # 한 채널에 여러 알림을 한 트랜잭션으로 등록하고 등록된 알림 ID 목록을 반환
+    # alarm_list의 각 요소: {'exchange_id', 'base_symbol', 'quote_symbol', 'condition', ('is_enabled')}
+    # 알림 규칙과 알림을 각각 다중 행 INSERT ... RETURNING으로 삽입 (INSERT_PAGE_SIZE개씩)
+    async def insert_alarms(self, channel_id: int, alarm_list: list) -> list:
+        if len(alarm_list) == 0:
+            return []
+
+        condition_values, alarm_hashes = self.collect_condition_values(alarm_list)
+        condition_values_list = list(condition_values.values())
+
+        alarm_ids = []
+        async with self.transaction():
+            condition_ids = {}
+            for start in range(0, len(condition_values_list), INSERT_PAGE_SIZE):
+                query, params = self.build_insert_conditions_query(condition_values_list[start:start + INSERT_PAGE_SIZE])
+                for condition_hash, condition_id in (await self.execute(query, params)).to_list():
+                    condition_ids[condition_hash] = condition_id
+
+            # 이미 있던 알림 규칙은 결과 행이 없으므로 ID를 따로 조회
+            existing_hashes = [condition_hash for condition_hash in condition_values.keys() if condition_hash not in condition_ids]
+            if len(existing_hashes) > 0:
+                for condition_hash, condition_id in (await self.execute(*self.build_select_condition_ids_query(existing_hashes))).to_list():
+                    condition_ids[condition_hash] = condition_id
+
+            for start in range(0, len(alarm_list), INSERT_PAGE_SIZE):
+                query, params = self.build_insert_alarms_query(
+                    channel_id,
+                    alarm_list[start:start + INSERT_PAGE_SIZE],
+                    [condition_ids[condition_hash] for condition_hash in alarm_hashes[start:start + INSERT_PAGE_SIZE]]
+                )
+                alarm_ids += [row[0] for row in (await self.execute(query, params)).to_list()]
+
+            for alarm_id in alarm_ids:
+                self.on_commit(lambda alarm_id=alarm_id: self.existence_cache.set('alarm', alarm_id, True))
+
+            # 알림마다 알리지 않고 테이블 단위로 한 번만 알림 (알림 수만큼 쿼리문을 더 실행하지 않도록)
+            await self.publish_invalidation('alarm')
+            await self.bump_version('alarm', channel_id)
+
+        return alarm_ids
+
+    
+    # 채널의 알림을 한 번에 활성화/비활성화하고 변경된 알림 ID 목록을 반환
+    # alarm_ids가 None이면 채널의 모든 알림을 변경
+    async def update_alarms_enabled(self, channel_id: int, is_enabled: bool, alarm_ids: list = None) -> list:
+        result_set = await self.execute(*self.build_update_alarms_enabled_query(channel_id, is_enabled, alarm_ids))
+        await self.bump_version('alarm', channel_id)
+
+        return [row[0] for row in result_set.to_list()]
+
+    
+    # UPDATE문 실행
+    async def update(self, table_name: str, primary_key, **kwargs):
+        query, params = self.build_update_query(table_name, primary_key, **kwargs)
+        await self.execute_and_bump_version(table_name, query, params, kwargs)
+
+        # 기본 키가 바뀌었다면 해당 테이블의 존재 여부 캐시를 비움
+        if self.get_primary_column(table_name) in kwargs.keys():
+            await self.invalidate_existence(table_name)
+
+    
+    # DELETE문 실행
+    async def delete(self, table_name: str, **kwargs):
+        query, params = self.build_delete_query(table_name, **kwargs)
+        await self.execute_and_bump_version(table_name, query, params, kwargs)
+
+        primary_column = self.get_primary_column(table_name)
+        if list(kwargs.keys()) == [primary_column]:
+            self.on_commit(lambda: self.existence_cache.set(table_name, kwargs[primary_column], False))
+            await self.publish_invalidation(table_name, kwargs[primary_column])
+
+        else:
+            await self.invalidate_existence(table_name)
+
+        # 외래 키로 함께 삭제된 행이 있을 수 있음
+        for dependent_table in self.get_dependent_tables(table_name):
+            await self.invalidate_existence(dependent_table)
+            await self.bump_version(dependent_table)
+
+    
+    # UPDATE/DELETE문을 실행하고 바뀐 리소스의 버전을 올림
+    # 범위 컬럼이 있는 테이블은 RETURNING으로 영향받은 범위를 받아와 해당 범위의 버전만 올림
+    async def execute_and_bump_version(self, table_name: str, query: str, params: tuple, kwargs: dict):
+        scope_column = self.version_scopes.get(table_name)
+
+        # 범위 컬럼 자체가 바뀌면 이전 범위를 알 수 없으므로 테이블 전체의 버전을 올림
+        if scope_column is None or scope_column in kwargs.keys():
+            await self.execute(query, params)
+            await self.bump_version(table_name)
+            return
+
+        result_set = await self.execute(f"{query} RETURNING {scope_column}", params)
+        for scope in {row[0] for row in result_set.to_list()}:
+            await self.bump_version(table_name, scope)
+
+    
+    # 해당 열이 해당 테이블에 존재하는지 확인
+    # 기본 키로 확인하는 경우 존재 여부 캐시를 먼저 확인
+    async def is_exists(self, table_name: str, primary_key=None, **kwargs) -> bool:
+        if primary_key is not None:
+            is_exists = self.existence_cache.get(table_name, primary_key)
+            if is_exists is not None:
+                return is_exists
+
+        result_set = await self.execute(*self.build_is_exists_query(table_name, primary_key, **kwargs))
+        is_exists = bool(result_set.to_list()[0][0])
+
+        # 트랜잭션 안에서 읽은 결과는 롤백되면 틀린 값이 되므로 커밋된 뒤에 캐시
+        if primary_key is not None:
+            self.on_commit(lambda: self.existence_cache.set(table_name, primary_key, is_exists))
+
+        return is_exists
+
+    
+    async def is_exchange_exists(self, exchange_id: int) -> bool:
+        return await self.is_exists(table_name='exchange', primary_key=exchange_id)
+
+    
+    async def is_chat_exists(self, chat_id: int) -> bool:
+        return await self.is_exists(table_name='chat', primary_key=chat_id)
+
+
+    async def is_channel_exists(self, channel_id: int) -> bool:
+        return await self.is_exists(table_name='channel', primary_key=channel_id)
+
+    
+    async def is_alarm_exists(self, alarm_id: int) -> bool:
+        return await self.is_exists(table_name='alarm', primary_key=alarm_id)
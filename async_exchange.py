@@ -0,0 +1,151 @@
+# 비동기 거래소 API (aiohttp)
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from exchange import Exchange, MarketIndex, exchange_classes, MARKET_CACHE_TTL, MARKET_CACHE_STALE_TTL
+from http_client import REQUEST_TIMEOUT, HTTP_POOL_SIZE
+
+
+# aiohttp 세션 생성 (이벤트 루프 안에서 호출해야 함)
+# 응답은 자동으로 gzip 압축 해제됨
+def create_async_session(pool_size: int = HTTP_POOL_SIZE) -> aiohttp.ClientSession:
+    connect_timeout, read_timeout = REQUEST_TIMEOUT
+
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=pool_size),
+        timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout),
+        headers={'Accept-Encoding': 'gzip, deflate'}
+    )
+
+
+# MarketCache의 비동기 버전
+# 캐시가 비었거나 너무 오래된 경우 한 코루틴만 거래소에 요청하고 나머지 코루틴은 그 결과를 기다림
+class AsyncMarketCache:
+    def __init__(self, fetch, ttl: float = MARKET_CACHE_TTL, stale_ttl: float = MARKET_CACHE_STALE_TTL):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self.value = None
+        self.fetched_at = 0.0
+
+        self.fetch_lock = asyncio.Lock()
+        self.refresh_task = None
+
+    
+    def get_age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    
+    async def refresh(self):
+        value = await self.fetch()
+
+        self.value = value
+        self.fetched_at = time.monotonic()
+
+        return value
+
+    
+    # 백그라운드 태스크로 캐시 갱신
+    # 갱신에 실패하면 이전 값을 유지
+    def refresh_in_background(self):
+        if self.refresh_task is not None and not self.refresh_task.done():
+            return
+
+        async def run():
+            try:
+                async with self.fetch_lock:
+                    if self.get_age() >= self.ttl:
+                        await self.refresh()
+
+            except Exception:
+                pass
+
+        self.refresh_task = asyncio.create_task(run())
+
+    
+    # 캐시된 시장 정보 반환
+    async def get(self):
+        value, age = self.value, self.get_age()
+
+        if value is not None and age < self.ttl:
+            return value
+
+        if value is not None and age < self.ttl + self.stale_ttl:
+            self.refresh_in_background()
+
+            return value
+
+        async with self.fetch_lock:
+            # 락을 기다리는 동안 다른 코루틴이 이미 갱신했을 수 있음
+            if self.value is not None and self.get_age() < self.ttl:
+                return self.value
+
+            return await self.refresh()
+
+
+# 동기 거래소 클라이언트의 파서를 그대로 사용하는 비동기 거래소 클라이언트
+class AsyncExchange:
+    def __init__(self, exchange: Exchange, session: aiohttp.ClientSession):
+        self.exchange = exchange
+        self.session = session
+
+        self.market_cache = AsyncMarketCache(
+            self.fetch_market_index,
+            ttl=exchange.market_cache_ttl,
+            stale_ttl=exchange.market_cache_stale_ttl
+        )
+
+    
+    # 거래소에 종목 정보를 요청해 시장 정보 색인을 만듦
+    # 수 MB에 달하는 응답의 파싱은 이벤트 루프를 막지 않도록 별도 스레드에서 수행
+    async def fetch_market_index(self) -> MarketIndex:
+        url = f"{self.exchange.domain}{self.exchange.item_info_endpoint}"
+
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            body = await response.read()
+
+        def parse():
+            item_info_iter = self.exchange.__item_iter__(json.loads(body))
+
+            return MarketIndex(self.exchange.parse_markets(item_info_iter))
+
+        return await asyncio.to_thread(parse)
+
+    
+    async def get_markets(self) -> MarketIndex:
+        return await self.market_cache.get()
+
+    
+    async def get_currencies(self):
+        return (await self.get_markets()).get_currencies()
+
+    
+    async def get_items(self, base_symbol=None, quote_symbol=None):
+        return (await self.get_markets()).get_items(base_symbol=base_symbol, quote_symbol=quote_symbol)
+
+    
+    async def search_currencies(self, query: str, limit: int = 20):
+        return (await self.get_markets()).search_currencies(query, limit)
+
+    
+    async def search_items(self, query: str, quote_symbol=None, limit: int = 20):
+        return (await self.get_markets()).search_items(query, quote_symbol=quote_symbol, limit=limit)
+
+
+# 거래소 ID -> 비동기 거래소 클라이언트
+async_exchanges = {}
+
+
+def get_async_exchange(exchange_id: int, session: aiohttp.ClientSession):
+    if exchange_id not in exchange_classes:
+        return None
+
+    if exchange_id not in async_exchanges:
+        async_exchanges[exchange_id] = AsyncExchange(exchange_classes[exchange_id](), session)
+
+    return async_exchanges[exchange_id]
@@ -0,0 +1,223 @@
+# 동기 백엔드(backend.py, 플라스크)와 비동기 백엔드(async_backend.py, 쿼트)의 처리량(rps)과 지연 시간(p50, p99) 비교
+# 데이터베이스와 거래소 API는 고정된 지연 시간 뒤에 응답하는 가짜 객체로 바꾸어, PostgreSQL이나 외부 네트워크 없이 실행
+#   - 동기 서버: werkzeug 스레드 서버 (요청마다 스레드), 가짜 객체는 time.sleep으로 대기
+#   - 비동기 서버: hypercorn (단일 이벤트 루프), 가짜 객체는 asyncio.sleep으로 대기
+# 서버는 각각 별도 프로세스로 띄우고, aiohttp 클라이언트가 동시 요청을 보냄
+# 실행: python benchmarks/bench_backends.py [--requests 2000] [--concurrency 64] [--latency 5]
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager, asynccontextmanager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+# 측정할 경로 (데이터베이스 조회 2회 / 데이터베이스 조회 1회 + 거래소 API 요청 1회)
+PATHS = ['/channels/1', '/exchanges/1/currencies']
+
+CURRENCIES = [{'symbol': f"C{index}", 'name': f"Currency {index}"} for index in range(50)]
+
+
+# 가짜 객체를 설치하고 backend(또는 async_backend)를 import (서버 프로세스에서 실행)
+def install_stubs(latency: float):
+    import config
+    import database
+    import async_database
+    import exchange
+    import async_exchange
+    from database import ResultSet
+
+    config.tokens = {'database_url': 'postgresql://bench@localhost/bench', 'telegram_token': 'bench'}
+
+    class StubDatabase:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def is_channel_exists(self, channel_id):
+            time.sleep(latency)
+            return True
+
+        def is_exchange_exists(self, exchange_id):
+            time.sleep(latency)
+            return True
+
+        def select(self, table_name, **conditions):
+            time.sleep(latency)
+            return ResultSet(['channel_id', 'channel_name'], [[conditions.get('channel_id', 1), 'bench']])
+
+        @contextmanager
+        def transaction(self):
+            yield None
+
+    class StubAsyncDatabase:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def connect(self):
+            pass
+
+        async def close(self):
+            pass
+
+        async def is_channel_exists(self, channel_id):
+            await asyncio.sleep(latency)
+            return True
+
+        async def is_exchange_exists(self, exchange_id):
+            await asyncio.sleep(latency)
+            return True
+
+        async def select(self, table_name, **conditions):
+            await asyncio.sleep(latency)
+            return ResultSet(['channel_id', 'channel_name'], [[conditions.get('channel_id', 1), 'bench']])
+
+        @asynccontextmanager
+        async def transaction(self):
+            yield None
+
+    class StubExchange:
+        def get_currencies(self):
+            time.sleep(latency)
+            return CURRENCIES
+
+    class StubAsyncExchange:
+        async def get_currencies(self):
+            await asyncio.sleep(latency)
+            return CURRENCIES
+
+    database.Database = StubDatabase
+    async_database.AsyncDatabase = StubAsyncDatabase
+    exchange.get_exchange = lambda exchange_id: StubExchange()
+    async_exchange.get_async_exchange = lambda exchange_id, session: StubAsyncExchange()
+
+
+def serve(kind: str, port: int, latency: float):
+    install_stubs(latency)
+
+    if kind == 'sync':
+        from werkzeug.serving import make_server
+        import backend
+
+        make_server('127.0.0.1', port, backend.app, threaded=True).serve_forever()
+
+    else:
+        from hypercorn.asyncio import serve as hypercorn_serve
+        from hypercorn.config import Config
+        import async_backend
+
+        config = Config()
+        config.bind = [f"127.0.0.1:{port}"]
+        config.accesslog = None
+        config.errorlog = None
+
+        asyncio.run(hypercorn_serve(async_backend.app, config))
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(session, base_url: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(base_url + PATHS[0]) as response:
+                await response.read()
+                return
+
+        except OSError:
+            await asyncio.sleep(0.1)
+
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+def percentile(sorted_values: list, ratio: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+# path로 requests개의 요청을 concurrency개씩 동시에 보내고 (rps, p50, p99, 실패 수)를 반환
+async def run_load(session, url: str, requests: int, concurrency: int) -> tuple:
+    latencies = []
+    failures = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+
+        for _ in remaining:
+            started_at = time.perf_counter()
+            async with session.get(url) as response:
+                await response.read()
+                if response.status != 200:
+                    failures += 1
+
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+
+    return requests / elapsed, percentile(latencies, 0.5), percentile(latencies, 0.99), failures
+
+
+async def bench(kind: str, args) -> list:
+    import aiohttp
+
+    port = get_free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', kind, '--port', str(port), '--latency', str(args.latency)],
+        cwd=ROOT_DIR
+    )
+
+    results = []
+    try:
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            base_url = f"http://127.0.0.1:{port}"
+            await wait_until_ready(session, base_url)
+
+            for path in PATHS:
+                # 워밍업 후 측정
+                await run_load(session, base_url + path, args.concurrency, args.concurrency)
+                results.append((kind, path) + await run_load(session, base_url + path, args.requests, args.concurrency))
+
+    finally:
+        process.terminate()
+        process.wait()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=5.0, help='가짜 데이터베이스/거래소의 응답 지연 (ms)')
+    parser.add_argument('--serve', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        serve(args.serve, args.port, args.latency / 1000)
+        return
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency}ms")
+    print(f"{'server':<6} {'path':<26} {'rps':>8} {'p50(ms)':>8} {'p99(ms)':>8} {'fail':>5}")
+
+    for kind in ['sync', 'async']:
+        for kind, path, rps, p50, p99, failures in asyncio.run(bench(kind, args)):
+            print(f"{kind:<6} {path:<26} {rps:>8.0f} {p50 * 1000:>8.1f} {p99 * 1000:>8.1f} {failures:>5}")
+
+
+if __name__ == '__main__':
+    main()
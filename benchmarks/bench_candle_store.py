@@ -0,0 +1,193 @@
+# 지표 미리 계산(warm-up) 시작 시간 비교: 로컬 캔들 저장소(candle_store.py) vs 거래소 REST API 백필
+# REST API는 바이낸스 klines 형식으로 응답하는 로컬 HTTP 스텁으로 대신하며, 요청마다 지연 시간을 줄 수 있음
+#   - 저장소: 미리 기록해 둔 캔들 저장소를 새로 열고, 알림을 등록할 때 IndicatorEngine이 저장소에서 미리 계산
+#   - REST: 종목마다 필요한 캔들을 페이지(최대 KLINES_PAGE_SIZE개) 단위로 받아 파싱한 뒤 같은 방식으로 미리 계산
+# 실행: python benchmarks/bench_candle_store.py [--markets 50] [--length 1000] [--latency 20]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from candle_store import CandleStore
+from condition import parse_interval
+from detector import AlarmRule
+from indicator import IndicatorEngine
+
+
+INTERVAL = '1m'
+
+# klines 요청 한 번에 받을 수 있는 최대 캔들 수 (바이낸스와 같음)
+KLINES_PAGE_SIZE = 1000
+
+# 스텁과 저장소가 돌려주는 캔들의 마지막 시작 시각 (초, 미리 계산은 최근 캔들만 사용하므로 현재 시각 기준)
+LAST_OPEN_TIME = int(time.time()) // parse_interval(INTERVAL) * parse_interval(INTERVAL)
+
+
+def make_closes(symbol: str, count: int) -> np.ndarray:
+    rng = np.random.default_rng(abs(hash(symbol)) % (2 ** 32))
+
+    return 100 + np.cumsum(rng.normal(0, 1, count))
+
+
+# 바이낸스 /api/v3/klines 형식 스텁 (endTime 이전의 최근 limit개 캔들)
+def make_stub_handler(latency: float, history: int):
+    interval_seconds = parse_interval(INTERVAL)
+
+    class KlinesHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            limit = min(int(params.get('limit', ['500'])[0]), KLINES_PAGE_SIZE)
+            end_time = int(params.get('endTime', [str(LAST_OPEN_TIME * 1000)])[0]) // 1000
+
+            closes = make_closes(params['symbol'][0], history)
+            end_index = history - 1 - (LAST_OPEN_TIME - end_time) // interval_seconds
+            start_index = max(0, end_index + 1 - limit)
+
+            klines = [
+                [
+                    (LAST_OPEN_TIME - (history - 1 - index) * interval_seconds) * 1000,
+                    "0", "0", "0", f"{closes[index]:.8f}", "0", 0, "0", 0, "0", "0", "0"
+                ]
+                for index in range(start_index, end_index + 1)
+            ]
+
+            time.sleep(latency)
+
+            body = json.dumps(klines).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+        def log_message(self, *args):
+            pass
+
+    return KlinesHandler
+
+
+def make_alarms(markets: list, length: int) -> list:
+    return [
+        AlarmRule(alarm_id, 1, *market, {'bollinger_band': {'length': length, 'interval': INTERVAL, 'coefficient': 2}})
+        for alarm_id, market in enumerate(markets, start=1)
+    ]
+
+
+# 저장소에 종목마다 history개의 캔들을 기록
+def fill_store(root: str, markets: list, history: int):
+    store = CandleStore(root, retention=history)
+    interval_seconds = parse_interval(INTERVAL)
+
+    for market in markets:
+        closes = make_closes(market[1] + market[2], history)
+        for index, close in enumerate(closes.tolist()):
+            store.append(market, INTERVAL, LAST_OPEN_TIME - (history - 1 - index) * interval_seconds, close)
+
+    store.close()
+
+
+# 종목별 (이동 평균, 표준 편차) (두 방식의 미리 계산 결과가 같은지 확인용)
+def get_stats(engine: IndicatorEngine, length: int) -> dict:
+    return {
+        market: (series.stats[length].get_mean(), series.stats[length].get_stddev())
+        for (market, _), series in engine.series.items()
+    }
+
+
+def bench_store(root: str, markets: list, length: int) -> tuple:
+    started_at = time.perf_counter()
+
+    store = CandleStore(root)
+    engine = IndicatorEngine(candle_store=store)
+    for alarm in make_alarms(markets, length):
+        engine.add_alarm(alarm)
+
+    elapsed = time.perf_counter() - started_at
+    store.close()
+
+    return elapsed, engine
+
+
+# 종목마다 최근 count개 캔들의 종가를 endTime을 줄여 가며 페이지 단위로 받음
+def fetch_closes(session: requests.Session, base_url: str, symbol: str, count: int) -> np.ndarray:
+    pages = []
+    end_time = LAST_OPEN_TIME * 1000
+
+    while count > 0:
+        limit = min(count, KLINES_PAGE_SIZE)
+        response = session.get(f"{base_url}/api/v3/klines", params={
+            'symbol': symbol, 'interval': INTERVAL, 'limit': limit, 'endTime': end_time
+        })
+        klines = response.json()
+        if len(klines) == 0:
+            break
+
+        pages.append(np.array([float(kline[4]) for kline in klines]))
+        count -= len(klines)
+        end_time = klines[0][0] - 1000
+
+    return np.concatenate(pages[::-1])
+
+
+def bench_rest(base_url: str, markets: list, length: int) -> tuple:
+    started_at = time.perf_counter()
+
+    engine = IndicatorEngine()
+    alarms = make_alarms(markets, length)
+    for alarm in alarms:
+        engine.add_alarm(alarm)
+
+    with requests.Session() as session:
+        for alarm in alarms:
+            series = engine.series[(alarm.get_market(), INTERVAL)]
+            series.warm_up(fetch_closes(session, base_url, alarm.base_symbol + alarm.quote_symbol, series.get_history_length()))
+
+    return time.perf_counter() - started_at, engine
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--markets', type=int, default=50)
+    parser.add_argument('--length', type=int, default=1000, help='볼린저 밴드 기간')
+    parser.add_argument('--latency', type=float, default=20.0, help='스텁 REST API의 요청당 지연 (ms)')
+    args = parser.parse_args()
+
+    markets = [(1, f"C{index}", 'USDT') for index in range(args.markets)]
+    history = args.length + 1
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(args.latency / 1000, history))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as root:
+        fill_store(root, markets, history)
+
+        store_elapsed, store_engine = bench_store(root, markets, args.length)
+        rest_elapsed, rest_engine = bench_rest(base_url, markets, args.length)
+
+    server.shutdown()
+
+    store_stats, rest_stats = get_stats(store_engine, args.length), get_stats(rest_engine, args.length)
+    assert store_stats.keys() == rest_stats.keys()
+    assert all(np.allclose(store_stats[market], rest_stats[market]) for market in store_stats)
+
+    pages = -(-history // KLINES_PAGE_SIZE) * args.markets
+    print(f"markets={args.markets} length={args.length} candles/market={history} latency={args.latency}ms")
+    print(f"candle store warm-up: {store_elapsed * 1000:>9.1f} ms")
+    print(f"REST backfill:        {rest_elapsed * 1000:>9.1f} ms ({pages} requests)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# 결과 집합 생성 시간과 메모리 비교: 튜플 결과 행(database.ResultSet) vs 이전의 행별 딕셔너리 방식
+# psycopg2가 돌려주는 것과 같은 튜플 목록(알림 JOIN 알림 규칙 형태)으로 결과 집합을 만들고, 전체 행을 한 번 훑음
+# 메모리는 tracemalloc으로 잰 결과 집합 생성 중 최대 할당량 (입력 튜플 목록은 제외)
+# 실행: python benchmarks/bench_result_set.py [--rows 100000] [--repeat 5]
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from converter import alarm_row_to_dict
+from database import ResultSet
+
+
+ALARM_COLUMNS = ['alarm_id', 'channel_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'condition_id', 'is_enabled',
+                 'whale', 'tick', 'bollinger_band', 'rsi']
+
+
+# 이전 결과 집합: 첫 번째 컬럼 -> {컬럼: 값} 딕셔너리, 입력 행 목록도 함께 보관
+class DictResultSet(dict):
+    def __init__(self, column: list, result_set: List[list]):
+        for row in result_set:
+            self.__setitem__(row[0], {key: val for key, val in zip(column, row)})
+
+        self.column = column
+        self.result_set = result_set
+
+
+def make_rows(count: int) -> list:
+    return [
+        (alarm_id, alarm_id % 100, 1 + alarm_id % 2, f"C{alarm_id % 500}", 'KRW', alarm_id % 50, True,
+         {'quantity': 1000}, None, None, None)
+        for alarm_id in range(1, count + 1)
+    ]
+
+
+def measure(result_set_class, rows: list, repeat: int) -> tuple:
+    elapsed = []
+    for _ in range(repeat):
+        gc.collect()
+        started_at = time.perf_counter()
+
+        result_set = result_set_class(ALARM_COLUMNS, rows)
+        for row in result_set.values():
+            row['base_symbol']
+
+        elapsed.append(time.perf_counter() - started_at)
+        del result_set
+
+    gc.collect()
+    tracemalloc.start()
+    result_set = result_set_class(ALARM_COLUMNS, rows)
+    result_set[1]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(elapsed), peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    # 두 방식의 결과가 같은 행을 돌려주는지 확인
+    tuple_rows, dict_rows = ResultSet(ALARM_COLUMNS, rows[:100]), DictResultSet(ALARM_COLUMNS, rows[:100])
+    assert all(tuple_rows[alarm_id].to_dict() == dict_rows[alarm_id] for alarm_id in dict_rows)
+    assert alarm_row_to_dict(tuple_rows[1])['item']['base_symbol'] == dict_rows[1]['base_symbol']
+
+    print(f"rows={args.rows}")
+    for name, result_set_class in [('dict rows', DictResultSet), ('tuple rows', ResultSet)]:
+        elapsed, peak = measure(result_set_class, rows, args.repeat)
+        print(f"{name:<12} {elapsed * 1000:>8.1f} ms {peak / 1024 / 1024:>8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# API 응답 직렬화/압축 마이크로 벤치마크
+#   - 직렬화기(json, orjson)별로 대표 응답(알림 목록, 바이낸스 종목 목록, 화폐 목록)을 직렬화하는 시간
+#   - 알림 목록은 데이터베이스 결과 행(database.Row)을 converter로 변환하는 시간까지 포함
+#   - 압축 방식(gzip, br)별 압축 시간과 크기
+# 실행: python benchmarks/bench_serializer.py [--alarms 1000] [--items 3000] [--number 20]
+import argparse
+import os
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from converter import alarm_row_to_dict
+from database import ResultSet
+from serializer import compress_with, serializers
+
+
+ALARM_COLUMNS = ['alarm_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'is_enabled',
+                 'whale', 'tick', 'bollinger_band', 'rsi']
+
+
+def make_alarm_rows(count: int) -> ResultSet:
+    return ResultSet(ALARM_COLUMNS, [
+        (alarm_id, 2, f"C{alarm_id}", 'USDT', True, {'quantity': 1000}, None,
+         {'length': 20, 'interval': '1m', 'coefficient': 2}, None)
+        for alarm_id in range(1, count + 1)
+    ])
+
+
+def make_payloads(item_count: int) -> dict:
+    return {
+        'items': {'items': [{'base_symbol': f"C{index}", 'quote_symbol': 'USDT'} for index in range(item_count)]},
+        'currencies': {'currencies': [
+            {'symbol': f"C{index}", 'english_name': f"Coin {index}", 'korean_name': f"코인 {index}"}
+            for index in range(item_count)
+        ]}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--alarms', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=3000, help='바이낸스 종목 수')
+    parser.add_argument('--number', type=int, default=20, help='측정마다 반복 횟수')
+    args = parser.parse_args()
+
+    alarm_rows = make_alarm_rows(args.alarms)
+    payloads = make_payloads(args.items)
+
+    def measure(function) -> float:
+        return min(timeit.repeat(function, number=args.number, repeat=5)) / args.number * 1000
+
+    print(f"alarms={args.alarms} items={args.items}")
+    print(f"{'':<12}" + "".join(f"{name:>12}" for name in ['alarms', 'items', 'currencies']) + "  (ms)")
+
+    bodies = {}
+    for name, serializer_class in serializers.items():
+        dumps = serializer_class().dumps
+        bodies[name] = {
+            'alarms': dumps({'alarms': [alarm_row_to_dict(row) for row in alarm_rows.values()]}),
+            **{key: dumps(payload) for key, payload in payloads.items()}
+        }
+
+        timings = [
+            measure(lambda: dumps({'alarms': [alarm_row_to_dict(row) for row in alarm_rows.values()]})),
+            *(measure(lambda payload=payload: dumps(payload)) for payload in payloads.values())
+        ]
+        print(f"{name:<12}" + "".join(f"{timing:>12.2f}" for timing in timings))
+
+    # 어느 직렬화기를 쓰든 응답 본문이 같아야 함
+    assert all(body == bodies['json'] for body in bodies.values())
+
+    print()
+    print(f"{'':<12}{'size':>12}{'ms':>12}")
+    for key, body in bodies['json'].items():
+        print(f"{key:<12}{len(body):>12}")
+        for encoding in ['gzip', 'br']:
+            compressed, _ = compress_with(body, encoding)
+            print(f"  {encoding:<10}{len(compressed):>12}{measure(lambda: compress_with(body, encoding)):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+# 로컬 캔들 저장소
+# (거래소 ID, 기초 자산, 견적 자산, 캔들 간격)마다 디렉터리를 두고, 컬럼마다 하나의 파일에 고정 크기 값을 이어 붙임
+#   <root>/<거래소 ID>/<기초 자산>_<견적 자산>/<캔들 간격>/open_time.i8  (int64, 캔들 시작 시각, 초)
+#   <root>/<거래소 ID>/<기초 자산>_<견적 자산>/<캔들 간격>/close.f8      (float64, 종가)
+# 경로 구성 요소는 저장소 밖을 가리키지 않도록 제한함
+#   심볼은 영문자와 숫자 외의 문자를 %XX(UTF-8 바이트)로 바꾸고, 캔들 간격은 '15m' 같은 형식만 허용
+# 읽을 때는 파일을 np.memmap으로 열어 복사 없이 NumPy 배열로 사용
+# 추가는 O_APPEND로 연 파일에 값 하나씩 쓰기만 하므로 비용이 일정하고,
+# 오래된 캔들은 백그라운드 압축(compaction)에서 최근 retention개만 남긴 새 파일로 교체하여 정리
+# 압축은 모든 컬럼의 새 파일을 다 쓴 뒤 표시 파일(compact)을 만들고 교체하므로,
+# 교체 도중 종료되면 다음에 열 때 남은 교체를 마저 함
+import os
+import re
+import threading
+
+import numpy as np
+
+from condition import INTERVAL_PATTERN
+
+
+# 캔들 간격별로 보관할 최근 캔들 수
+CANDLE_RETENTION = 10000
+
+# 압축 주기 (초)
+COMPACTION_PERIOD = 600
+
+COLUMNS = (
+    ('open_time', np.dtype('<i8')),
+    ('close', np.dtype('<f8'))
+)
+
+# 압축 중 새 파일을 다 썼음을 나타내는 표시 파일 이름과 새 파일 접미사
+COMPACTION_MARKER = 'compact'
+TEMPORARY_SUFFIX = '.tmp'
+
+
+# 심볼에서 그대로 둘 문자 외의 문자
+SYMBOL_UNSAFE_PATTERN = re.compile('[^A-Za-z0-9]')
+
+
+def get_column_file_name(column: str, dtype: np.dtype) -> str:
+    return f"{column}.{dtype.kind}{dtype.itemsize}"
+
+
+# 심볼을 경로 구성 요소로 변환 ('/', '.', 구분자 '_' 등은 %XX로 바뀌어 다른 심볼의 경로와 겹치지 않음)
+def encode_symbol(symbol: str) -> str:
+    if len(symbol) == 0:
+        raise ValueError("empty symbol")
+
+    return SYMBOL_UNSAFE_PATTERN.sub(
+        lambda match: ''.join(f"%{byte:02X}" for byte in match.group().encode('utf-8')), symbol
+    )
+
+
+# 한 (종목, 캔들 간격)의 캔들 파일
+class CandleSeries:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.is_closed = False
+
+        os.makedirs(path, exist_ok=True)
+        self.recover()
+
+        self.files = {}     # 컬럼 -> 추가용 파일 디스크립터
+        self.open_files()
+
+        # 중간에 끊긴 쓰기가 있어도 모든 컬럼에 온전히 기록된 행까지만 유효한 것으로 봄
+        self.row_count = self.get_row_count()
+        open_times = self.read_column('open_time', 1)
+        self.last_open_time = int(open_times[-1]) if len(open_times) > 0 else None
+
+    
+    def get_column_path(self, column: str, dtype: np.dtype) -> str:
+        return os.path.join(self.path, get_column_file_name(column, dtype))
+
+    
+    # 끝나지 않은 압축 정리: 새 파일을 다 쓴 뒤였으면 남은 교체를 마저 하고, 아니면 쓰다 만 새 파일을 지움
+    def recover(self):
+        marker_path = os.path.join(self.path, COMPACTION_MARKER)
+        is_written = os.path.exists(marker_path)
+
+        for column, dtype in COLUMNS:
+            column_path = self.get_column_path(column, dtype)
+            if not os.path.exists(column_path + TEMPORARY_SUFFIX):
+                continue
+
+            if is_written:
+                os.replace(column_path + TEMPORARY_SUFFIX, column_path)
+
+            else:
+                os.remove(column_path + TEMPORARY_SUFFIX)
+
+        if is_written:
+            os.remove(marker_path)
+
+    
+    def open_files(self):
+        for column, dtype in COLUMNS:
+            self.files[column] = os.open(self.get_column_path(column, dtype), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    
+    def close_files(self):
+        for fd in self.files.values():
+            os.close(fd)
+
+        self.files = {}
+
+    
+    def get_row_count(self) -> int:
+        return min(
+            os.path.getsize(self.get_column_path(column, dtype)) // dtype.itemsize
+            for column, dtype in COLUMNS
+        )
+
+    
+    # 마감된 캔들 하나를 추가 (이미 저장된 캔들보다 이전이거나 같은 시각의 캔들은 무시)
+    def append(self, open_time: int, close: float) -> bool:
+        with self.lock:
+            if self.last_open_time is not None and open_time <= self.last_open_time:
+                return False
+
+            # 이전 쓰기가 중간에 끊겨 컬럼 길이가 다르면 온전한 행 길이로 맞춘 뒤 추가
+            for column, dtype in COLUMNS:
+                if os.fstat(self.files[column]).st_size != self.row_count * dtype.itemsize:
+                    os.ftruncate(self.files[column], self.row_count * dtype.itemsize)
+
+            os.write(self.files['open_time'], np.int64(open_time).tobytes())
+            os.write(self.files['close'], np.float64(close).tobytes())
+
+            self.row_count += 1
+            self.last_open_time = open_time
+
+            return True
+
+    
+    # 컬럼의 최근 count개 값 (None이면 전체)
+    # 파일을 메모리 매핑한 배열의 뷰를 반환하므로 복사가 일어나지 않음
+    def read_column(self, column: str, count: int = None) -> np.ndarray:
+        dtype = dict(COLUMNS)[column]
+        row_count = self.get_row_count()
+
+        if row_count == 0:
+            return np.zeros(0, dtype=dtype)
+
+        values = np.memmap(self.get_column_path(column, dtype), dtype=dtype, mode='r', shape=(row_count, ))
+        if count is not None:
+            values = values[max(row_count - count, 0):]
+
+        return values
+
+    
+    # 최근 retention개의 캔들만 남긴 새 파일을 만들어 교체
+    # 이미 매핑된 배열은 교체 전 파일을 계속 가리키므로 읽는 쪽에 영향을 주지 않음
+    def compact(self, retention: int) -> bool:
+        with self.lock:
+            if self.is_closed or self.row_count <= retention:
+                return False
+
+            # 한 컬럼을 교체하면 행 수가 달라지므로 모든 컬럼을 먼저 읽어 둠
+            columns = [(column, dtype, np.array(self.read_column(column, retention))) for column, dtype in COLUMNS]
+
+            for column, dtype, values in columns:
+                with open(self.get_column_path(column, dtype) + TEMPORARY_SUFFIX, 'wb') as file:
+                    file.write(values.tobytes())
+                    file.flush()
+                    os.fsync(file.fileno())
+
+            marker_path = os.path.join(self.path, COMPACTION_MARKER)
+            with open(marker_path, 'wb') as file:
+                os.fsync(file.fileno())
+
+            for column, dtype, values in columns:
+                column_path = self.get_column_path(column, dtype)
+                os.replace(column_path + TEMPORARY_SUFFIX, column_path)
+
+            os.remove(marker_path)
+
+            self.close_files()
+            self.open_files()
+            self.row_count = min(self.row_count, retention)
+
+            return True
+
+    
+    # 파일을 닫고 더 이상 압축하지 않음 (진행 중인 압축이 있으면 끝날 때까지 기다림)
+    def close(self):
+        with self.lock:
+            self.close_files()
+            self.is_closed = True
+
+
+class CandleStore:
+    def __init__(self, root: str, retention: int = CANDLE_RETENTION):
+        self.root = root
+        self.retention = retention
+
+        self.series = {}    # (종목, 캔들 간격) -> CandleSeries
+        self.lock = threading.Lock()
+
+        self.compaction_thread = None
+        self.compaction_stop = threading.Event()
+
+    
+    def get_series(self, market: tuple, interval: str) -> CandleSeries:
+        key = (market, interval)
+
+        series = self.series.get(key)
+        if series is None:
+            with self.lock:
+                series = self.series.get(key)
+                if series is None:
+                    series = self.series[key] = CandleSeries(self.get_series_path(market, interval))
+
+        return series
+
+    
+    # 종목과 캔들 간격의 캔들 디렉터리 경로 (저장소 밖을 가리키게 되는 값이면 ValueError)
+    def get_series_path(self, market: tuple, interval: str) -> str:
+        exchange_id, base_symbol, quote_symbol = market
+
+        if type(exchange_id) != int:
+            raise ValueError(f"invalid exchange id: {exchange_id!r}")
+
+        if not isinstance(interval, str) or INTERVAL_PATTERN.fullmatch(interval) is None:
+            raise ValueError(f"invalid interval: {interval!r}")
+
+        path = os.path.join(self.root, str(exchange_id), f"{encode_symbol(base_symbol)}_{encode_symbol(quote_symbol)}", interval)
+
+        root = os.path.realpath(self.root)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            raise ValueError(f"candle path escapes the store: {path}")
+
+        return path
+
+    
+    def append(self, market: tuple, interval: str, open_time: int, close: float) -> bool:
+        return self.get_series(market, interval).append(open_time, close)
+
+    
+    # 최근 count개 캔들의 (시작 시각 배열, 종가 배열)
+    def read(self, market: tuple, interval: str, count: int = None) -> tuple:
+        series = self.get_series(market, interval)
+
+        with series.lock:
+            return series.read_column('open_time', count), series.read_column('close', count)
+
+    
+    # 더 이상 쓰지 않을 캔들 파일을 닫음
+    # 다른 프로세스가 이어서 쓸 수 있도록, 종목을 맡지 않게 되면 반드시 호출해야 함
+    # (계속 열어 두면 이 프로세스의 압축이 파일을 교체해 다른 프로세스가 쓴 캔들이 사라짐)
+    def release(self, market: tuple, interval: str):
+        with self.lock:
+            series = self.series.pop((market, interval), None)
+
+        if series is not None:
+            series.close()
+
+    
+    # 이 저장소로 연 캔들 파일을 모두 압축하고 압축한 수를 반환
+    def compact_all(self) -> int:
+        with self.lock:
+            series_list = list(self.series.values())
+
+        return sum(series.compact(self.retention) for series in series_list)
+
+    
+    # 백그라운드 스레드에서 period초마다 압축
+    def start_compaction(self, period: float = COMPACTION_PERIOD):
+        if self.compaction_thread is not None:
+            return
+
+        def run():
+            while not self.compaction_stop.wait(period):
+                self.compact_all()
+
+        self.compaction_thread = threading.Thread(target=run, daemon=True)
+        self.compaction_thread.start()
+
+    
+    def close(self):
+        if self.compaction_thread is not None:
+            self.compaction_stop.set()
+            self.compaction_thread.join()
+            self.compaction_thread = None
+
+        with self.lock:
+            for series in self.series.values():
+                series.close()
+
+            self.series = {}
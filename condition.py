@@ -0,0 +1,125 @@
+# 알림 규칙(condition)의 정규화와 해시
+# 내용이 같은 알림 규칙은 표기 방식(키 순서, 14와 14.0 등)과 관계없이 같은 해시를 가짐
+import re
+import json
+import math
+import hashlib
+
+
+CONDITION_KINDS = ('whale', 'tick', 'bollinger_band', 'rsi')
+
+# 캔들 간격 단위 -> 초
+INTERVAL_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 60 * 60 * 24,
+    'w': 60 * 60 * 24 * 7
+}
+
+# 캔들 간격 문자열 형식 (양의 정수 + 단위, 예: '1m', '15m', '4h')
+INTERVAL_PATTERN = re.compile(f"[1-9][0-9]*[{''.join(INTERVAL_UNITS.keys())}]")
+
+# 지표 기간의 최대값 (지표 엔진이 기간만큼의 종가 버퍼를 만듦)
+MAX_INDICATOR_LENGTH = 10000
+
+
+class InvalidConditionError(ValueError):
+    pass
+
+
+# 숫자는 정수로 표현 가능하면 정수로, 아니면 실수로 통일
+def canonicalize_value(value):
+    if isinstance(value, bool) or value is None:
+        return value
+
+    elif isinstance(value, (int, float)):
+        return int(value) if float(value).is_integer() else float(value)
+
+    elif isinstance(value, dict):
+        return {key: canonicalize_value(val) for key, val in value.items()}
+
+    elif isinstance(value, (list, tuple)):
+        return [canonicalize_value(val) for val in value]
+
+    return value
+
+
+# 알림 규칙을 정규화 (값이 없는 항목은 제외)
+def canonicalize_condition(condition: dict) -> dict:
+    return {
+        kind: canonicalize_value(condition[kind])
+        for kind in CONDITION_KINDS if condition.get(kind) is not None
+    }
+
+
+# 값의 내용 해시 (SHA-256)
+def get_content_hash(value) -> str:
+    text = json.dumps(canonicalize_value(value), sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# 알림 규칙 전체의 내용 해시
+def get_condition_hash(condition: dict) -> str:
+    return get_content_hash(canonicalize_condition(condition))
+
+
+# '1m', '15m', '4h' 같은 캔들 간격 문자열을 초 단위로 변환
+def parse_interval(interval: str) -> int:
+    return int(interval[:-1]) * INTERVAL_UNITS[interval[-1]]
+
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+# 고래/틱 조건 검증 (잘못되면 InvalidConditionError)
+def validate_threshold_spec(kind: str, spec):
+    if not isinstance(spec, dict):
+        raise InvalidConditionError(f"{kind}: must be an object")
+
+    if not is_number(spec.get('quantity')) or spec['quantity'] <= 0:
+        raise InvalidConditionError(f"{kind}: quantity must be a positive number")
+
+
+# 볼린저 밴드/RSI 조건 검증 (잘못되면 InvalidConditionError)
+def validate_indicator_spec(kind: str, spec):
+    if not isinstance(spec, dict):
+        raise InvalidConditionError(f"{kind}: must be an object")
+
+    interval = spec.get('interval')
+    if not isinstance(interval, str) or INTERVAL_PATTERN.fullmatch(interval) is None:
+        raise InvalidConditionError(f"{kind}: invalid interval {interval!r}")
+
+    length = canonicalize_value(spec.get('length'))
+    if type(length) != int or not 1 <= length <= MAX_INDICATOR_LENGTH:
+        raise InvalidConditionError(f"{kind}: length must be an integer between 1 and {MAX_INDICATOR_LENGTH}")
+
+    if kind == 'bollinger_band':
+        if not is_number(spec.get('coefficient')) or spec['coefficient'] <= 0:
+            raise InvalidConditionError(f"{kind}: coefficient must be a positive number")
+
+    else:
+        for key in ('max_value', 'min_value'):
+            if not is_number(spec.get(key)) or not 0 <= spec[key] <= 100:
+                raise InvalidConditionError(f"{kind}: {key} must be a number between 0 and 100")
+
+
+# 알림 규칙 검증 (잘못되면 InvalidConditionError)
+# 잘못된 알림 규칙이 저장되면 감지 서비스가 불러올 때 실패하므로 저장하기 전에 확인
+def validate_condition(condition):
+    if not isinstance(condition, dict):
+        raise InvalidConditionError("condition must be an object")
+
+    unknown_kinds = set(condition.keys()) - set(CONDITION_KINDS)
+    if len(unknown_kinds) > 0:
+        raise InvalidConditionError(f"Unknown condition: {', '.join(sorted(unknown_kinds))}")
+
+    for kind in ('whale', 'tick'):
+        if condition.get(kind) is not None:
+            validate_threshold_spec(kind, condition[kind])
+
+    for kind in ('bollinger_band', 'rsi'):
+        if condition.get(kind) is not None:
+            validate_indicator_spec(kind, condition[kind])
@@ -0,0 +1,60 @@
+# 설정(토큰) 파일 로더
+# 파일을 한 번만 읽어 두고, 파일이 수정되면(mtime 변경) 다시 읽음
+import os
+import json
+import threading
+import time
+
+
+token_file_path = '/etc/secrets/token.json'
+
+# 파일 수정 여부를 확인하는 최소 간격 (초)
+RELOAD_CHECK_INTERVAL = 5.0
+
+
+class ConfigFile:
+    def __init__(self, file_path: str, hot_reload: bool = True):
+        self.file_path = file_path
+        self.hot_reload = hot_reload
+
+        self.values = None
+        self.mtime = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    
+    def load(self):
+        mtime = os.stat(self.file_path).st_mtime
+
+        with open(self.file_path, 'r') as file:
+            self.values = json.load(file)
+
+        self.mtime = mtime
+
+    
+    # 설정 값 딕셔너리 반환
+    def get(self) -> dict:
+        now = time.monotonic()
+
+        if self.values is not None and (not self.hot_reload or now - self.checked_at < RELOAD_CHECK_INTERVAL):
+            return self.values
+
+        with self.lock:
+            if self.values is None:
+                self.load()
+
+            elif self.hot_reload and now - self.checked_at >= RELOAD_CHECK_INTERVAL:
+                if os.stat(self.file_path).st_mtime != self.mtime:
+                    self.load()
+
+            self.checked_at = now
+
+            return self.values
+
+    
+    def __getitem__(self, key: str):
+        return self.get()[key]
+
+
+# 토큰 파일 (프로세스 전체에서 공유)
+tokens = ConfigFile(token_file_path)
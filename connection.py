@@ -1,20 +1,39 @@
 from urllib.parse import urlparse
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 
 
-def connect(url: str) -> psycopg2.extensions.connection:
+# 데이터베이스 URL을 psycopg2 연결 매개변수로 변환
+def parse_url(url: str) -> dict:
     params = urlparse(url)
 
-    username = params.username
-    password = params.password
-    database = params.path[1:]
-    hostname = params.hostname
-    port = params.port
-
-    return psycopg2.connect(
-        database = database,
-        user = username,
-        password = password,
-        host = hostname,
-        port = port
-    )
\ No newline at end of file
+    return {
+        'database': params.path[1:],
+        'user': params.username,
+        'password': params.password,
+        'host': params.hostname,
+        'port': params.port
+    }
+
+
+# 커넥션별로 준비된 prepared statement 이름을 기억하는 커넥션
+class PreparingConnection(psycopg2.extensions.connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.prepared_statements = set()
+        self.stale_statements = set()   # 스키마 변경으로 다시 준비해야 하는 prepared statement 이름
+
+
+def connect(url: str) -> psycopg2.extensions.connection:
+    return psycopg2.connect(**parse_url(url))
+
+
+# 스레드 간에 공유 가능한 커넥션 풀 생성
+def create_pool(url: str, min_connections: int = 1, max_connections: int = 10) -> ThreadedConnectionPool:
+    return ThreadedConnectionPool(
+        min_connections,
+        max_connections,
+        connection_factory=PreparingConnection,
+        **parse_url(url)
+    )
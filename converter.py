@@ -0,0 +1,95 @@
+# 데이터베이스 행을 API 응답용 딕셔너리로 변환하는 함수
+# 행 클래스마다 필요한 컬럼을 위치로 한 번에 꺼내는 함수를 만들어 두어, 컬럼 이름으로 하나씩 조회하지 않음
+from operator import itemgetter
+
+from condition import CONDITION_KINDS
+
+
+CHANNEL_COLUMNS = ('channel_id', 'channel_name')
+ALARM_COLUMNS = ('alarm_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'is_enabled') + CONDITION_KINDS
+EXCHANGE_COLUMNS = ('exchange_id', 'exchange_name')
+
+# (행 클래스, 컬럼 목록) -> 행(튜플)에서 해당 컬럼 값들을 꺼내는 함수
+row_getters = {}
+
+
+# row에서 columns 순서대로 값 튜플을 꺼냄 (columns는 2개 이상)
+def get_values(row, columns: tuple) -> tuple:
+    key = (type(row), columns)
+
+    getter = row_getters.get(key)
+    if getter is None:
+        getter = itemgetter(*(row.column_index[column] for column in columns))
+        row_getters[key] = getter
+
+    return getter(tuple(row))
+
+
+def channel_row_to_dict(row) -> dict:
+    channel_id, channel_name = get_values(row, CHANNEL_COLUMNS)
+
+    return {
+        'id': channel_id,
+        'name': channel_name
+    }
+
+
+# 알림 규칙 컬럼 값(whale, tick, bollinger_band, rsi)을 응답용 딕셔너리로 변환
+def condition_values_to_dict(whale, tick, bollinger_band, rsi) -> dict:
+    condition_dict = {}
+
+    if whale != None:
+        condition_dict['whale'] = {
+            'quantity': whale['quantity']
+        }
+
+    if tick != None:
+        condition_dict['tick'] = {
+            'quantity': tick['quantity']
+        }
+
+    if bollinger_band != None:
+        condition_dict['bollinger_band'] = {
+            'length': bollinger_band['length'],
+            'interval': bollinger_band['interval'],
+            'coefficient': bollinger_band['coefficient']
+        }
+
+    if rsi != None:
+        condition_dict['rsi'] = {
+            'length': rsi['length'],
+            'interval': rsi['interval'],
+            'max_value': rsi['max_value'],
+            'min_value': rsi['min_value']
+        }
+
+    return condition_dict
+
+
+def condition_row_to_dict(row) -> dict:
+    return condition_values_to_dict(*get_values(row, CONDITION_KINDS))
+
+
+# row는 Database.select_alarms로 조회한 알림 규칙 컬럼이 포함된 행
+def alarm_row_to_dict(row) -> dict:
+    alarm_id, exchange_id, base_symbol, quote_symbol, is_enabled, *condition_values = get_values(row, ALARM_COLUMNS)
+
+    return {
+        'id': alarm_id,
+        'item': {
+            'exchange_id': exchange_id,
+            'base_symbol': base_symbol,
+            'quote_symbol': quote_symbol
+        },
+        'condition': condition_values_to_dict(*condition_values),
+        'is_enabled': is_enabled
+    }
+
+
+def exchange_row_to_dict(row) -> dict:
+    exchange_id, exchange_name = get_values(row, EXCHANGE_COLUMNS)
+
+    return {
+        'id': exchange_id,
+        'name': exchange_name
+    }
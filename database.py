@@ -1,9 +1,56 @@
 # 데이터베이스 API
-import os
-import json
-from typing import Union, List
+import re
+import threading
+import uuid
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import List
 
-from connection import connect
+import psycopg2
+import psycopg2.errors
+from psycopg2.extras import Json, execute_values
+
+from connection import create_pool
+from existence_cache import ExistenceCache
+from response_cache import ResourceVersions
+from pg_listener import NotificationListener
+from condition import CONDITION_KINDS, canonicalize_value, canonicalize_condition, get_condition_hash, validate_condition
+
+
+# 존재 여부 캐시 기본 유효 시간 (초)
+# 다른 프로세스의 변경을 LISTEN/NOTIFY로 받지 않을 때 캐시가 오래된 값을 돌려줄 수 있는 최대 시간
+EXISTENCE_CACHE_TTL = 30
+
+# 존재 여부 캐시 무효화 알림 채널
+INVALIDATION_CHANNEL = 'existence_cache'
+
+# 리소스 버전 변경 알림 채널 (페이로드: '보낸 프로세스 구분자:테이블' 또는 '보낸 프로세스 구분자:테이블:범위')
+VERSION_CHANNEL = 'resource_version'
+
+# 서버 측 커서로 결과를 나누어 받을 때 한 번에 받는 행 수
+STREAM_FETCH_SIZE = 2000
+
+# 풀의 커넥션이 모두 사용 중일 때 반납을 기다리는 최대 시간 (초)
+POOL_TIMEOUT = 10
+
+# 다시 실행해도 결과가 같은 읽기 쿼리문 (커넥션이 끊어져 실패했을 때 재시도 대상)
+# SELECT pg_notify(...)도 포함되지만, 무효화 알림은 두 번 받아도 결과가 같음
+READ_QUERY_PATTERN = re.compile(r'\s*SELECT\s', re.IGNORECASE)
+
+
+# 존재 여부 캐시 무효화 / 리소스 버전 변경 알림을 캐시에 반영 (Database, AsyncDatabase가 공유)
+def apply_notification(existence_cache: ExistenceCache, resource_versions: ResourceVersions, channel: str, payload: str):
+    if channel == VERSION_CHANNEL:
+        resource_versions.on_payload(payload)
+        return
+
+    table_name, _, primary_key = payload.partition(':')
+
+    if primary_key == "":
+        existence_cache.invalidate(table_name)
+
+    else:
+        existence_cache.invalidate(table_name, int(primary_key) if primary_key.lstrip('-').isdigit() else primary_key)
 
 
 class DatabaseFileNotFoundError(Exception):
@@ -11,19 +58,112 @@ class DatabaseFileNotFoundError(Exception):
         super().__init__('Could not find database file.')
 
 
-class ResultSet(dict):
+class PoolTimeoutError(Exception):
+    def __init__(self):
+        super().__init__('Timed out waiting for a database connection.')
+
+
+# 결과 행
+# 튜플을 상속해 값만 저장하고(__slots__ = ()), 컬럼명은 컬럼 구성별로 만든 클래스가 공유
+# row['컬럼명'], row[인덱스] 모두 사용 가능하며, 딕셔너리가 필요할 때만 to_dict()로 변환
+class Row(tuple):
+    __slots__ = ()
+
+    columns = ()
+    column_index = {}
+
+
+    def __getitem__(self, key):
+        if type(key) == str:
+            return tuple.__getitem__(self, self.column_index[key])
+
+        return tuple.__getitem__(self, key)
+
+    
+    def keys(self):
+        return self.columns
+
+    
+    def get(self, key, default=None):
+        index = self.column_index.get(key)
+
+        return default if index is None else tuple.__getitem__(self, index)
+
+    
+    def to_dict(self) -> dict:
+        return dict(zip(self.columns, self))
+
+    
+    def __repr__(self):
+        return f"Row({self.to_dict()})"
+
+
+# 컬럼 구성 -> 결과 행 클래스
+row_classes = {}
+
+
+# 컬럼 구성에 맞는 결과 행 클래스 반환 (처음 요청될 때 생성)
+def get_row_class(column) -> type:
+    column = tuple(column)
+
+    row_class = row_classes.get(column)
+    if row_class is None:
+        row_class = type('Row', (Row, ), {
+            '__slots__': (),
+            'columns': column,
+            'column_index': {name: index for index, name in enumerate(column)}
+        })
+        row_classes[column] = row_class
+
+    return row_class
+
+
+# 결과 집합
+# 결과 행 목록을 그대로 보관하고, 첫 번째 컬럼(기본 키) -> 결과 행 색인은 처음 조회할 때 만듦
+class ResultSet(Mapping):
     def __init__(self, column: list, result_set: List[list]):
-        for row in result_set:
-            self.__setitem__(row[0], {key: val for key, val in zip(column, row)})
+        row_class = get_row_class(column)
 
         self.column = column
-        self.result_set = result_set
+        self.rows = [row_class(row) for row in result_set]
+        self.index = None
+
+    
+    def get_index(self) -> dict:
+        if self.index is None:
+            self.index = {row[0]: row for row in self.rows}
+
+        return self.index
+
+    
+    def __getitem__(self, primary_key) -> Row:
+        return self.get_index()[primary_key]
+
+    
+    def __iter__(self):
+        return iter(self.get_index())
+
+    
+    def __len__(self):
+        return len(self.get_index())
+
+    
+    def values(self):
+        return self.get_index().values()
+
+    
+    def __repr__(self):
+        return f"ResultSet({self.rows})"
+
     
     def to_list(self):
-        return self.result_set
+        return self.rows
 
 
-class Database:
+# SQL 쿼리문 작성기
+# 자리 표시자($1, $2, ...)를 사용하는 쿼리문과 바인딩 값 튜플을 만듦
+# 동기(Database)/비동기(AsyncDatabase) 데이터베이스 API가 공유
+class QueryBuilder:
     schema = {
         'exchange': {
             'exchange_id': int,
@@ -50,70 +190,528 @@ class Database:
             'whale': dict,
             'tick': dict,
             'bollinger_band': dict,
-            'rsi': dict
+            'rsi': dict,
+            'condition_hash': str
         }
     }
 
+    # 테이블 -> 외래 키로 참조하는 테이블 목록 (참조 대상이 삭제되면 함께 삭제됨)
+    foreign_keys = {
+        'alarm': ('exchange', 'channel', 'condition')
+    }
+
+    # 테이블 -> 리소스 버전을 나누어 관리하는 범위 컬럼 (예: 알림은 채널별로 버전 관리)
+    version_scopes = {
+        'alarm': 'channel_id'
+    }
+
+    
+    # 컬럼 목록으로 SQL 쿼리문에 작성할 자리 표시자($1, $2, ...) 조건문을 작성
+    # start: 첫 자리 표시자의 번호
+    @staticmethod
+    def to_placeholder_statement(columns, seperator=", ", start=1) -> str:
+        return seperator.join(
+            f"{column}=${index}" for index, column in enumerate(columns, start)
+        )
+
+    
+    # 해당 테이블의 컬럼명 반환
+    def get_primary_column(self, table_name: str) -> str:
+        primary_column = list(self.schema[table_name].keys())[0]
+
+        return primary_column
+
+    
+    # 해당 테이블을 참조해 함께 삭제되는 테이블 목록 반환
+    def get_dependent_tables(self, table_name: str) -> list:
+        return [
+            dependent_table for dependent_table, referenced_tables in self.foreign_keys.items()
+            if table_name in referenced_tables
+        ]
+
+    
+    # SELECT문 작성
+    # prepared statement의 결과 형식이 테이블 컬럼 변경에 따라 바뀌지 않도록 컬럼을 직접 나열 (SELECT * 사용하지 않음)
+    def build_select_query(self, table_name: str, **kwargs) -> tuple:
+        query = f"SELECT {', '.join(self.schema[table_name].keys())} FROM {table_name}"
+    
+        # 조건 지정
+        if kwargs != {}:
+            query += " WHERE " + self.to_placeholder_statement(kwargs.keys(), " AND ")
+
+        return query, tuple(kwargs.values())
+
+    
+    # 알림 정보와 해당 알림의 알림 규칙을 JOIN하는 SELECT문 작성
+    # 조회되는 각 행은 alarm 테이블의 컬럼과 condition 테이블의 컬럼(whale, tick, bollinger_band, rsi)을 모두 포함
+    def build_select_alarms_query(self, **kwargs) -> tuple:
+        # 조건 지정 (alarm 테이블의 컬럼 기준)
+        condition_state = None
+        if kwargs != {}:
+            alarm_columns = [f"alarm.{key}" for key in kwargs.keys()]
+            condition_state = self.to_placeholder_statement(alarm_columns, " AND ")
+
+        return self.build_join_alarms_query(condition_state), tuple(kwargs.values())
+
+    
+    # alarm과 condition을 JOIN하는 SELECT문에 condition_state 조건문을 붙여 작성
+    def build_join_alarms_query(self, condition_state: str = None) -> str:
+        columns = [f"alarm.{column}" for column in self.schema['alarm'].keys()]
+        columns += [f"condition.{column}" for column in list(self.schema['condition'].keys())[1:]]
+
+        query = f"SELECT {', '.join(columns)} FROM alarm JOIN condition ON alarm.condition_id=condition.condition_id"
+
+        if condition_state is not None:
+            query += " WHERE " + condition_state
+
+        return query + " ORDER BY alarm.alarm_id"
+
+    
+    # INSERT문 작성
+    def build_insert_query(self, table_name: str, **kwargs) -> tuple:
+        columns = tuple(kwargs.keys())
+        values = tuple(kwargs.values())
+        placeholders = [f"${index}" for index in range(1, len(values) + 1)]
+
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING {table_name}_id"
+
+        return query, values
+
+    
+    # 알림 규칙 INSERT문 작성 (값 튜플의 마지막 값이 알림 규칙 해시)
+    # 내용이 같은 알림 규칙이 이미 있으면(condition_hash 기준) 아무것도 하지 않고 결과 행도 없으므로,
+    # build_select_condition_ids_query로 기존 알림 규칙의 ID를 조회해야 함
+    # (DO UPDATE로 기존 행을 돌려받으면 같은 알림 규칙을 등록할 때마다 행이 다시 쓰이고 잠김)
+    # 결과 행: (condition_id, ) 또는 없음
+    def build_insert_condition_query(self, condition: dict) -> tuple:
+        values = self.to_condition_values(condition)
+        placeholders = [f"${index}" for index in range(1, len(values) + 1)]
+
+        query = (
+            f"INSERT INTO condition ({', '.join(CONDITION_KINDS)}, condition_hash) VALUES ({', '.join(placeholders)}) "
+            f"ON CONFLICT (condition_hash) DO NOTHING RETURNING condition_id"
+        )
+
+        return query, values
+
+    
+    # 알림 규칙 해시 목록에 해당하는 알림 규칙 ID 조회문 작성
+    # INSERT ... DO NOTHING과 다른 쿼리문으로 실행해야 동시에 등록되어 충돌한 행이 보임
+    # 결과 행: (condition_hash, condition_id)
+    def build_select_condition_ids_query(self, condition_hashes: list) -> tuple:
+        return "SELECT condition_hash, condition_id FROM condition WHERE condition_hash = ANY($1)", (list(condition_hashes), )
+
+    
+    # 알림 규칙을 condition 테이블의 (whale, tick, bollinger_band, rsi, condition_hash) 값 튜플로 변환
+    # 알림 규칙이 잘못되었으면 InvalidConditionError (단일/다중 INSERT 모두 이 함수를 거침)
+    @staticmethod
+    def to_condition_values(condition: dict) -> tuple:
+        validate_condition(condition)
+
+        canonical_condition = canonicalize_condition(condition)
+        values = tuple(canonical_condition.get(kind) for kind in CONDITION_KINDS)
+
+        return (*values, get_condition_hash(canonical_condition))
+
+    
+    # 여러 알림의 알림 규칙을 값 튜플로 변환
+    # (알림 규칙 해시 -> 값 튜플, 알림별 알림 규칙 해시 목록)을 반환하며, 내용이 같은 알림 규칙은 한 번만 포함
+    # (한 INSERT문에서 같은 행을 두 번 갱신할 수 없음)
+    def collect_condition_values(self, alarm_list: list) -> tuple:
+        condition_values = {}
+        alarm_hashes = []
+
+        for alarm in alarm_list:
+            values = self.to_condition_values(alarm['condition'])
+            condition_values[values[-1]] = values
+            alarm_hashes.append(values[-1])
+
+        return condition_values, alarm_hashes
+
+    
+    # row_count개 행의 다중 행 VALUES 자리 표시자 작성 (예: ($1, $2), ($3, $4))
+    @staticmethod
+    def to_values_placeholders(row_count: int, column_count: int) -> str:
+        return ", ".join(
+            "(" + ", ".join(f"${row * column_count + column + 1}" for column in range(column_count)) + ")"
+            for row in range(row_count)
+        )
+
+    
+    # 여러 알림 규칙의 다중 행 INSERT문 작성
+    # condition_values_list: to_condition_values로 만든 값 튜플 목록 (해시가 서로 달라야 함)
+    # 새로 추가된 알림 규칙만 결과 행으로 돌려주므로, 나머지는 build_select_condition_ids_query로 조회
+    # 결과 행: (condition_hash, condition_id)
+    def build_insert_conditions_query(self, condition_values_list: list) -> tuple:
+        query = (
+            f"INSERT INTO condition ({', '.join(CONDITION_KINDS)}, condition_hash) "
+            f"VALUES {self.to_values_placeholders(len(condition_values_list), len(CONDITION_KINDS) + 1)} "
+            f"ON CONFLICT (condition_hash) DO NOTHING RETURNING condition_hash, condition_id"
+        )
+
+        return query, tuple(value for values in condition_values_list for value in values)
+
+    
+    # 한 채널에 여러 알림을 추가하는 다중 행 INSERT문 작성
+    # condition_ids: alarm_list의 각 알림에 연결할 알림 규칙 ID 목록
+    # 결과 행: (alarm_id, ), alarm_list 순서
+    def build_insert_alarms_query(self, channel_id: int, alarm_list: list, condition_ids: list) -> tuple:
+        columns = ('channel_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'condition_id', 'is_enabled')
+        rows = [
+            (
+                channel_id, alarm['exchange_id'], alarm['base_symbol'], alarm['quote_symbol'],
+                condition_id, alarm.get('is_enabled', True)
+            )
+            for alarm, condition_id in zip(alarm_list, condition_ids)
+        ]
+
+        query = (
+            f"INSERT INTO alarm ({', '.join(columns)}) "
+            f"VALUES {self.to_values_placeholders(len(rows), len(columns))} RETURNING alarm_id"
+        )
+
+        return query, tuple(value for row in rows for value in row)
+
+    
+    # 채널의 알림을 한 번에 활성화/비활성화하는 UPDATE문 작성 (alarm_ids가 None이면 채널의 모든 알림)
+    # 결과 행: (alarm_id, )
+    def build_update_alarms_enabled_query(self, channel_id: int, is_enabled: bool, alarm_ids: list = None) -> tuple:
+        query = "UPDATE alarm SET is_enabled=$1 WHERE channel_id=$2"
+        params = (is_enabled, channel_id)
+
+        if alarm_ids is not None:
+            query += " AND alarm_id = ANY($3)"
+            params += (list(alarm_ids), )
+
+        return query + " RETURNING alarm_id", params
+
+    
+    # 알림 ID 목록에 해당하는 알림 정보를 알림 규칙과 JOIN하는 SELECT문 작성
+    def build_select_alarms_in_query(self, alarm_ids: list) -> tuple:
+        return self.build_join_alarms_query("alarm.alarm_id = ANY($1)"), (list(alarm_ids), )
+
+    
+    # 알림 규칙 종류와 내용으로 알림을 조회하는 SELECT문 작성
+    # kind: 알림 규칙 종류 ('whale', 'tick', 'bollinger_band', 'rsi')
+    # condition_params: 해당 종류의 알림 규칙에서 일치해야 하는 항목 (예: {'interval': '1m'})
+    #                   None이면 해당 종류의 알림 규칙이 있는 모든 알림
+    # kwargs: alarm 테이블의 컬럼 조건 (예: is_enabled=True)
+    # JSONB 포함 연산자(@>)로 비교하므로 condition 테이블의 GIN 색인을 사용함
+    def build_select_alarms_by_condition_query(self, kind: str, condition_params: dict = None, **kwargs) -> tuple:
+        if kind not in CONDITION_KINDS:
+            raise ValueError(f"Unknown condition: {kind}")
+
+        condition_states = []
+        params = tuple(kwargs.values())
+
+        if kwargs != {}:
+            alarm_columns = [f"alarm.{key}" for key in kwargs.keys()]
+            condition_states.append(self.to_placeholder_statement(alarm_columns, " AND "))
+
+        if condition_params:
+            # 저장된 알림 규칙과 같은 형식(14.0 -> 14 등)으로 맞춰 비교
+            condition_states.append(f"condition.{kind} @> ${len(params) + 1}")
+            params += (canonicalize_value(condition_params), )
+
+        else:
+            condition_states.append(f"condition.{kind} IS NOT NULL")
+
+        return self.build_join_alarms_query(" AND ".join(condition_states)), params
+
+    
+    # UPDATE문 작성
+    def build_update_query(self, table_name: str, primary_key, **kwargs) -> tuple:
+        primary_column = self.get_primary_column(table_name)
+        columns = list(kwargs.keys())
+
+        query = f"UPDATE {table_name} SET {self.to_placeholder_statement(columns)} WHERE {primary_column}=${len(columns) + 1}"
+
+        return query, (*kwargs.values(), primary_key)
+
+    
+    # DELETE문 작성
+    def build_delete_query(self, table_name: str, **kwargs) -> tuple:
+        query = f"DELETE FROM {table_name}"
+
+        # 조건 지정
+        if kwargs != {}:
+            query += " WHERE " + self.to_placeholder_statement(kwargs.keys(), " AND ")
+
+        return query, tuple(kwargs.values())
+
+    
+    # 해당 열이 해당 테이블에 존재하는지 확인하는 SELECT문 작성
+    def build_is_exists_query(self, table_name: str, primary_key=None, **kwargs) -> tuple:
+        if primary_key != None:
+            primary_column = self.get_primary_column(table_name)
+            condition_state = f"{primary_column}=$1"
+            params = (primary_key, )
+
+        else:
+            condition_state = self.to_placeholder_statement(kwargs.keys(), " AND ")
+            params = tuple(kwargs.values())
+        
+        query = f"SELECT EXISTS(SELECT {table_name}_id FROM {table_name} WHERE {condition_state})"
+
+        return query, params
+
+
+# 스키마의 각 테이블에 대한 결과 행 클래스를 미리 생성
+for table_schema in QueryBuilder.schema.values():
+    get_row_class(table_schema.keys())
 
+
+class Database(QueryBuilder):
     class ExistingDataError(Exception):
         def __init__(self):
             super().__init__('This data already exists.')
 
 
-    def __init__(self, database_url: str, debug=False):
-        self.conn = connect(database_url)
+    # min_connections: 풀이 항상 유지하는 커넥션 수
+    # max_connections: 동시에 빌려줄 수 있는 최대 커넥션 수 (초과 요청은 반납될 때까지 대기)
+    # pool_timeout: 커넥션 반납을 기다리는 최대 시간 (초, 넘으면 PoolTimeoutError)
+    # existence_cache_ttl: 존재 여부 캐시 유효 시간 (초, None이면 만료되지 않음)
+    # listen_invalidations: True이면 다른 프로세스와 LISTEN/NOTIFY로 존재 여부 캐시 무효화와 리소스 버전 변경을 주고받음
+    def __init__(self, database_url: str, debug=False, min_connections: int = 1, max_connections: int = 10,
+                 existence_cache_ttl: float = EXISTENCE_CACHE_TTL, listen_invalidations: bool = False,
+                 pool_timeout: float = POOL_TIMEOUT):
+        self.pool = create_pool(database_url, min_connections, max_connections)
+        self.pool_semaphore = threading.BoundedSemaphore(max_connections)
+        self.pool_timeout = pool_timeout
         self.debug = debug
 
-        self.conn.autocommit = True
+        # 쿼리문 -> prepared statement 이름
+        self.statement_names = {}
+        self.statement_lock = threading.Lock()
+
+        # 스레드별 진행 중인 트랜잭션 (커넥션, 커밋 후 실행할 함수 목록)
+        self.local = threading.local()
+
+        self.existence_cache = ExistenceCache(existence_cache_ttl)
+        self.resource_versions = ResourceVersions()
+        self.invalidation_listener = None
+        if listen_invalidations:
+            # 연결이 끊긴 동안의 버전 변경은 받지 못하므로 LISTEN을 (다시) 시작할 때마다 모든 ETag를 무효화
+            self.invalidation_listener = NotificationListener(
+                database_url, [INVALIDATION_CHANNEL, VERSION_CHANNEL], self.on_invalidation,
+                on_listen=self.resource_versions.renew_epoch
+            )
+
+
+    # 풀에서 커넥션을 빌려오고 사용이 끝나면 반납
+    # 끊어진 커넥션은 반납 시 폐기되어 다음 대여 때 새 커넥션으로 대체됨
+    # 현재 스레드에서 트랜잭션이 진행 중이면 트랜잭션의 커넥션을 사용
+    # pool_timeout 안에 빌려올 커넥션이 없으면 PoolTimeoutError 발생
+    @contextmanager
+    def connection(self):
+        transaction_conn = self.get_transaction_connection()
+        if transaction_conn is not None:
+            yield transaction_conn
+            return
+
+        if not self.pool_semaphore.acquire(timeout=self.pool_timeout):
+            raise PoolTimeoutError()
+
+        try:
+            conn = self.pool.getconn()
+
+            # 헬스 체크: 이미 닫힌 커넥션이면 폐기 후 새로 받아옴
+            if conn.closed:
+                self.pool.putconn(conn, close=True)
+                conn = self.pool.getconn()
+
+            conn.autocommit = True
+
+            is_broken = False
+            try:
+                yield conn
+
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                is_broken = True
+                raise
+
+            finally:
+                self.pool.putconn(conn, close=is_broken or bool(conn.closed))
+
+        finally:
+            self.pool_semaphore.release()
+
+
+    # 현재 스레드에서 진행 중인 트랜잭션의 커넥션 반환 (없으면 None)
+    def get_transaction_connection(self):
+        return getattr(self.local, 'conn', None)
 
     
-    # SQL 쿼리문을 작성할 때 코드의 변수를 조건문의 비교 값으로 사용하기 위해
-    #   1) 변수가 문자열이라면 따옴표로 감쌈
-    #   2) 변수가 부울형이라면 정수형으로 변환
-    @staticmethod
-    def to_comparison_value(value):
-        if type(value) == str:
-            return f'\'{value}\''
+    # 블록 안에서 실행되는 현재 스레드의 모든 쿼리문을 하나의 트랜잭션으로 묶음
+    # 블록이 정상 종료되면 커밋하고, 예외가 발생하면 롤백 후 예외를 다시 발생시킴
+    # 이미 트랜잭션 안이라면 바깥 트랜잭션에 합쳐짐
+    #   with database.transaction():
+    #       database.insert(...)
+    #       database.update(...)
+    @contextmanager
+    def transaction(self):
+        transaction_conn = self.get_transaction_connection()
+        if transaction_conn is not None:
+            yield transaction_conn
+            return
 
-        elif type(value) == dict:
-            return f"\'{json.dumps(value)}\'"
+        is_committed = False
+        after_commit = []
+
+        with self.connection() as conn:
+            conn.autocommit = False
+            self.local.conn = conn
+            self.local.after_commit = after_commit
+
+            try:
+                yield conn
+                conn.commit()
+                is_committed = True
+
+            except BaseException:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+
+            finally:
+                self.local.conn = None
+                self.local.after_commit = None
+
+                if not conn.closed:
+                    conn.autocommit = True
+
+        # 커밋된 변경 사항만 캐시에 반영
+        if is_committed:
+            for callback in after_commit:
+                callback()
+
+    
+    # 트랜잭션 안이라면 커밋된 뒤에, 아니라면 바로 callback을 실행
+    def on_commit(self, callback):
+        if self.get_transaction_connection() is not None:
+            self.local.after_commit.append(callback)
 
-        elif value == None:
-            return 'null'
-        
         else:
-            return str(value)
+            callback()
 
     
-    # 매개변수의 키와 값으로 SQL 쿼리문에 작성할 조건문을 작성
+    # 풀의 모든 커넥션을 닫음
+    def close(self):
+        if self.invalidation_listener is not None:
+            self.invalidation_listener.stop()
+
+        self.pool.closeall()
+
+    
+    # 코드의 변수를 쿼리문의 바인딩 값으로 사용하기 위해
+    #   1) 변수가 딕셔너리라면 JSON으로 변환
+    #   2) 그 외의 변수는 psycopg2가 자료형에 맞게 변환하도록 그대로 전달
     @staticmethod
-    def to_parameter_statement(seperator=", ", *args, **kwargs):
-        parameter_list = []
+    def to_bind_value(value):
+        if type(value) == dict:
+            return Json(value)
 
-        if args == ():    # 키워드 인수로 비교 값이 전달될 경우
-            for key, value in kwargs.items():
-                parameter_list.append(f"{key}={Database.to_comparison_value(value)}")
-        
-        elif kwargs == {}:    # 위치 인수로 비교 값이 전달될 경우
-            parameter_list = [Database.to_comparison_value(value) for value in args]
-            
-        return seperator.join(parameter_list)
+        else:
+            return value
+
+
+    # 쿼리문 모양에 대응하는 prepared statement 이름 반환
+    # 테이블과 컬럼 목록이 같은 쿼리문은 같은 문자열이 되므로 같은 이름을 공유
+    def get_statement_name(self, query: str) -> str:
+        with self.statement_lock:
+            if query not in self.statement_names:
+                self.statement_names[query] = f"stmt_{len(self.statement_names)}"
+
+            return self.statement_names[query]
+
+    
+    # 풀에서 빌린 커넥션으로 쿼리문을 실행하고 (컬럼 목록, 결과 행 목록)을 반환
+    # 결과 집합이 없는 쿼리문이면 (None, None) 반환
+    # prepared=True이면 쿼리문을 서버 측 prepared statement로 준비한 뒤 EXECUTE로 실행
+    def fetch(self, query: str, params: tuple = (), prepared: bool = False):
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                if prepared:
+                    statement_name = self.get_statement_name(query)
+
+                    try:
+                        self.execute_prepared(conn, cursor, statement_name, query, params)
+
+                    # 마이그레이션으로 테이블이 바뀌어 준비해 둔 statement의 결과 형식이 달라진 경우
+                    # ("cached plan must not change result type"), 해당 statement를 다시 준비해야 함
+                    except psycopg2.errors.FeatureNotSupported:
+                        if statement_name not in conn.prepared_statements:
+                            raise
+
+                        conn.prepared_statements.discard(statement_name)
+                        conn.stale_statements.add(statement_name)
+
+                        # 트랜잭션 안이라면 트랜잭션이 중단되었으므로 재시도하지 않음 (다음 사용 때 다시 준비됨)
+                        if not conn.autocommit:
+                            raise
+
+                        self.execute_prepared(conn, cursor, statement_name, query, params)
+
+                else:
+                    cursor.execute(query, params)
+
+                if cursor.description is None:
+                    return None, None
+
+                column = [tu[0] for tu in cursor.description]
+
+                return column, cursor.fetchall()
+
+
+    # prepared statement를 (커넥션에 아직 준비되지 않았다면 준비한 뒤) 실행
+    @staticmethod
+    def execute_prepared(conn, cursor, statement_name: str, query: str, params: tuple):
+        # prepared statement는 커넥션마다 따로 준비해야 함
+        if statement_name not in conn.prepared_statements:
+            if statement_name in conn.stale_statements:
+                cursor.execute(f"DEALLOCATE {statement_name}")
+                conn.stale_statements.discard(statement_name)
+
+            cursor.execute(f"PREPARE {statement_name} AS {query}")
+            conn.prepared_statements.add(statement_name)
+
+        if len(params) == 0:
+            cursor.execute(f"EXECUTE {statement_name}")
+
+        else:
+            cursor.execute(f"EXECUTE {statement_name} ({', '.join(['%s'] * len(params))})", params)
 
     
     # 쿼리문을 실행
-    def execute(self, query: str) -> ResultSet:
+    # prepared=False이면 쿼리문의 자리 표시자는 %s, prepared=True이면 $1, $2, ... 형식
+    # 커넥션이 끊어져 실패한 경우 idempotent한 쿼리문만 새 커넥션으로 한 번 재시도
+    #   idempotent: 다시 실행해도 결과가 같은 쿼리문인지 (None이면 SELECT문만 해당)
+    #   쓰기 쿼리문은 서버에서 이미 커밋된 뒤 응답만 받지 못했을 수 있으므로 재시도하지 않음 (예: 알림이 두 번 등록됨)
+    def execute(self, query: str, params: tuple = (), prepared: bool = False, idempotent: bool = None) -> ResultSet:
+        params = tuple(self.to_bind_value(value) for value in params)
+
         if self.debug:
             print("================")
             print(f"Query: {query}")
-
-        cursor = self.conn.cursor()
-        cursor.execute(query)
+            print(f"Params: {params}")
 
         try:
-            column = [tu[0] for tu in cursor.description]
-            result = cursor.fetchall()
+            column, result = self.fetch(query, params, prepared)
+
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # 트랜잭션 안에서는 앞선 쿼리문이 함께 사라졌으므로 재시도하지 않음
+            if self.get_transaction_connection() is not None:
+                raise
+
+            if idempotent is None:
+                idempotent = READ_QUERY_PATTERN.match(query) is not None
+
+            if not idempotent:
+                raise
+
+            column, result = self.fetch(query, params, prepared)
 
-        except TypeError:
+        if column is None:
             return ResultSet([], [])
 
         else:
@@ -124,73 +722,302 @@ class Database:
             return result_set   # 결과 집합 반환
 
     
-    # 해당 테이블의 컬럼명 반환
-    def get_primary_column(self, table_name: str) -> str:
-        primary_column = list(self.schema[table_name].keys())[0]
+    # 서버 측 커서(named cursor)로 쿼리문을 실행하고 결과 행을 fetch_size개씩 받아오며 하나씩 반환하는 제너레이터
+    # 결과 전체를 메모리에 올리지 않으므로 행 수와 관계없이 메모리 사용량이 일정함
+    # 제너레이터를 끝까지 소비하거나 닫기 전까지 풀의 커넥션 하나를 점유하므로,
+    # 소비 속도를 외부(HTTP 클라이언트 등)가 정하는 곳에서는 사용하지 않고 내부 일괄 처리에만 사용
+    def stream(self, query: str, params: tuple = (), fetch_size: int = STREAM_FETCH_SIZE):
+        # 서버 측 커서는 prepared statement를 사용할 수 없으므로 $n 자리 표시자를 psycopg2의 %s로 변환
+        placeholder_pattern = re.compile(r'\$(\d+)')
+        format_params = tuple(
+            self.to_bind_value(params[int(number) - 1]) for number in placeholder_pattern.findall(query)
+        )
+        format_query = placeholder_pattern.sub('%s', query.replace('%', '%%'))
+
+        if self.debug:
+            print("================")
+            print(f"Stream query: {query}")
+            print(f"Params: {params}")
+
+        def fetch_rows(conn):
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = fetch_size
+                cursor.execute(format_query, format_params)
+
+                row_class = None
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if len(rows) == 0:
+                        break
+
+                    if row_class is None:
+                        row_class = get_row_class([tu[0] for tu in cursor.description])
+
+                    for row in rows:
+                        yield row_class(row)
+
+        # 진행 중인 트랜잭션이 있으면 그 안에서 읽음
+        transaction_conn = self.get_transaction_connection()
+        if transaction_conn is not None:
+            yield from fetch_rows(transaction_conn)
+            return
+
+        # 서버 측 커서는 트랜잭션 안에서만 사용할 수 있음
+        # 제너레이터가 멈춰 있는 동안 같은 스레드의 다른 쿼리문이 섞이지 않도록 스레드에 묶지 않은 별도 트랜잭션을 사용
+        with self.connection() as conn:
+            conn.autocommit = False
+
+            try:
+                yield from fetch_rows(conn)
+                conn.commit()
+
+            except BaseException:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+
+            finally:
+                if not conn.closed:
+                    conn.autocommit = True
 
-        return primary_column
-        
     
     # SELECT문 실행
     def select(self, table_name: str, **kwargs) -> ResultSet:
-        query = f"SELECT * FROM {table_name}"
+        result_set = self.execute(*self.build_select_query(table_name, **kwargs), prepared=True)
+
+        return result_set   # 결과 집합 반환
+
     
-        # 조건 지정
-        if kwargs != {}:
-            query += " WHERE " + self.to_parameter_statement(**kwargs)
+    # 알림 정보와 해당 알림의 알림 규칙을 JOIN하여 한 번의 쿼리로 조회
+    def select_alarms(self, **kwargs) -> ResultSet:
+        result_set = self.execute(*self.build_select_alarms_query(**kwargs), prepared=True)
 
-        result_set = self.execute(query)
+        return result_set   # 결과 집합 반환
+
+    
+    # SELECT문 결과를 서버 측 커서로 스트리밍
+    def iter_select(self, table_name: str, fetch_size: int = STREAM_FETCH_SIZE, **kwargs):
+        return self.stream(*self.build_select_query(table_name, **kwargs), fetch_size=fetch_size)
+
+    
+    # 알림 ID 목록에 해당하는 알림 정보를 알림 규칙과 JOIN하여 한 번의 쿼리로 조회
+    def select_alarms_in(self, alarm_ids: list) -> ResultSet:
+        result_set = self.execute(*self.build_select_alarms_in_query(alarm_ids), prepared=True)
 
         return result_set   # 결과 집합 반환
 
     
+    # 알림 규칙이 포함된 알림 정보를 서버 측 커서로 스트리밍
+    def iter_alarms(self, fetch_size: int = STREAM_FETCH_SIZE, **kwargs):
+        return self.stream(*self.build_select_alarms_query(**kwargs), fetch_size=fetch_size)
+
+    
+    # 알림 규칙 종류와 내용으로 알림 조회
+    #   database.select_alarms_by_condition('rsi', {'interval': '1m'}, is_enabled=True)
+    def select_alarms_by_condition(self, kind: str, condition_params: dict = None, **kwargs) -> ResultSet:
+        query, params = self.build_select_alarms_by_condition_query(kind, condition_params, **kwargs)
+
+        return self.execute(query, params, prepared=True)
+
+    
+    # 알림 규칙 종류와 내용으로 조회한 알림을 서버 측 커서로 스트리밍
+    def iter_alarms_by_condition(self, kind: str, condition_params: dict = None,
+                                 fetch_size: int = STREAM_FETCH_SIZE, **kwargs):
+        query, params = self.build_select_alarms_by_condition_query(kind, condition_params, **kwargs)
+
+        return self.stream(query, params, fetch_size=fetch_size)
+
+    
     # INSERT문 실행
     def insert(self, table_name: str, **kwargs) -> int:
-        columns = tuple(kwargs.keys())
-        values = tuple(kwargs.values())
+        result_set = self.execute(*self.build_insert_query(table_name, **kwargs), prepared=True)
+        primary_key = result_set.to_list()[0][0]
 
-        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({self.to_parameter_statement(', ', *values)}) RETURNING {table_name}_id;"
+        self.on_commit(lambda: self.existence_cache.set(table_name, primary_key, True))
+        self.publish_invalidation(table_name, primary_key)
+        self.bump_version(table_name, kwargs.get(self.version_scopes.get(table_name)))
         
-        result_set = self.execute(query)
-        
-        return result_set.to_list()[0][0]
+        return primary_key
+    
     
+    # 알림 규칙 INSERT문 실행 (내용이 같은 알림 규칙은 공유)
+    # 이미 있는 알림 규칙이면 기존 알림 규칙의 ID를 조회해 반환
+    # 같은 내용이면 같은 알림 규칙 ID를 돌려주므로 다시 실행해도 됨
+    def insert_condition(self, condition: dict) -> int:
+        query, values = self.build_insert_condition_query(condition)
+
+        result_set = self.execute(query, values, prepared=True, idempotent=True)
+        if len(result_set.to_list()) > 0:
+            return result_set.to_list()[0][0]
+
+        result_set = self.execute(*self.build_select_condition_ids_query([values[-1]]), prepared=True)
+
+        return result_set.to_list()[0][1]
+
+    
+    # 한 채널에 여러 알림을 한 트랜잭션으로 등록하고 등록된 알림 ID 목록을 반환
+    # alarm_list의 각 요소: {'exchange_id', 'base_symbol', 'quote_symbol', 'condition', ('is_enabled')}
+    # 알림 규칙과 알림을 각각 하나의 다중 행 INSERT ... RETURNING으로 삽입
+    def insert_alarms(self, channel_id: int, alarm_list: list) -> list:
+        if len(alarm_list) == 0:
+            return []
+
+        condition_values, alarm_hashes = self.collect_condition_values(alarm_list)
+
+        with self.transaction() as conn:
+            with conn.cursor() as cursor:
+                condition_rows = execute_values(
+                    cursor,
+                    f"INSERT INTO condition ({', '.join(CONDITION_KINDS)}, condition_hash) VALUES %s "
+                    f"ON CONFLICT (condition_hash) DO NOTHING RETURNING condition_hash, condition_id",
+                    [tuple(self.to_bind_value(value) for value in values) for values in condition_values.values()],
+                    fetch=True
+                )
+                condition_ids = dict(condition_rows)
+
+                # 이미 있던 알림 규칙은 결과 행이 없으므로 ID를 따로 조회
+                existing_hashes = [condition_hash for condition_hash in condition_values.keys() if condition_hash not in condition_ids]
+                if len(existing_hashes) > 0:
+                    cursor.execute(
+                        "SELECT condition_hash, condition_id FROM condition WHERE condition_hash = ANY(%s)",
+                        (existing_hashes, )
+                    )
+                    condition_ids.update(cursor.fetchall())
+
+                alarm_rows = execute_values(
+                    cursor,
+                    "INSERT INTO alarm (channel_id, exchange_id, base_symbol, quote_symbol, condition_id, is_enabled) "
+                    "VALUES %s RETURNING alarm_id",
+                    [
+                        (
+                            channel_id, alarm['exchange_id'], alarm['base_symbol'], alarm['quote_symbol'],
+                            condition_ids[condition_hash], alarm.get('is_enabled', True)
+                        )
+                        for alarm, condition_hash in zip(alarm_list, alarm_hashes)
+                    ],
+                    fetch=True
+                )
+
+            alarm_ids = [row[0] for row in alarm_rows]
+            for alarm_id in alarm_ids:
+                self.on_commit(lambda alarm_id=alarm_id: self.existence_cache.set('alarm', alarm_id, True))
+
+            # 알림마다 알리지 않고 테이블 단위로 한 번만 알림 (알림 수만큼 쿼리문을 더 실행하지 않도록)
+            self.publish_invalidation('alarm')
+            self.bump_version('alarm', channel_id)
+
+        return alarm_ids
+
+    
+    # 채널의 알림을 한 번에 활성화/비활성화하고 변경된 알림 ID 목록을 반환
+    # alarm_ids가 None이면 채널의 모든 알림을 변경
+    def update_alarms_enabled(self, channel_id: int, is_enabled: bool, alarm_ids: list = None) -> list:
+        query, params = self.build_update_alarms_enabled_query(channel_id, is_enabled, alarm_ids)
+        result_set = self.execute(query, params, prepared=True)
+        self.bump_version('alarm', channel_id)
+
+        return [row[0] for row in result_set.to_list()]
+
     
     # UPDATE문 실행
     def update(self, table_name: str, primary_key, **kwargs):
-        primary_column = self.get_primary_column(table_name)
-        columns = list(kwargs.keys())
+        query, params = self.build_update_query(table_name, primary_key, **kwargs)
+        self.execute_and_bump_version(table_name, query, params, kwargs)
 
-        query = f"UPDATE {table_name} SET {self.to_parameter_statement(**kwargs)} WHERE {primary_column}={self.to_comparison_value(primary_key)}"
-
-        self.execute(query)
+        # 기본 키가 바뀌었다면 해당 테이블의 존재 여부 캐시를 비움
+        if self.get_primary_column(table_name) in kwargs.keys():
+            self.invalidate_existence(table_name)
 
     
     # DELETE문 실행
     def delete(self, table_name: str, **kwargs):
-        query = f"DELETE FROM {table_name}"
+        query, params = self.build_delete_query(table_name, **kwargs)
+        self.execute_and_bump_version(table_name, query, params, kwargs)
 
-        # 조건 지정
-        if kwargs != {}:
-            print(kwargs)
-            query += " WHERE " + self.to_parameter_statement(**kwargs)
+        primary_column = self.get_primary_column(table_name)
+        if list(kwargs.keys()) == [primary_column]:
+            self.on_commit(lambda: self.existence_cache.set(table_name, kwargs[primary_column], False))
+            self.publish_invalidation(table_name, kwargs[primary_column])
+
+        else:
+            self.invalidate_existence(table_name)
+
+        # 외래 키로 함께 삭제된 행이 있을 수 있음
+        for dependent_table in self.get_dependent_tables(table_name):
+            self.invalidate_existence(dependent_table)
+            self.bump_version(dependent_table)
+
+    
+    # UPDATE/DELETE문을 실행하고 바뀐 리소스의 버전을 올림
+    # 범위 컬럼이 있는 테이블은 RETURNING으로 영향받은 범위를 받아와 해당 범위의 버전만 올림
+    def execute_and_bump_version(self, table_name: str, query: str, params: tuple, kwargs: dict):
+        scope_column = self.version_scopes.get(table_name)
+
+        # 범위 컬럼 자체가 바뀌면 이전 범위를 알 수 없으므로 테이블 전체의 버전을 올림
+        if scope_column is None or scope_column in kwargs.keys():
+            self.execute(query, params, prepared=True)
+            self.bump_version(table_name)
+            return
+
+        result_set = self.execute(f"{query} RETURNING {scope_column}", params, prepared=True)
+        for scope in {row[0] for row in result_set.to_list()}:
+            self.bump_version(table_name, scope)
+
+    
+    # 리소스 버전을 올림 (트랜잭션 안이라면 커밋된 뒤에 반영)
+    # scope가 None이면 테이블 전체
+    def bump_version(self, table_name: str, scope=None):
+        self.on_commit(lambda: self.resource_versions.bump(table_name, scope))
+
+        if self.invalidation_listener is not None:
+            payload = self.resource_versions.to_payload(table_name, scope)
+            self.execute("SELECT pg_notify($1, $2)", (VERSION_CHANNEL, payload), prepared=True)
+
+    
+    # 리소스의 현재 버전 (ETag 값) 반환
+    def get_version(self, table_name: str, scope=None) -> str:
+        return self.resource_versions.get(table_name, scope)
+
+    
+    # 존재 여부 캐시 무효화 (primary_key가 None이면 테이블 전체)
+    def invalidate_existence(self, table_name: str, primary_key=None):
+        self.existence_cache.invalidate(table_name, primary_key)
+        self.on_commit(lambda: self.existence_cache.invalidate(table_name, primary_key))
+        self.publish_invalidation(table_name, primary_key)
+
+    
+    # 다른 프로세스에 존재 여부 캐시 무효화를 알림 (페이로드: '테이블' 또는 '테이블:기본 키')
+    # 트랜잭션 안에서 보낸 알림은 커밋될 때 전달됨
+    def publish_invalidation(self, table_name: str, primary_key=None):
+        if self.invalidation_listener is None:
+            return
+
+        payload = table_name if primary_key is None else f"{table_name}:{primary_key}"
+        self.execute("SELECT pg_notify($1, $2)", (INVALIDATION_CHANNEL, payload), prepared=True)
+
+    
+    # 다른 프로세스(또는 이 프로세스)에서 보낸 존재 여부 캐시 무효화 / 리소스 버전 변경 알림 처리
+    def on_invalidation(self, channel: str, payload: str):
+        apply_notification(self.existence_cache, self.resource_versions, channel, payload)
 
-        self.execute(query)
 
     
     # 해당 열이 해당 테이블에 존재하는지 확인
+    # 기본 키로 확인하는 경우 존재 여부 캐시를 먼저 확인
     def is_exists(self, table_name: str, primary_key=None, **kwargs) -> bool:
         if primary_key != None:
-            primary_column = self.get_primary_column(table_name)
-            condition_state = f"{primary_column}={self.to_comparison_value(primary_key)}"
+            is_exists = self.existence_cache.get(table_name, primary_key)
+            if is_exists is not None:
+                return is_exists
 
-        else:
-            condition_state = self.parameter_statement(**kwargs)
-        
-        query = f"SELECT EXISTS(SELECT {table_name}_id FROM {table_name} WHERE {condition_state});"
-        result_set = self.execute(query)
+        result_set = self.execute(*self.build_is_exists_query(table_name, primary_key, **kwargs), prepared=True)
+        is_exists = bool(result_set.to_list()[0][0])
+
+        # 트랜잭션 안에서 읽은 결과는 롤백되면 틀린 값이 되므로 커밋된 뒤에 캐시
+        if primary_key != None:
+            self.on_commit(lambda: self.existence_cache.set(table_name, primary_key, is_exists))
 
-        return bool(result_set.to_list()[0][0])
+        return is_exists
 
     
     def is_exchange_exists(self, exchange_id: int) -> bool:
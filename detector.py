@@ -0,0 +1,190 @@
+# 고래(whale)/틱(tick) 체결 감지 엔진
+#   whale: 체결 금액(가격 x 수량, 견적 자산 기준)이 설정한 quantity 이상인 체결
+#   tick: 체결 수량(기초 자산 기준)이 설정한 quantity 이상인 체결
+import sys
+import bisect
+from collections import namedtuple
+from typing import List
+
+from condition import InvalidConditionError, validate_threshold_spec
+
+
+# 거래소에서 받은 체결 정보
+Trade = namedtuple('Trade', ['exchange_id', 'base_symbol', 'quote_symbol', 'price', 'quantity', 'timestamp'])
+
+# 감지된 알림 (kind: 'whale' 또는 'tick')
+Alert = namedtuple('Alert', ['kind', 'alarm', 'trade'])
+
+
+# 감지 엔진이 사용하는 알림 정보
+class AlarmRule:
+    __slots__ = ('alarm_id', 'channel_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'condition')
+
+    def __init__(self, alarm_id: int, channel_id: int, exchange_id: int, base_symbol: str, quote_symbol: str, condition: dict):
+        self.alarm_id = alarm_id
+        self.channel_id = channel_id
+        self.exchange_id = exchange_id
+        self.base_symbol = base_symbol
+        self.quote_symbol = quote_symbol
+        self.condition = condition
+
+    
+    # Database.select_alarms로 조회한 행으로부터 생성
+    @classmethod
+    def from_row(cls, row):
+        condition = {
+            key: row[key] for key in ('whale', 'tick', 'bollinger_band', 'rsi') if row[key] is not None
+        }
+
+        return cls(row['alarm_id'], row['channel_id'], row['exchange_id'], row['base_symbol'], row['quote_symbol'], condition)
+
+    
+    def get_market(self) -> tuple:
+        return self.exchange_id, self.base_symbol, self.quote_symbol
+
+
+# 한 종목에 걸린 알림을 기준값 오름차순으로 정렬해 보관
+# 체결이 들어오면 이진 탐색으로 기준값 이하인 알림 구간만 꺼냄
+class ThresholdList:
+    __slots__ = ('thresholds', 'alarms')
+
+    def __init__(self):
+        self.thresholds = []
+        self.alarms = []
+
+    
+    def add(self, threshold: float, alarm: AlarmRule):
+        position = bisect.bisect_right(self.thresholds, threshold)
+
+        self.thresholds.insert(position, threshold)
+        self.alarms.insert(position, alarm)
+
+    
+    def remove(self, alarm_id: int):
+        for position, alarm in enumerate(self.alarms):
+            if alarm.alarm_id == alarm_id:
+                del self.thresholds[position]
+                del self.alarms[position]
+
+                return
+
+    
+    # 기준값이 value 이하인 알림 목록 반환
+    def match(self, value: float) -> List[AlarmRule]:
+        if len(self.thresholds) == 0 or value < self.thresholds[0]:
+            return []
+
+        return self.alarms[:bisect.bisect_right(self.thresholds, value)]
+
+    
+    def __len__(self):
+        return len(self.alarms)
+
+
+# 종목(거래소 ID, 기초 자산, 견적 자산)별 알림 색인
+class AlarmIndex:
+    def __init__(self):
+        self.whale = {}     # 종목 -> ThresholdList
+        self.tick = {}      # 종목 -> ThresholdList
+        self.alarms = {}    # 알림 ID -> AlarmRule
+
+    
+    # 데이터베이스에서 활성화된 알림을 불러와 색인 생성
+    # kinds: 불러올 알림 규칙 종류 목록 (None이면 모든 알림, 예: ('whale', 'tick')이면 체결 감지에 필요한 알림만)
+    @classmethod
+    def from_database(cls, database, kinds=None):
+        index = cls()
+
+        if kinds is None:
+            for row in database.iter_alarms(is_enabled=True):
+                index.add(AlarmRule.from_row(row))
+
+        else:
+            # 여러 종류의 알림 규칙을 가진 알림은 여러 번 조회되지만 add가 기존 항목을 교체함
+            for kind in kinds:
+                for row in database.iter_alarms_by_condition(kind, is_enabled=True):
+                    index.add(AlarmRule.from_row(row))
+
+        return index
+
+    
+    # 알림을 색인에 추가 (같은 ID의 알림이 있으면 교체)
+    # 고래/틱 조건이 잘못된 알림은 기록하고 건너뛰며(기존 항목은 제거), 추가했는지 반환
+    def add(self, alarm: AlarmRule) -> bool:
+        if alarm.alarm_id in self.alarms:
+            self.remove(alarm.alarm_id)
+
+        try:
+            for kind in ('whale', 'tick'):
+                if kind in alarm.condition:
+                    validate_threshold_spec(kind, alarm.condition[kind])
+
+        except InvalidConditionError as e:
+            print(f"skipping alarm {alarm.alarm_id}: invalid condition ({e})", file=sys.stderr)
+            return False
+
+        self.alarms[alarm.alarm_id] = alarm
+        market = alarm.get_market()
+
+        if 'whale' in alarm.condition:
+            self.whale.setdefault(market, ThresholdList()).add(alarm.condition['whale']['quantity'], alarm)
+
+        if 'tick' in alarm.condition:
+            self.tick.setdefault(market, ThresholdList()).add(alarm.condition['tick']['quantity'], alarm)
+
+        return True
+
+    
+    def remove(self, alarm_id: int):
+        alarm = self.alarms.pop(alarm_id, None)
+        if alarm is None:
+            return
+
+        market = alarm.get_market()
+        for threshold_dict in (self.whale, self.tick):
+            if market in threshold_dict:
+                threshold_dict[market].remove(alarm_id)
+
+                if len(threshold_dict[market]) == 0:
+                    del threshold_dict[market]
+
+    
+    # 알림이 하나 이상 걸린 종목 목록
+    def get_markets(self) -> set:
+        return {alarm.get_market() for alarm in self.alarms.values()}
+
+
+class Detector:
+    def __init__(self, alarm_index: AlarmIndex, on_alert=None):
+        self.alarm_index = alarm_index
+        self.on_alert = on_alert    # 알림 감지 시 호출할 함수 (Alert를 인수로 받음)
+
+        self.trade_count = 0
+        self.alert_count = 0
+
+    
+    # 체결 하나를 해당 종목의 알림에만 대조해 감지된 알림 목록 반환
+    def process(self, trade: Trade) -> List[Alert]:
+        self.trade_count += 1
+
+        market = (trade.exchange_id, trade.base_symbol, trade.quote_symbol)
+        alerts = []
+
+        whale_list = self.alarm_index.whale.get(market)
+        if whale_list is not None:
+            for alarm in whale_list.match(trade.price * trade.quantity):
+                alerts.append(Alert('whale', alarm, trade))
+
+        tick_list = self.alarm_index.tick.get(market)
+        if tick_list is not None:
+            for alarm in tick_list.match(trade.quantity):
+                alerts.append(Alert('tick', alarm, trade))
+
+        if len(alerts) > 0:
+            self.alert_count += len(alerts)
+
+            if self.on_alert is not None:
+                for alert in alerts:
+                    self.on_alert(alert)
+
+        return alerts
@@ -0,0 +1,160 @@
+# 실시간 체결 감지 서비스
+# 활성화된 알림이 걸린 종목의 체결 스트림을 구독하고 감지된 알림을 출력
+# --notify 옵션을 주면 감지된 알림을 해당 텔레그램 채널로 발송
+# 알림이 추가/수정/삭제되면 알림 변경 피드로 받아 다시 불러오지 않고 바뀐 알림만 반영
+# --workers N 옵션을 주면 종목을 N개의 작업 프로세스에 나누어 감지 (ShardedDetector)
+# --candles 옵션을 주면 마감된 캔들을 해당 경로의 캔들 저장소에 기록하고, 다시 시작할 때 저장된 캔들로 지표를 미리 계산
+# 실행: python detector_service.py [--record 파일 경로] [--notify] [--workers N] [--candles 디렉터리 경로]
+import sys
+import asyncio
+
+from config import tokens
+from database import Database
+from detector import AlarmIndex, Detector
+from indicator import IndicatorEngine, add_alarm_or_skip
+from candle_store import CandleStore
+from alarm_feed import AlarmChangeFeed
+from sharded_detector import ShardedDetector
+from trade_stream import trade_streams, TradeRecorder
+from notifier import NotificationDispatcher
+from telegram_client import get_bot
+
+
+def format_alert(alert) -> str:
+    if alert.kind in ('whale', 'tick'):
+        trade = alert.trade
+        return f"[{alert.kind}] {trade.base_symbol}/{trade.quote_symbol} {trade.quantity} @ {trade.price}"
+
+    else:
+        _, base_symbol, quote_symbol = alert.candle.market
+        return f"[{alert.kind}] {base_symbol}/{quote_symbol} {alert.candle.interval} close {alert.candle.close} ({alert.value:.2f})"
+
+
+def print_alert(alert):
+    print(f"alarm {alert.alarm.alarm_id} (channel {alert.alarm.channel_id}): {format_alert(alert)}")
+
+
+# alarm_feed가 주어지면 알림 변경을 계속 반영하고, 감시 종목이 바뀌면 해당 거래소의 체결 스트림을 다시 구독
+# worker_count가 주어지면 이 프로세스는 체결을 받아 작업 프로세스로 나누어 보내기만 함
+# candle_store_path가 주어지면 마감된 캔들을 기록하고 저장된 캔들로 지표를 미리 계산
+async def run(database: Database, on_alert=print_alert, recorder: TradeRecorder = None, alarm_feed: AlarmChangeFeed = None,
+              worker_count: int = None, candle_store_path: str = None):
+    alarm_index = AlarmIndex.from_database(database)
+
+    candle_store = None
+    if worker_count is None:
+        detector = Detector(alarm_index, on_alert=on_alert)
+
+        if candle_store_path is not None:
+            candle_store = CandleStore(candle_store_path)
+            candle_store.start_compaction()
+
+        # 알림 변경을 반영할 대상 (체결 감지는 alarm_index를 함께 사용하므로 지표 엔진에만 따로 반영)
+        engine = IndicatorEngine(on_alert=on_alert, candle_store=candle_store)
+        for alarm in alarm_index.alarms.values():
+            add_alarm_or_skip(engine, alarm)
+
+        def process(trade):
+            detector.process(trade)
+            engine.process(trade)
+
+    else:
+        engine = ShardedDetector(worker_count, on_alert=on_alert, candle_store_path=candle_store_path)
+        engine.add_alarms(list(alarm_index.alarms.values()))
+
+        process = engine.process
+
+    def on_trade(trade):
+        if recorder is not None:
+            recorder(trade)
+
+        process(trade)
+
+    try:
+        await watch_trades(alarm_index, engine, on_trade, alarm_feed)
+
+    finally:
+        if worker_count is not None:
+            engine.stop()
+
+        if candle_store is not None:
+            candle_store.close()
+
+
+# 알림이 걸린 종목의 체결 스트림을 구독
+async def watch_trades(alarm_index: AlarmIndex, engine, on_trade, alarm_feed: AlarmChangeFeed = None):
+    # 거래소별로 구독할 종목 분류
+    def get_markets_by_exchange() -> dict:
+        markets_by_exchange = {}
+        for exchange_id, base_symbol, quote_symbol in alarm_index.get_markets():
+            markets_by_exchange.setdefault(exchange_id, set()).add((base_symbol, quote_symbol))
+
+        return markets_by_exchange
+
+    if alarm_feed is None:
+        await asyncio.gather(*[
+            trade_streams[exchange_id](sorted(markets), on_trade)
+            for exchange_id, markets in get_markets_by_exchange().items()
+            if exchange_id in trade_streams
+        ])
+        return
+
+    stream_tasks = {}   # 거래소 ID -> (체결 스트림 태스크, 구독 중인 종목 집합)
+
+    # 구독 종목이 바뀐 거래소만 체결 스트림을 다시 시작
+    def update_streams():
+        markets_by_exchange = get_markets_by_exchange()
+
+        for exchange_id in set(stream_tasks.keys()) | set(markets_by_exchange.keys()):
+            markets = markets_by_exchange.get(exchange_id, set())
+            task, subscribed_markets = stream_tasks.get(exchange_id, (None, set()))
+            if markets == subscribed_markets:
+                continue
+
+            if task is not None:
+                task.cancel()
+                del stream_tasks[exchange_id]
+
+            if len(markets) > 0 and exchange_id in trade_streams:
+                task = asyncio.create_task(trade_streams[exchange_id](sorted(markets), on_trade))
+                stream_tasks[exchange_id] = (task, markets)
+
+    update_streams()
+    await alarm_feed.watch(alarm_index, engine, on_markets_changed=update_streams)
+
+
+if __name__ == '__main__':
+    database = Database(tokens['database_url'])
+
+    recorder = None
+    if '--record' in sys.argv:
+        recorder = TradeRecorder(sys.argv[sys.argv.index('--record') + 1])
+
+    on_alert = print_alert
+    dispatcher = None
+    if '--notify' in sys.argv:
+        dispatcher = NotificationDispatcher(lambda chat_id, text: get_bot().send_message(chat_id, text))
+        on_alert = lambda alert: dispatcher.enqueue(alert.alarm.channel_id, format_alert(alert))
+
+    worker_count = None
+    if '--workers' in sys.argv:
+        worker_count = int(sys.argv[sys.argv.index('--workers') + 1])
+
+    candle_store_path = None
+    if '--candles' in sys.argv:
+        candle_store_path = sys.argv[sys.argv.index('--candles') + 1]
+
+    alarm_feed = AlarmChangeFeed(database, tokens['database_url'])
+
+    try:
+        asyncio.run(run(database, on_alert=on_alert, recorder=recorder, alarm_feed=alarm_feed, worker_count=worker_count,
+                        candle_store_path=candle_store_path))
+
+    finally:
+        alarm_feed.stop()
+
+        if recorder is not None:
+            recorder.close()
+
+        if dispatcher is not None:
+            dispatcher.stop()
@@ -2,13 +2,374 @@
 
 import requests
 import json
+import re
+import codecs
+import bisect
+import threading
+import time
 from typing import List
 
+from http_client import REQUEST_TIMEOUT, create_session
+
+
+# 모든 거래소 클라이언트가 공유하는 HTTP 세션
+http_session = None
+http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    global http_session
+
+    with http_session_lock:
+        if http_session is None:
+            http_session = create_session()
+
+        return http_session
+
+
+# 시장 정보 캐시 기본 설정 (초 단위)
+#   MARKET_CACHE_TTL: 캐시된 시장 정보를 최신으로 간주하는 시간
+#   MARKET_CACHE_STALE_TTL: TTL이 지난 뒤에도 백그라운드에서 갱신하는 동안 이전 값을 응답하는 시간
+MARKET_CACHE_TTL = 60
+MARKET_CACHE_STALE_TTL = 600
+
+
+# 한 거래소의 파싱된 시장 정보를 보관하는 캐시
+# 캐시가 비었거나 너무 오래된 경우 한 스레드만 거래소에 요청하고 나머지 스레드는 그 결과를 기다림
+# TTL만 지난 경우에는 이전 값을 바로 반환하고 백그라운드 스레드에서 갱신
+class MarketCache:
+    def __init__(self, fetch, ttl: float = MARKET_CACHE_TTL, stale_ttl: float = MARKET_CACHE_STALE_TTL):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self.value = None
+        self.fetched_at = 0.0
+        self.is_refreshing = False
+
+        self.fetch_lock = threading.Lock()    # 거래소 요청을 한 번만 보내기 위한 락
+        self.state_lock = threading.Lock()    # 백그라운드 갱신 상태를 보호하는 락
+
+    
+    def get_age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    
+    # 거래소에 요청해 캐시를 갱신
+    def refresh(self):
+        value = self.fetch()
+
+        self.value = value
+        self.fetched_at = time.monotonic()
+
+        return value
+
+    
+    # 백그라운드 스레드에서 캐시 갱신
+    # 갱신에 실패하면 이전 값을 유지
+    def refresh_in_background(self):
+        with self.state_lock:
+            if self.is_refreshing:
+                return
+
+            self.is_refreshing = True
+
+        def run():
+            try:
+                with self.fetch_lock:
+                    if self.get_age() >= self.ttl:
+                        self.refresh()
+
+            except Exception:
+                pass
+
+            finally:
+                with self.state_lock:
+                    self.is_refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    
+    # 캐시된 시장 정보 반환
+    def get(self):
+        value, age = self.value, self.get_age()
+
+        if value is not None and age < self.ttl:
+            return value
+
+        if value is not None and age < self.ttl + self.stale_ttl:
+            self.refresh_in_background()
+
+            return value
+
+        with self.fetch_lock:
+            # 락을 기다리는 동안 다른 스레드가 이미 갱신했을 수 있음
+            if self.value is not None and self.get_age() < self.ttl:
+                return self.value
+
+            return self.refresh()
+
+    
+    # 캐시를 비움
+    def clear(self):
+        with self.fetch_lock:
+            self.value = None
+            self.fetched_at = 0.0
+
+
+# 청크 단위로 들어오는 JSON 응답에서 배열의 원소를 하나씩 파싱해 반환하는 제너레이터
+# array_key가 주어지면 해당 키의 배열을, 주어지지 않으면 최상위 배열을 읽음
+# 응답 전체를 메모리에 올리지 않고 현재 파싱 중인 원소만큼의 버퍼만 유지함
+def iter_json_array(chunks, array_key=None):
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunk_iter = iter(chunks)
+
+    if array_key is None:
+        array_start_pattern = re.compile(r'\[')
+    else:
+        array_start_pattern = re.compile(r'"' + re.escape(array_key) + r'"\s*:\s*\[')
+
+    delimiter_pattern = re.compile(r'[\s,\]]')
+
+    buffer = ""
+    is_stream_end = False
+
+    # 버퍼에 다음 청크를 추가. 더 읽을 청크가 없으면 False 반환
+    def read_chunk():
+        nonlocal buffer, is_stream_end
+        if is_stream_end:
+            return False
+
+        try:
+            buffer += text_decoder.decode(next(chunk_iter))
+
+        except StopIteration:
+            buffer += text_decoder.decode(b'', final=True)
+            is_stream_end = True
+
+        return True
+
+    # 배열 시작 위치 탐색
+    while True:
+        match = array_start_pattern.search(buffer)
+        if match is not None:
+            buffer = buffer[match.end():]
+            break
+
+        # 키가 청크 경계에 걸칠 수 있으므로 끝부분은 남겨둠
+        if array_key is not None:
+            buffer = buffer[-(len(array_key) + 64):]
+
+        if not read_chunk():
+            raise ValueError(f"Could not find JSON array: {array_key}")
+
+    # 원소와 구분자(,)가 번갈아 와야 하며, 빠지거나 남는 구분자와 끝나지 않은 배열은 ValueError
+    # (일부만 파싱된 목록으로 캐시를 덮어쓰지 않도록 호출한 쪽에서 이전 값을 유지할 수 있게 함)
+    position = 0
+    expect_element = True   # '[' 또는 ',' 다음이면 True
+    is_empty = True
+    while True:
+        # 공백 건너뛰기
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+
+        if position >= len(buffer):
+            buffer, position = "", 0
+            if not read_chunk():
+                raise ValueError("Unexpected end of JSON array")
+            continue
+
+        char = buffer[position]
+
+        if char == ']':
+            if expect_element and not is_empty:
+                raise json.JSONDecodeError("Trailing ',' in array", buffer, position)
+            return
+
+        if not expect_element:
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+
+            position += 1
+            expect_element = True
+            continue
+
+        if char == ',':
+            raise json.JSONDecodeError("Expecting value", buffer, position)
+
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+
+        except json.JSONDecodeError:
+            # 원소가 아직 다 들어오지 않았으면 다음 청크를 읽고 다시 시도
+            buffer, position = buffer[position:], 0
+            if not read_chunk():
+                raise
+            continue
+
+        # 원소 바로 뒤에는 구분자(공백, ',', ']')가 와야 함
+        # 숫자는 청크 경계에서 "12"나 "2."처럼 잘려도 앞부분만 파싱되므로, 구분자가 보일 때까지 다음 청크를 읽고 다시 시도
+        if end == len(buffer) or buffer[end] not in ' \t\r\n,]':
+            if not is_stream_end and delimiter_pattern.search(buffer, end) is None:
+                buffer, position = buffer[position:], 0
+                read_chunk()
+                continue
+
+            if end == len(buffer):
+                raise ValueError("Unexpected end of JSON array")
+
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, end)
+
+        yield element
+
+        position = end
+        expect_element = False
+        is_empty = False
+        if position > 65536:
+            buffer, position = buffer[position:], 0
+
+
+# 파싱된 시장 정보의 색인
+# 기초 자산/견적 자산별 종목 목록과 화폐 목록을 미리 만들어 두어 조회 시 전체 목록을 훑지 않음
+class MarketIndex:
+    def __init__(self, market_list: List[tuple]):
+        self.currencies = {}        # 화폐 심볼 -> 화폐 정보
+        self.items = []             # 전체 종목 목록
+        self.items_by_base = {}     # 기초 자산 심볼 -> 종목 목록
+        self.items_by_quote = {}    # 견적 자산 심볼 -> 종목 목록
+        self.items_by_pair = {}     # (기초 자산 심볼, 견적 자산 심볼) -> 종목
+
+        for currency, item in market_list:
+            self.currencies.setdefault(currency['symbol'], currency)
+
+            base_symbol, quote_symbol = item['base_symbol'], item['quote_symbol']
+
+            self.items.append(item)
+            self.items_by_base.setdefault(base_symbol, []).append(item)
+            self.items_by_quote.setdefault(quote_symbol, []).append(item)
+            self.items_by_pair[(base_symbol, quote_symbol)] = item
+
+        self.currency_list = list(self.currencies.values())
+
+        # 접두사 검색용 (대문자 심볼, 심볼) 정렬 목록
+        self.sorted_currency_symbols = sorted(
+            (symbol.upper(), symbol) for symbol in self.currencies.keys() if symbol is not None
+        )
+
+    
+    def get_currencies(self) -> List[dict]:
+        return list(self.currency_list)
+
+    
+    # 파라미터에 부합하는 종목 목록 반환
+    # 파라미터가 주어지지 않았을 시 모든 종목 목록 반환
+    def get_items(self, base_symbol=None, quote_symbol=None) -> List[dict]:
+        if base_symbol is not None and quote_symbol is not None:
+            item = self.items_by_pair.get((base_symbol, quote_symbol))
+
+            return [item] if item is not None else []
+
+        elif base_symbol is not None:
+            return list(self.items_by_base.get(base_symbol, []))
+
+        elif quote_symbol is not None:
+            return list(self.items_by_quote.get(quote_symbol, []))
+
+        return list(self.items)
+
+    
+    # 검색어와 일치하는 화폐 심볼 목록을 관련도 순으로 반환
+    #   1) 검색어로 시작하는 심볼 (짧은 심볼 우선)
+    #   2) 검색어의 글자를 순서대로 모두 포함하는 심볼 (글자들이 붙어 있을수록 우선)
+    def search_symbols(self, query: str, limit: int = 20) -> List[str]:
+        query = query.upper()
+        if query == "":
+            return []
+
+        # 정렬 목록에서 접두사가 일치하는 구간을 이진 탐색
+        start = bisect.bisect_left(self.sorted_currency_symbols, (query, ))
+        end = bisect.bisect_left(self.sorted_currency_symbols, (query + '\uffff', ))
+
+        prefix_matches = sorted(
+            (symbol for _, symbol in self.sorted_currency_symbols[start:end]),
+            key=lambda symbol: (len(symbol), symbol)
+        )
+        if len(prefix_matches) >= limit:
+            return prefix_matches[:limit]
+
+        fuzzy_matches = []
+        for upper_symbol, symbol in self.sorted_currency_symbols[:start] + self.sorted_currency_symbols[end:]:
+            span = self.get_match_span(query, upper_symbol)
+            if span is not None:
+                fuzzy_matches.append((span, len(symbol), symbol))
+
+        fuzzy_matches.sort()
+
+        return (prefix_matches + [symbol for _, _, symbol in fuzzy_matches])[:limit]
+
+    
+    # 검색어의 글자가 대상 문자열에 순서대로 모두 등장하면 처음부터 마지막 글자까지의 길이를, 아니면 None을 반환
+    @staticmethod
+    def get_match_span(query: str, target: str):
+        first_position, position = None, -1
+        for character in query:
+            position = target.find(character, position + 1)
+            if position == -1:
+                return None
+
+            if first_position is None:
+                first_position = position
+
+        return position - first_position + 1
+
+    
+    # 검색어와 일치하는 화폐 정보 목록 반환
+    def search_currencies(self, query: str, limit: int = 20) -> List[dict]:
+        return [self.currencies[symbol] for symbol in self.search_symbols(query, limit)]
+
+    
+    # 기초 자산 심볼이 검색어와 일치하는 종목 목록 반환
+    # quote_symbol이 주어지면 해당 견적 자산의 종목만 반환
+    def search_items(self, query: str, quote_symbol=None, limit: int = 20) -> List[dict]:
+        item_list = []
+        for base_symbol in self.search_symbols(query, limit):
+            item_list.extend(self.get_items(base_symbol=base_symbol, quote_symbol=quote_symbol))
+
+        return item_list[:limit]
+
+
+# (거래소 클래스, 도메인) -> MarketCache
+market_caches = {}
+market_caches_lock = threading.Lock()
+
 
 class Exchange:
     domain = ""
     item_info_endpoint = ""
 
+    # 스트리밍 파싱 설정
+    #   stream_item_info: True이면 종목 정보 응답을 청크 단위로 받아 종목별로 파싱
+    #   item_array_key: 종목 정보 배열의 키 (None이면 응답의 최상위 배열)
+    stream_item_info = False
+    item_array_key = None
+    stream_chunk_size = 65536
+
+    # 시장 정보 캐시 유효 시간 (초)
+    market_cache_ttl = MARKET_CACHE_TTL
+    market_cache_stale_ttl = MARKET_CACHE_STALE_TTL
+
+
+    def __init__(self, session: requests.Session = None):
+        self.session = session if session is not None else get_http_session()
+
+    
+    # 공유 세션으로 GET 요청을 보냄
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+
+        return self.session.get(url, **kwargs)
+
 
     # 종목 정보에 대한 API 응답으로부터 종목 정보로 이루어진 이터레이터를 반환하는 함수
     def __item_iter__(self, response_json):
@@ -27,58 +388,107 @@ class Exchange:
         return None, None # 기초 자산 화폐, 견적 자산 화폐
 
     
-    # 전체 화폐 리스트 반환 함수
-    def get_currencies(self):
+    # 거래소에 종목 정보를 요청해 각 종목 정보 json을 반환하는 이터레이터
+    # 스트리밍 모드에서는 응답 전체를 파싱하지 않고 종목 배열의 원소를 하나씩 파싱
+    def iter_item_info(self):
         url = f"{self.domain}{self.item_info_endpoint}"
 
-        currency_list = []
-        for item_info_json in self.__item_iter__(requests.get(url).json()):
+        if not self.stream_item_info:
+            response = self.get(url)
+            response.raise_for_status()
+
+            return self.__item_iter__(response.json())
+
+        def stream():
+            with self.get(url, stream=True) as response:
+                response.raise_for_status()
+
+                yield from iter_json_array(
+                    response.iter_content(chunk_size=self.stream_chunk_size),
+                    self.item_array_key
+                )
+
+        return stream()
+
+    
+    # 거래소에 종목 정보를 요청해 파싱된 시장 정보 리스트를 반환
+    # 각 요소는 (화폐 정보, 종목 정보) 튜플
+    def fetch_markets(self) -> List[tuple]:
+        return self.parse_markets(self.iter_item_info())
+
+    
+    # 종목 정보 json 이터레이터로부터 (화폐 정보, 종목 정보) 튜플 리스트를 만듦
+    def parse_markets(self, item_info_iter) -> List[tuple]:
+        market_list = []
+        for item_info_json in item_info_iter:
             parsed_currency_symbol, parsed_english_name, parsed_korean_name = self.__currency_info_parser__(item_info_json)
+            parsed_base_symbol, parsed_quote_symbol = self.__item_info_parser__(item_info_json)
 
-            parsed_currency_info = {
+            currency = {
                 'symbol': parsed_currency_symbol,
                 'english_name': parsed_english_name,
                 'korean_name': parsed_korean_name
             }
-            
-            is_symbol_duplicate = any(currency_dict['symbol'] == parsed_currency_symbol for currency_dict in currency_list)
-            if is_symbol_duplicate:
-                continue
-            
-            currency_list.append(parsed_currency_info)
+            item = {
+                'base_symbol': parsed_base_symbol,
+                'quote_symbol': parsed_quote_symbol
+            }
+
+            market_list.append((currency, item))
 
-        return currency_list
+        return market_list
+
+    
+    # 거래소에 종목 정보를 요청해 시장 정보 색인을 만듦
+    def fetch_market_index(self) -> MarketIndex:
+        return MarketIndex(self.fetch_markets())
+
+    
+    # 같은 거래소의 모든 인스턴스가 공유하는 시장 정보 캐시 반환
+    def get_market_cache(self) -> MarketCache:
+        key = (type(self), self.domain)
+
+        with market_caches_lock:
+            if key not in market_caches:
+                market_caches[key] = MarketCache(
+                    self.fetch_market_index,
+                    ttl=self.market_cache_ttl,
+                    stale_ttl=self.market_cache_stale_ttl
+                )
+
+            return market_caches[key]
+
+    
+    # 캐시된 시장 정보 색인 반환
+    def get_markets(self) -> MarketIndex:
+        return self.get_market_cache().get()
+
+    
+    # 전체 화폐 리스트 반환 함수
+    def get_currencies(self) -> List[dict]:
+        return self.get_markets().get_currencies()
 
 
     # 종목 리스트 반환 함수
     # 파라미터가 없을 시 전체 종목 리스트 반환
     def get_items(self, base_symbol=None, quote_symbol=None) -> List[dict]:
-        url = f"{self.domain}{self.item_info_endpoint}"
+        return self.get_markets().get_items(base_symbol=base_symbol, quote_symbol=quote_symbol)
 
-        item_list = []
-        for item_info_json in self.__item_iter__(requests.get(url).json()):
-            parsed_base_symbol, parsed_quote_symbol = self.__item_info_parser__(item_info_json)
-            item = {
-                'base_symbol': parsed_base_symbol,
-                'quote_symbol': parsed_quote_symbol
-            }
+    
+    # 심볼 검색 (자동 완성용)
+    def search_currencies(self, query: str, limit: int = 20) -> List[dict]:
+        return self.get_markets().search_currencies(query, limit)
 
-            item_list.append(item)
-        
-        # 'base_unit' 또는 'quote_unit' 파라미터 존재 시 해당 파라미터에 부합하는 종목 정보만 반환
-        # 파라미터가 주어지지 않았을 시 모든 종목 정보를 반환
-        filter_base_symbol = lambda item: (base_symbol is None) or (item['base_symbol'] == base_symbol)
-        filter_quote_symbol = lambda item: (quote_symbol is None) or (item['quote_symbol'] == quote_symbol)
-        
-        return [
-            item for item in item_list
-            if filter_base_symbol(item) and filter_quote_symbol(item)
-        ]
+    
+    def search_items(self, query: str, quote_symbol=None, limit: int = 20) -> List[dict]:
+        return self.get_markets().search_items(query, quote_symbol=quote_symbol, limit=limit)
 
 
 class Upbit(Exchange):
-    def __init__(self):
-        self.domain = "https://api.upbit.com"
+    def __init__(self, domain="https://api.upbit.com", session: requests.Session = None):
+        super().__init__(session)
+
+        self.domain = domain
         self.item_info_endpoint = "/v1/market/all"
 
     
@@ -95,8 +505,14 @@ class Upbit(Exchange):
 
 
 class Binance(Exchange):
-    def __init__(self):
-        self.domain = "https://api.binance.com"
+    # exchangeInfo 응답은 수 MB에 달하므로 'symbols' 배열을 스트리밍으로 파싱
+    stream_item_info = True
+    item_array_key = 'symbols'
+
+    def __init__(self, domain="https://api.binance.com", session: requests.Session = None):
+        super().__init__(session)
+
+        self.domain = domain
         self.item_info_endpoint = "/api/v3/exchangeInfo"
 
     
@@ -114,9 +530,23 @@ class Binance(Exchange):
         return [item_info_json.get(key) for key in ['baseAsset', 'quoteAsset']]
 
 
+# 거래소 ID -> 거래소 클래스
+exchange_classes = {
+    1: Upbit,
+    2: Binance
+}
+
+# 거래소 ID -> 거래소 클라이언트 (프로세스 전체에서 하나씩만 생성)
+exchanges = {}
+exchanges_lock = threading.Lock()
+
+
 def get_exchange(exchange_id: int):
-    if exchange_id == 1:
-        return Upbit()
-    
-    elif exchange_id == 2:
-        return Binance()
\ No newline at end of file
+    if exchange_id not in exchange_classes:
+        return None
+
+    with exchanges_lock:
+        if exchange_id not in exchanges:
+            exchanges[exchange_id] = exchange_classes[exchange_id]()
+
+        return exchanges[exchange_id]
@@ -0,0 +1,67 @@
+# 행 존재 여부 캐시
+# (테이블, 기본 키) -> 존재 여부를 기억해 두어 존재 확인 쿼리를 생략
+# 이 프로세스의 INSERT/UPDATE/DELETE로 갱신되고, 다른 프로세스의 변경은 TTL 또는 LISTEN/NOTIFY로 반영
+# 존재하지 않는 키로 계속 조회해도 메모리가 늘어나지 않도록 항목 수를 제한
+import threading
+import time
+from collections import OrderedDict
+
+
+EXISTENCE_CACHE_SIZE = 100000
+
+
+class ExistenceCache:
+    # ttl: 캐시 항목 유효 시간 (초, None이면 만료되지 않음)
+    # max_size: 캐시할 최대 항목 수 (가장 오래 사용되지 않은 항목부터 제거)
+    def __init__(self, ttl: float = None, max_size: int = EXISTENCE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.entries = OrderedDict()   # (테이블, 기본 키) -> (존재 여부, 기록 시각)
+        self.lock = threading.Lock()
+
+    
+    # 캐시된 존재 여부 반환 (캐시되지 않았거나 만료되었으면 None, 만료된 항목은 제거)
+    def get(self, table_name: str, primary_key):
+        key = (table_name, primary_key)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            is_exists, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at >= self.ttl:
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+
+            return is_exists
+
+    
+    def set(self, table_name: str, primary_key, is_exists: bool):
+        key = (table_name, primary_key)
+
+        with self.lock:
+            self.entries[key] = (is_exists, time.monotonic())
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    
+    # 특정 항목 또는 (primary_key가 None이면) 테이블 전체의 캐시를 비움
+    def invalidate(self, table_name: str, primary_key=None):
+        with self.lock:
+            if primary_key is not None:
+                self.entries.pop((table_name, primary_key), None)
+                return
+
+            for key in [key for key in self.entries.keys() if key[0] == table_name]:
+                del self.entries[key]
+
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
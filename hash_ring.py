@@ -0,0 +1,69 @@
+# 일관된 해싱(consistent hashing) 링
+# 노드마다 여러 개의 가상 노드를 링 위에 두고, 키는 해시 값 이후 가장 가까운 가상 노드의 노드에 배정
+# 노드를 추가/제거하면 그 노드가 맡는(맡던) 약 1/N의 키만 다른 노드로 옮겨짐
+import bisect
+import hashlib
+
+
+VIRTUAL_NODES = 128
+
+
+# 프로세스와 관계없이 항상 같은 64비트 해시 값 (내장 hash()는 프로세스마다 달라짐)
+def get_key_hash(key) -> int:
+    if isinstance(key, tuple):
+        key = '\x1f'.join(str(value) for value in key)
+
+    return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class ConsistentHashRing:
+    def __init__(self, nodes=(), virtual_nodes: int = VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+
+        self.hashes = []    # 정렬된 가상 노드 해시 값
+        self.owners = []    # 가상 노드 해시 값과 같은 위치에 해당 가상 노드의 노드
+        self.nodes = set()
+
+        for node in nodes:
+            self.add_node(node)
+
+    
+    def __len__(self):
+        return len(self.nodes)
+
+    
+    def add_node(self, node):
+        if node in self.nodes:
+            return
+
+        self.nodes.add(node)
+
+        for replica in range(self.virtual_nodes):
+            key_hash = get_key_hash(f"{node}#{replica}")
+            position = bisect.bisect_left(self.hashes, key_hash)
+
+            self.hashes.insert(position, key_hash)
+            self.owners.insert(position, node)
+
+    
+    def remove_node(self, node):
+        if node not in self.nodes:
+            return
+
+        self.nodes.remove(node)
+
+        positions = [position for position, owner in enumerate(self.owners) if owner != node]
+        self.hashes = [self.hashes[position] for position in positions]
+        self.owners = [self.owners[position] for position in positions]
+
+    
+    # 키를 맡는 노드 반환 (노드가 없으면 None)
+    def get_node(self, key):
+        if len(self.hashes) == 0:
+            return None
+
+        position = bisect.bisect_right(self.hashes, get_key_hash(key))
+        if position == len(self.hashes):
+            position = 0
+
+        return self.owners[position]
@@ -0,0 +1,35 @@
+# 공유 HTTP 클라이언트 설정
+# 거래소 API(exchange.py, async_exchange.py)와 텔레그램 봇(telegram_client.py)이 같은 요청 설정을 사용
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# HTTP 요청 기본 설정
+#   REQUEST_TIMEOUT: (연결 타임아웃, 응답 대기 타임아웃) 초 단위
+#   REQUEST_RETRY_COUNT: 연결 실패 또는 일시적 오류 응답 시 재시도 횟수
+#   REQUEST_BACKOFF_FACTOR: 재시도 간격 (0.3, 0.6, 1.2초 ...)
+#   HTTP_POOL_SIZE: 호스트별로 유지하는 keep-alive 커넥션 수
+REQUEST_TIMEOUT = (3.05, 10)
+REQUEST_RETRY_COUNT = 3
+REQUEST_BACKOFF_FACTOR = 0.3
+HTTP_POOL_SIZE = 10
+
+
+# keep-alive 커넥션 풀과 재시도 설정을 갖춘 HTTP 세션 생성
+def create_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    retry = Retry(
+        total=REQUEST_RETRY_COUNT,
+        backoff_factor=REQUEST_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET', ),
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+
+    return session
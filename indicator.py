@@ -0,0 +1,498 @@
+# 볼린저 밴드(bollinger_band)/RSI 알림 규칙 평가 엔진
+# 종목별 캔들 종가를 NumPy 링 버퍼에 보관하고, 새 캔들마다 지표를 O(1)로 갱신
+# 같은 (종목, 캔들 간격, 기간)을 공유하는 구독은 한 번의 벡터 연산으로 평가
+# 내용이 같은 지표 조건을 건 알림들은 하나의 구독을 공유 (subscription.py)
+# 캔들 저장소(candle_store.py)가 주어지면 마감된 캔들을 저장하고, 새 구독은 저장된 캔들로 지표를 미리 계산
+import sys
+import time
+from collections import namedtuple
+from typing import List
+
+import numpy as np
+
+from condition import InvalidConditionError, parse_interval, validate_indicator_spec
+from subscription import Subscription, SubscriptionRegistry
+
+
+# 누적 합의 부동소수점 오차를 없애기 위해 이 횟수만큼 갱신할 때마다 버퍼로부터 다시 계산
+RECOMPUTE_PERIOD = 4096
+
+# RSI 미리 계산에 사용할 캔들 수 (기간의 배수, Wilder 평균이 초기값의 영향을 거의 받지 않을 만큼)
+RSI_WARM_UP_MULTIPLIER = 10
+
+
+# 마감된 캔들 (market: (거래소 ID, 기초 자산, 견적 자산))
+Candle = namedtuple('Candle', ['market', 'interval', 'open_time', 'close'])
+
+# 감지된 알림 (kind: 'bollinger_band' 또는 'rsi', value: 판정에 사용된 지표 값)
+IndicatorAlert = namedtuple('IndicatorAlert', ['kind', 'alarm', 'candle', 'value'])
+
+
+# 고정 크기 NumPy 링 버퍼
+class RingBuffer:
+    def __init__(self, capacity: int):
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.count = 0      # 지금까지 추가된 값의 수
+        self.position = 0   # 다음 값을 쓸 위치
+
+    
+    def append(self, value: float):
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.capacity
+        self.count += 1
+
+    
+    # 여러 값을 한 번에 추가 (버퍼 크기보다 많으면 최근 값만 남음)
+    def extend(self, values: np.ndarray):
+        count = len(values)
+        if count >= self.capacity:
+            self.values[:] = values[count - self.capacity:]
+            self.position = 0
+
+        elif count > 0:
+            indices = (self.position + np.arange(count)) % self.capacity
+            self.values[indices] = values
+            self.position = (self.position + count) % self.capacity
+
+        self.count += count
+
+    
+    # ago번째 이전 값 (0이면 가장 최근 값)
+    def get(self, ago: int) -> float:
+        return self.values[(self.position - 1 - ago) % self.capacity]
+
+    
+    # 최근 length개의 값 (오래된 순)
+    def latest(self, length: int) -> np.ndarray:
+        indices = (self.position - length + np.arange(length)) % self.capacity
+
+        return self.values[indices]
+
+    
+    # 버퍼 크기를 늘림 (기존 값 유지)
+    # 늘어난 자리는 실제 값이 아니므로 count를 남아 있는 값의 수로 줄임
+    def grow(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+
+        length = min(self.count, self.capacity)
+        values = np.zeros(capacity, dtype=np.float64)
+        values[:length] = self.latest(length)
+
+        self.values = values
+        self.capacity = capacity
+        self.position = length
+        self.count = length
+
+
+# 최근 length개 종가의 이동 평균과 표준 편차
+# 합과 제곱합을 유지해 새 값마다 O(1)로 갱신
+class RollingStats:
+    def __init__(self, length: int):
+        self.length = length
+        self.sum = 0.0
+        self.square_sum = 0.0
+        self.update_count = 0
+
+    
+    # buffer에는 새 값이 이미 추가되어 있어야 함
+    def update(self, buffer: RingBuffer):
+        value = buffer.get(0)
+        self.sum += value
+        self.square_sum += value * value
+
+        if buffer.count > self.length:
+            removed_value = buffer.get(self.length)
+            self.sum -= removed_value
+            self.square_sum -= removed_value * removed_value
+
+        self.update_count += 1
+        if self.update_count % RECOMPUTE_PERIOD == 0:
+            self.recompute(buffer)
+
+    
+    # 버퍼의 최근 length개 값으로 합과 제곱합을 다시 계산
+    def recompute(self, buffer: RingBuffer):
+        window = buffer.latest(min(buffer.count, self.length))
+        self.sum = float(window.sum())
+        self.square_sum = float(np.dot(window, window))
+
+    
+    def is_ready(self, buffer: RingBuffer) -> bool:
+        return buffer.count >= self.length
+
+    
+    def get_mean(self) -> float:
+        return self.sum / self.length
+
+    
+    def get_stddev(self) -> float:
+        mean = self.get_mean()
+        variance = self.square_sum / self.length - mean * mean
+
+        return variance ** 0.5 if variance > 0 else 0.0
+
+
+# Wilder 방식의 RSI
+# 첫 length개의 가격 변화는 단순 평균, 이후에는 (이전 평균 x (length - 1) + 현재 변화) / length로 갱신
+class WilderRSI:
+    def __init__(self, length: int):
+        self.length = length
+        self.average_gain = 0.0
+        self.average_loss = 0.0
+        self.change_count = 0
+
+    
+    # buffer에는 새 값이 이미 추가되어 있어야 함
+    def update(self, buffer: RingBuffer):
+        if buffer.count < 2:
+            return
+
+        self.add_change(buffer.get(0) - buffer.get(1))
+
+    
+    def add_change(self, change: float):
+        gain, loss = (change, 0.0) if change > 0 else (0.0, -change)
+
+        self.change_count += 1
+        if self.change_count <= self.length:
+            self.average_gain += gain / self.length
+            self.average_loss += loss / self.length
+
+        else:
+            self.average_gain = (self.average_gain * (self.length - 1) + gain) / self.length
+            self.average_loss = (self.average_loss * (self.length - 1) + loss) / self.length
+
+    
+    # 종가 목록으로 처음부터 다시 계산
+    def warm_up(self, closes: np.ndarray):
+        self.average_gain = 0.0
+        self.average_loss = 0.0
+        self.change_count = 0
+
+        for change in np.diff(closes).tolist():
+            self.add_change(change)
+
+    
+    def is_ready(self) -> bool:
+        return self.change_count >= self.length
+
+    
+    def get_value(self) -> float:
+        if self.average_loss == 0:
+            return 100.0
+
+        return 100.0 - 100.0 / (1.0 + self.average_gain / self.average_loss)
+
+
+# 같은 (종목, 캔들 간격, 기간)의 구독 묶음
+# 구독별 매개변수를 배열로 보관해 한 번의 벡터 연산으로 평가
+class SubscriptionGroup:
+    def __init__(self, parameter_names: tuple):
+        self.parameter_names = parameter_names
+        self.subscriptions = []
+        self.parameters = []
+
+        self.parameter_array = None     # (구독 수, 매개변수 수) 배열, 구독이 바뀌면 다시 만듦
+
+    
+    def add(self, subscription: Subscription, parameters: tuple):
+        self.subscriptions.append(subscription)
+        self.parameters.append(parameters)
+        self.parameter_array = None
+
+    
+    def remove(self, key: tuple):
+        for position, subscription in enumerate(self.subscriptions):
+            if subscription.key == key:
+                del self.subscriptions[position]
+                del self.parameters[position]
+                self.parameter_array = None
+
+                return
+
+    
+    def get_parameter_array(self) -> np.ndarray:
+        if self.parameter_array is None:
+            self.parameter_array = np.array(self.parameters, dtype=np.float64).reshape(-1, len(self.parameter_names))
+
+        return self.parameter_array
+
+    
+    def __len__(self):
+        return len(self.subscriptions)
+
+
+# 한 종목, 한 캔들 간격의 종가 버퍼와 지표 상태
+class IndicatorSeries:
+    def __init__(self):
+        self.buffer = RingBuffer(2)
+        self.stats = {}             # 기간 -> RollingStats
+        self.rsi = {}               # 기간 -> WilderRSI
+        self.bollinger_groups = {}  # 기간 -> SubscriptionGroup(coefficient)
+        self.rsi_groups = {}        # 기간 -> SubscriptionGroup(max_value, min_value)
+
+    
+    def add_subscription(self, subscription: Subscription):
+        spec = subscription.spec
+        length = int(spec['length'])
+
+        if subscription.kind == 'bollinger_band':
+            if length not in self.stats:
+                self.buffer.grow(length + 1)
+
+                # 이미 쌓인 종가가 있으면 그 값으로 합과 제곱합을 계산 (length개가 쌓이기 전에는 is_ready가 False)
+                self.stats[length] = RollingStats(length)
+                self.stats[length].recompute(self.buffer)
+
+            group = self.bollinger_groups.setdefault(length, SubscriptionGroup(('coefficient', )))
+            group.add(subscription, (float(spec['coefficient']), ))
+
+        elif subscription.kind == 'rsi':
+            if length not in self.rsi:
+                self.rsi[length] = WilderRSI(length)
+
+            group = self.rsi_groups.setdefault(length, SubscriptionGroup(('max_value', 'min_value')))
+            group.add(subscription, (float(spec['max_value']), float(spec['min_value'])))
+
+    
+    def remove_subscription(self, subscription: Subscription):
+        length = int(subscription.spec['length'])
+
+        if subscription.kind == 'bollinger_band':
+            groups, states = self.bollinger_groups, self.stats
+
+        else:
+            groups, states = self.rsi_groups, self.rsi
+
+        if length not in groups:
+            return
+
+        groups[length].remove(subscription.key)
+        if len(groups[length]) == 0:
+            del groups[length]
+            del states[length]
+
+    
+    def is_empty(self) -> bool:
+        return len(self.bollinger_groups) == 0 and len(self.rsi_groups) == 0
+
+    
+    # 지표를 미리 계산하는 데 필요한 캔들 수
+    def get_history_length(self) -> int:
+        return max(
+            [length + 1 for length in self.stats.keys()] +
+            [length * RSI_WARM_UP_MULTIPLIER + 1 for length in self.rsi.keys()] +
+            [0]
+        )
+
+    
+    # 과거 종가(오래된 순)로 버퍼와 지표 상태를 처음부터 다시 계산 (알림은 평가하지 않음)
+    def warm_up(self, closes: np.ndarray):
+        self.buffer = RingBuffer(self.buffer.capacity)
+        self.buffer.extend(closes[-self.buffer.capacity:])
+        self.buffer.count = len(closes)
+
+        for stats in self.stats.values():
+            stats.recompute(self.buffer)
+
+        for length, rsi in self.rsi.items():
+            rsi.warm_up(closes[-(length * RSI_WARM_UP_MULTIPLIER + 1):])
+
+    
+    # 새 캔들의 종가로 지표를 갱신하고 조건을 만족한 알림 목록 반환
+    #   bollinger_band: 종가가 평균 ± coefficient x 표준 편차 밴드를 벗어남
+    #   rsi: RSI가 max_value 이상이거나 min_value 이하
+    def on_candle(self, candle: Candle) -> List[IndicatorAlert]:
+        self.buffer.append(candle.close)
+
+        for stats in self.stats.values():
+            stats.update(self.buffer)
+
+        for rsi in self.rsi.values():
+            rsi.update(self.buffer)
+
+        alerts = []
+
+        for length, group in self.bollinger_groups.items():
+            stats = self.stats[length]
+            if not stats.is_ready(self.buffer):
+                continue
+
+            coefficients = group.get_parameter_array()[:, 0]
+            band_widths = coefficients * stats.get_stddev()
+            deviation = abs(candle.close - stats.get_mean())
+
+            for position in np.nonzero(deviation > band_widths)[0]:
+                for alarm in group.subscriptions[position].alarms.values():
+                    alerts.append(IndicatorAlert('bollinger_band', alarm, candle, stats.get_mean()))
+
+        for length, group in self.rsi_groups.items():
+            rsi = self.rsi[length]
+            if not rsi.is_ready():
+                continue
+
+            value = rsi.get_value()
+            parameter_array = group.get_parameter_array()
+            is_triggered = (value >= parameter_array[:, 0]) | (value <= parameter_array[:, 1])
+
+            for position in np.nonzero(is_triggered)[0]:
+                for alarm in group.subscriptions[position].alarms.values():
+                    alerts.append(IndicatorAlert('rsi', alarm, candle, value))
+
+        return alerts
+
+
+# 체결을 캔들 간격별 종가로 모음
+class CandleBuilder:
+    def __init__(self, interval: str):
+        self.interval = interval
+        self.interval_seconds = parse_interval(interval)
+
+        self.open_time = None
+        self.close = None
+
+    
+    # 체결을 반영하고, 이전 캔들이 마감되었으면 마감된 캔들을 반환
+    # timestamp: 밀리초 단위 체결 시각
+    def on_trade(self, market: tuple, price: float, timestamp: int) -> Candle:
+        open_time = timestamp // 1000 // self.interval_seconds * self.interval_seconds
+
+        closed_candle = None
+        if self.open_time is not None and open_time > self.open_time:
+            closed_candle = Candle(market, self.interval, self.open_time, self.close)
+
+        if self.open_time is None or open_time >= self.open_time:
+            self.open_time = open_time
+            self.close = price
+
+        return closed_candle
+
+
+class IndicatorEngine:
+    def __init__(self, on_alert=None, candle_store=None):
+        self.on_alert = on_alert            # 알림 감지 시 호출할 함수 (IndicatorAlert를 인수로 받음)
+        self.candle_store = candle_store    # 마감된 캔들을 저장하고 지표를 미리 계산할 CandleStore
+
+        self.series = {}            # (종목, 캔들 간격) -> IndicatorSeries
+        self.candle_builders = {}   # (종목, 캔들 간격) -> CandleBuilder
+        self.intervals = {}         # 종목 -> 캔들 간격 집합
+        self.registry = SubscriptionRegistry()
+
+    
+    # detector.AlarmRule의 bollinger_band/rsi 조건을 구독
+    # 같은 종목에 내용이 같은 조건의 구독이 이미 있으면 지표 상태를 새로 만들지 않고 공유
+    # 지표 조건이 잘못되었으면 아무것도 바꾸지 않고 InvalidConditionError 발생
+    def add_alarm(self, alarm):
+        for kind in ('bollinger_band', 'rsi'):
+            if alarm.condition.get(kind) is not None:
+                validate_indicator_spec(kind, alarm.condition[kind])
+
+        self.remove_alarm(alarm.alarm_id)
+
+        for kind in ('bollinger_band', 'rsi'):
+            spec = alarm.condition.get(kind)
+            if spec is None:
+                continue
+
+            subscription, is_new = self.registry.subscribe(alarm, kind, spec)
+            if is_new:
+                self.get_series(subscription.market, spec['interval']).add_subscription(subscription)
+                self.warm_up(subscription.market, spec['interval'])
+
+    
+    def remove_alarm(self, alarm_id: int):
+        for subscription in self.registry.unsubscribe(alarm_id):
+            key = (subscription.market, subscription.spec['interval'])
+
+            series = self.series.get(key)
+            if series is None:
+                continue
+
+            series.remove_subscription(subscription)
+
+            if series.is_empty():
+                market, interval = key
+                del self.series[key]
+                del self.candle_builders[key]
+
+                if self.candle_store is not None:
+                    self.candle_store.release(market, interval)
+
+                self.intervals[market].discard(interval)
+                if len(self.intervals[market]) == 0:
+                    del self.intervals[market]
+
+    
+    def get_series(self, market: tuple, interval: str) -> IndicatorSeries:
+        key = (market, interval)
+
+        if key not in self.series:
+            self.series[key] = IndicatorSeries()
+            self.candle_builders[key] = CandleBuilder(interval)
+            self.intervals.setdefault(market, set()).add(interval)
+
+        return self.series[key]
+
+    
+    # 저장된 캔들로 지표를 미리 계산 (캔들 저장소가 없으면 실시간 캔들로만 쌓음)
+    # 지표 계산에 필요한 기간보다 오래된 캔들은 사용하지 않음
+    def warm_up(self, market: tuple, interval: str):
+        if self.candle_store is None:
+            return
+
+        series = self.series[(market, interval)]
+        history_length = series.get_history_length()
+
+        open_times, closes = self.candle_store.read(market, interval, history_length)
+
+        oldest_open_time = time.time() - history_length * parse_interval(interval)
+        closes = closes[np.searchsorted(open_times, oldest_open_time):]
+
+        series.warm_up(closes)
+
+    
+    # 마감된 캔들을 반영하고 감지된 알림 목록 반환
+    def on_candle(self, candle: Candle) -> List[IndicatorAlert]:
+        series = self.series.get((candle.market, candle.interval))
+        if series is None:
+            return []
+
+        if self.candle_store is not None:
+            self.candle_store.append(candle.market, candle.interval, candle.open_time, candle.close)
+
+        alerts = series.on_candle(candle)
+
+        if self.on_alert is not None:
+            for alert in alerts:
+                self.on_alert(alert)
+
+        return alerts
+
+    
+    # 체결을 캔들로 모아 마감된 캔들이 있으면 평가
+    def process(self, trade) -> List[IndicatorAlert]:
+        market = (trade.exchange_id, trade.base_symbol, trade.quote_symbol)
+
+        alerts = []
+        for interval in self.intervals.get(market, ()):
+            candle = self.candle_builders[(market, interval)].on_trade(market, trade.price, trade.timestamp)
+
+            if candle is not None:
+                alerts.extend(self.on_candle(candle))
+
+        return alerts
+
+
+# 지표 엔진에 알림 등록 (지표 조건이 잘못된 알림은 기록하고 건너뛰어 나머지 알림의 감지는 계속됨)
+# engine: add_alarm을 가진 객체 (IndicatorEngine 또는 ShardedDetector)
+def add_alarm_or_skip(engine, alarm) -> bool:
+    try:
+        engine.add_alarm(alarm)
+
+    except InvalidConditionError as e:
+        print(f"skipping alarm {alarm.alarm_id}: invalid indicator condition ({e})", file=sys.stderr)
+        return False
+
+    return True
@@ -0,0 +1,127 @@
+# 데이터베이스 스키마 마이그레이션 실행기 (init_db.py 대체)
+# 적용된 마이그레이션 버전을 schema_migrations 테이블에 기록하고, 아직 적용되지 않은 마이그레이션만 순서대로 실행
+# 실행: python migrate.py [--target 버전] [--status]
+import sys
+
+from connection import connect
+from config import tokens
+from migrations import MIGRATIONS
+
+
+# 여러 프로세스가 동시에 마이그레이션을 실행하지 않도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 7_130_021
+
+
+def create_migration_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )""")
+
+
+# 적용된 마이그레이션 버전 집합 반환
+def get_applied_versions(conn) -> set:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT version FROM schema_migrations")
+
+        return {row[0] for row in cursor.fetchall()}
+
+
+# 마이그레이션 하나를 적용
+# 트랜잭션 마이그레이션은 버전 기록까지 한 트랜잭션으로 묶고,
+# 그렇지 않은 마이그레이션은 한 문장씩 실행한 뒤 버전을 기록하므로 중간에 실패하면 처음부터 다시 실행됨 (문장이 멱등이어야 함)
+def apply_migration(conn, migration):
+    conn.autocommit = not migration.transactional
+
+    try:
+        with conn.cursor() as cursor:
+            for statement in migration.statements:
+                if callable(statement):
+                    statement(cursor)
+
+                else:
+                    cursor.execute(statement)
+
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (migration.version, migration.name)
+            )
+
+        if migration.transactional:
+            conn.commit()
+
+    except BaseException:
+        if migration.transactional:
+            conn.rollback()
+        raise
+
+    finally:
+        conn.autocommit = True
+
+
+# target 버전까지 적용되지 않은 마이그레이션을 모두 적용하고, 적용한 마이그레이션 목록을 반환
+def migrate(database_url: str, target: int = None) -> list:
+    conn = connect(database_url)
+    conn.autocommit = True
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY, ))
+
+        create_migration_table(conn)
+        applied_versions = get_applied_versions(conn)
+
+        applied_migrations = []
+        for migration in sorted(MIGRATIONS, key=lambda migration: migration.version):
+            if target is not None and migration.version > target:
+                break
+
+            if migration.version in applied_versions:
+                continue
+
+            print(f"applying {migration.version}: {migration.name}")
+            apply_migration(conn, migration)
+            applied_migrations.append(migration)
+
+        return applied_migrations
+
+    finally:
+        if not conn.closed:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY, ))
+
+            conn.close()
+
+
+# 마이그레이션별 적용 여부 출력
+def print_status(database_url: str):
+    conn = connect(database_url)
+    conn.autocommit = True
+
+    try:
+        create_migration_table(conn)
+        applied_versions = get_applied_versions(conn)
+
+    finally:
+        conn.close()
+
+    for migration in MIGRATIONS:
+        state = 'applied' if migration.version in applied_versions else 'pending'
+        print(f"{migration.version:>4} {migration.name:<32} {state}")
+
+
+if __name__ == '__main__':
+    database_url = tokens['database_url']
+
+    if '--status' in sys.argv:
+        print_status(database_url)
+        sys.exit()
+
+    target = None
+    if '--target' in sys.argv:
+        target = int(sys.argv[sys.argv.index('--target') + 1])
+
+    applied_migrations = migrate(database_url, target)
+    print(f"applied {len(applied_migrations)} migration(s)")
@@ -0,0 +1,165 @@
+# 데이터베이스 스키마 마이그레이션 목록
+# 새 마이그레이션은 항상 목록 끝에 다음 버전 번호로 추가하고, 이미 배포된 마이그레이션은 수정하지 않음
+# transactional이 False인 마이그레이션은 트랜잭션 밖에서 한 문장씩 실행 (CREATE INDEX CONCURRENTLY 등)
+# SQL로 쓰기 어려운 단계는 커서를 받는 함수로 statements에 넣음 (예: 파이썬에서 계산한 값으로 기존 행 채우기)
+from collections import namedtuple
+
+from condition import CONDITION_KINDS, get_condition_hash
+
+
+Migration = namedtuple('Migration', ['version', 'name', 'statements', 'transactional'])
+
+
+# CREATE INDEX CONCURRENTLY가 중간에 실패하면 INVALID 상태의 색인이 남고, IF NOT EXISTS는 이를 있는 것으로 보고 건너뜀
+# 다시 실행해도 온전한 색인이 만들어지도록 같은 이름의 색인을 먼저 지우고 새로 만드는 두 문장을 반환
+def create_index_concurrently(index_name: str, definition: str) -> list:
+    return [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}",
+        f"CREATE INDEX CONCURRENTLY {index_name} {definition}"
+    ]
+
+
+# condition_hash가 비어 있는 기존 알림 규칙의 해시를 채움 (해시는 condition.get_condition_hash로 계산)
+# 내용이 같은 알림 규칙이 여러 행이면 ID가 가장 작은 행만 남기고, 나머지를 가리키던 알림을 그 행으로 옮긴 뒤 지움
+# 해시가 비어 있는 행만 다루므로 다시 실행해도 됨
+def backfill_condition_hashes(cursor):
+    cursor.execute(f"SELECT condition_id, {', '.join(CONDITION_KINDS)}, condition_hash FROM condition ORDER BY condition_id")
+    rows = cursor.fetchall()
+
+    condition_ids = {row[-1]: row[0] for row in rows if row[-1] is not None}   # 해시 -> 남길 알림 규칙 ID
+
+    for condition_id, *values, condition_hash in rows:
+        if condition_hash is not None:
+            continue
+
+        condition_hash = get_condition_hash(dict(zip(CONDITION_KINDS, values)))
+
+        kept_condition_id = condition_ids.get(condition_hash)
+        if kept_condition_id is None:
+            cursor.execute("UPDATE condition SET condition_hash=%s WHERE condition_id=%s", (condition_hash, condition_id))
+            condition_ids[condition_hash] = condition_id
+
+        else:
+            cursor.execute("UPDATE alarm SET condition_id=%s WHERE condition_id=%s", (kept_condition_id, condition_id))
+            cursor.execute("DELETE FROM condition WHERE condition_id=%s", (condition_id, ))
+
+
+MIGRATIONS = [
+    # init_db.py로 만든 기존 데이터베이스에도 적용할 수 있도록 이미 있는 테이블은 건너뜀
+    Migration(1, 'create_tables', [
+        # 거래소 정보 테이블
+        """CREATE TABLE IF NOT EXISTS exchange (
+            exchange_id SERIAL PRIMARY KEY,
+            exchange_name TEXT NOT NULL
+        )""",
+        """INSERT INTO exchange (exchange_name)
+            SELECT exchange_name FROM (VALUES (1, '업비트'), (2, '바이낸스')) AS seed (seed_order, exchange_name)
+            WHERE NOT EXISTS (SELECT 1 FROM exchange)
+            ORDER BY seed_order""",
+
+        # 채팅 정보 테이블
+        """CREATE TABLE IF NOT EXISTS chat (
+            chat_id BIGINT PRIMARY KEY
+        )""",
+
+        # 채널 정보 테이블
+        """CREATE TABLE IF NOT EXISTS channel (
+            channel_id BIGINT PRIMARY KEY,
+            channel_name TEXT NOT NULL
+        )""",
+
+        # 알림 규칙 테이블
+        """CREATE TABLE IF NOT EXISTS condition (
+            condition_id SERIAL PRIMARY KEY,
+            whale JSON,
+            tick JSON,
+            bollinger_band JSON,
+            rsi JSON,
+            condition_hash TEXT UNIQUE
+        )""",
+        "ALTER TABLE condition ADD COLUMN IF NOT EXISTS condition_hash TEXT",
+
+        # 알림 정보 테이블
+        """CREATE TABLE IF NOT EXISTS alarm (
+            alarm_id SERIAL PRIMARY KEY,
+            channel_id BIGINT NOT NULL,
+            exchange_id INTEGER NOT NULL,
+            base_symbol TEXT NOT NULL,
+            quote_symbol TEXT NOT NULL,
+            condition_id INTEGER NOT NULL,
+            is_enabled BOOLEAN NOT NULL DEFAULT TRUE,
+
+            FOREIGN KEY (exchange_id) REFERENCES exchange(exchange_id) ON DELETE CASCADE,
+            FOREIGN KEY (channel_id) REFERENCES channel(channel_id) ON DELETE CASCADE,
+            FOREIGN KEY (condition_id) REFERENCES condition(condition_id) ON DELETE CASCADE
+        )""",
+
+        # 해시 컬럼을 새로 추가한 기존 알림 규칙은 해시를 채운 뒤에 유일 색인을 만듦
+        # (비어 있는 채로 두면 같은 내용의 알림 규칙을 찾지 못해 새 행이 계속 생김)
+        # 새로 만든 테이블에는 CREATE TABLE의 UNIQUE 제약 조건이 같은 이름의 색인으로 이미 있으므로 건너뜀
+        backfill_condition_hashes,
+        "CREATE UNIQUE INDEX IF NOT EXISTS condition_condition_hash_key ON condition (condition_hash)"
+    ], True),
+
+    # 채널별 알림 조회와 채널/알림 규칙 삭제 시의 연쇄 삭제가 알림 테이블 전체를 읽지 않도록 색인 추가
+    # 운영 중인 테이블의 쓰기를 막지 않도록 CONCURRENTLY로 생성
+    Migration(2, 'index_alarm_foreign_keys', [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS alarm_channel_id_idx ON alarm (channel_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS alarm_condition_id_idx ON alarm (condition_id)"
+    ], False),
+
+    # 감지기가 종목별로 활성화된 알림을 찾는 조회용 부분 색인
+    Migration(3, 'index_enabled_alarm_items', [
+        """CREATE INDEX CONCURRENTLY IF NOT EXISTS alarm_enabled_item_idx
+            ON alarm (exchange_id, base_symbol, quote_symbol) WHERE is_enabled"""
+    ], False),
+
+    # 알림 규칙 컬럼을 JSONB로 변환하여 읽을 때마다 다시 파싱하지 않고, 내용으로 비교/색인할 수 있도록 함
+    Migration(4, 'condition_jsonb', [
+        """ALTER TABLE condition
+            ALTER COLUMN whale TYPE JSONB USING whale::JSONB,
+            ALTER COLUMN tick TYPE JSONB USING tick::JSONB,
+            ALTER COLUMN bollinger_band TYPE JSONB USING bollinger_band::JSONB,
+            ALTER COLUMN rsi TYPE JSONB USING rsi::JSONB"""
+    ], True),
+
+    # 알림 규칙 내용 조회(condition.rsi @> '{"interval": "1m"}' 등)용 GIN 색인
+    Migration(5, 'index_condition_jsonb', [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS condition_{kind}_idx ON condition USING GIN ({kind} jsonb_path_ops)"
+        for kind in ('whale', 'tick', 'bollinger_band', 'rsi')
+    ], False),
+
+    # 알림이 추가/수정/삭제될 때마다 NOTIFY('alarm_change', '작업:알림 ID')를 보내는 트리거 (alarm_feed.py에서 수신)
+    # 채널 삭제 등으로 연쇄 삭제된 알림과 여러 알림을 한 번에 바꾸는 쿼리문도 알림마다 전달됨
+    Migration(6, 'alarm_change_trigger', [
+        """CREATE OR REPLACE FUNCTION notify_alarm_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('alarm_change', 'D:' || OLD.alarm_id);
+            ELSE
+                PERFORM pg_notify('alarm_change', left(TG_OP, 1) || ':' || NEW.alarm_id);
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS alarm_change_trigger ON alarm",
+        """CREATE TRIGGER alarm_change_trigger
+            AFTER INSERT OR UPDATE OR DELETE ON alarm
+            FOR EACH ROW EXECUTE FUNCTION notify_alarm_change()"""
+    ], True),
+
+    # 2, 3, 5번 마이그레이션의 CREATE INDEX CONCURRENTLY IF NOT EXISTS가 중간에 실패해 남은 INVALID 색인은
+    # 다시 실행해도 건너뛰므로, 같은 정의로 지우고 다시 만들어 모든 색인이 온전하도록 함
+    Migration(7, 'rebuild_concurrent_indexes', [
+        statement
+        for index_name, definition in [
+            ('alarm_channel_id_idx', "ON alarm (channel_id)"),
+            ('alarm_condition_id_idx', "ON alarm (condition_id)"),
+            ('alarm_enabled_item_idx', "ON alarm (exchange_id, base_symbol, quote_symbol) WHERE is_enabled"),
+            *((f"condition_{kind}_idx", f"ON condition USING GIN ({kind} jsonb_path_ops)")
+              for kind in ('whale', 'tick', 'bollinger_band', 'rsi'))
+        ]
+        for statement in create_index_concurrently(index_name, definition)
+    ], False)
+]
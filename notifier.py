@@ -0,0 +1,291 @@
+# 텔레그램 알림 발송기
+# 알림을 채널별 대기열에 쌓아두고 작업 스레드가 발송
+#   - 같은 채널에 쌓인 알림은 하나의 메시지로 합쳐 발송
+#   - 채널별/전체 발송 속도를 토큰 버킷으로 제한
+#   - 한 채널에는 한 번에 하나의 작업 스레드만 발송하여 알림 순서를 유지
+#   - 429 응답을 받으면 retry_after초 후 다시 발송
+# 로컬 가짜 텔레그램 서버로 시험하려면 telebot.apihelper.API_URL을 해당 서버 주소로 지정
+import heapq
+import threading
+import time
+
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+
+
+# 텔레그램 발송 제한 (https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this)
+GLOBAL_MESSAGES_PER_SECOND = 30
+CHAT_MESSAGES_PER_SECOND = 1
+CHAT_BURST = 3
+
+MAX_MESSAGE_LENGTH = 4096
+MAX_RETRY_COUNT = 5
+RETRY_DELAY = 1.0
+
+# 발송이 끝난 채널의 토큰 버킷을 정리하는 간격 (초)
+BUCKET_SWEEP_INTERVAL = 60.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    
+    # 토큰을 하나 사용할 수 있으면 0을, 없으면 토큰이 생길 때까지 기다려야 하는 시간을 반환 (토큰은 사용하지 않음)
+    def get_delay(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+    
+    # 토큰이 가득 찼는지 확인 (가득 찬 버킷은 새로 만든 버킷과 같으므로 버려도 됨)
+    def is_full(self) -> bool:
+        self.get_delay()
+
+        return self.tokens >= self.capacity
+
+    
+    # 토큰을 하나 사용할 수 있으면 사용하고 0을, 없으면 토큰이 생길 때까지 기다려야 하는 시간을 반환
+    def take(self) -> float:
+        delay = self.get_delay()
+        if delay == 0:
+            self.tokens -= 1
+
+        return delay
+
+
+# 알림 목록을 MAX_MESSAGE_LENGTH를 넘지 않는 메시지 목록으로 합침
+def join_messages(texts: list) -> list:
+    messages = []
+    current = ""
+
+    for text in texts:
+        text = text[:MAX_MESSAGE_LENGTH]
+
+        if current == "":
+            current = text
+
+        elif len(current) + 1 + len(text) <= MAX_MESSAGE_LENGTH:
+            current += "\n" + text
+
+        else:
+            messages.append(current)
+            current = text
+
+    if current != "":
+        messages.append(current)
+
+    return messages
+
+
+class NotificationDispatcher:
+    # send_message: (chat_id, text)를 받아 메시지를 발송하는 함수
+    def __init__(self, send_message, worker_count: int = 4,
+                 global_rate: float = GLOBAL_MESSAGES_PER_SECOND,
+                 chat_rate: float = CHAT_MESSAGES_PER_SECOND, chat_burst: float = CHAT_BURST):
+        self.send_message = send_message
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_buckets = {}      # 채널 ID -> TokenBucket (발송할 알림이 없고 가득 차면 정리)
+        self.swept_at = time.monotonic()
+
+        self.pending = {}           # 채널 ID -> 발송 대기 중인 알림 목록
+        self.retry_counts = {}      # 채널 ID -> 연속 발송 실패 횟수
+        self.blocked_until = {}     # 채널 ID -> 429 응답 등으로 발송을 미뤄야 하는 시각
+        self.schedule = []          # (발송 가능 시각, 채널 ID) 힙
+        self.scheduled_chats = set()
+        self.sending_chats = set()  # 작업 스레드가 발송 중인 채널 ID
+
+        self.condition = threading.Condition()
+        self.is_running = True
+
+        self.sent_count = 0
+        self.dropped_count = 0
+
+        self.workers = [
+            threading.Thread(target=self.work, daemon=True) for _ in range(worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    
+    # 텔레그램 봇으로 발송하는 발송기 생성
+    @classmethod
+    def from_token(cls, token: str, **kwargs):
+        bot = TeleBot(token)
+
+        return cls(lambda chat_id, text: bot.send_message(chat_id, text), **kwargs)
+
+    
+    # 알림을 대기열에 추가 (발송을 기다리지 않고 바로 반환)
+    def enqueue(self, chat_id: int, text: str):
+        with self.condition:
+            self.pending.setdefault(chat_id, []).append(text)
+            self.schedule_chat(chat_id, time.monotonic())
+
+    
+    # condition 락을 잡은 상태에서 호출해야 함
+    def schedule_chat(self, chat_id: int, ready_time: float):
+        if chat_id in self.scheduled_chats:
+            return
+
+        self.scheduled_chats.add(chat_id)
+        heapq.heappush(self.schedule, (ready_time, chat_id))
+        self.condition.notify()
+
+    
+    # 발송할 차례인 채널과 알림 목록을 꺼냄. 발송기가 멈추면 None 반환
+    def take_batch(self):
+        with self.condition:
+            while self.is_running:
+                if time.monotonic() - self.swept_at >= BUCKET_SWEEP_INTERVAL:
+                    self.sweep_chat_buckets()
+
+                if len(self.schedule) == 0:
+                    self.condition.wait()
+                    continue
+
+                ready_time, chat_id = self.schedule[0]
+                delay = ready_time - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+
+                heapq.heappop(self.schedule)
+
+                # 다른 작업 스레드가 발송 중인 채널은 발송이 끝난 뒤 다시 예약됨 (finish_batch)
+                if chat_id in self.sending_chats:
+                    self.scheduled_chats.discard(chat_id)
+                    continue
+
+                # 재시도 대기 중인 채널
+                blocked_until = self.blocked_until.get(chat_id, 0)
+                if blocked_until > time.monotonic():
+                    heapq.heappush(self.schedule, (blocked_until, chat_id))
+                    continue
+
+                self.blocked_until.pop(chat_id, None)
+
+                # 채널별, 전체 발송 속도 제한
+                # 두 버킷 모두 토큰이 있을 때만 함께 사용 (한쪽만 사용해 다른 채널의 발송 몫을 줄이지 않도록)
+                chat_bucket = self.chat_buckets.setdefault(chat_id, TokenBucket(self.chat_rate, self.chat_burst))
+                delay = max(chat_bucket.get_delay(), self.global_bucket.get_delay())
+                if delay > 0:
+                    heapq.heappush(self.schedule, (time.monotonic() + delay, chat_id))
+                    continue
+
+                self.scheduled_chats.discard(chat_id)
+                texts = self.pending.pop(chat_id, [])
+                if len(texts) == 0:
+                    continue
+
+                chat_bucket.take()
+                self.global_bucket.take()
+                self.sending_chats.add(chat_id)
+
+                return chat_id, texts
+
+            return None
+
+    
+    # 발송할 알림이 없고 토큰이 가득 찬 채널의 토큰 버킷을 버림 (다시 발송할 때 새로 만듦)
+    # 한 번이라도 알림을 받은 채널의 버킷이 계속 쌓이지 않도록 함
+    # condition 락을 잡은 상태에서 호출해야 함
+    def sweep_chat_buckets(self):
+        self.swept_at = time.monotonic()
+
+        idle_chat_ids = [
+            chat_id for chat_id, bucket in self.chat_buckets.items()
+            if chat_id not in self.scheduled_chats and chat_id not in self.sending_chats
+            and chat_id not in self.pending and bucket.is_full()
+        ]
+        for chat_id in idle_chat_ids:
+            del self.chat_buckets[chat_id]
+
+    
+    # 발송에 실패한 알림을 다시 대기열 앞에 넣고 delay초 후 발송하도록 예약
+    def reschedule(self, chat_id: int, texts: list, delay: float):
+        with self.condition:
+            retry_count = self.retry_counts.get(chat_id, 0) + 1
+
+            if retry_count > MAX_RETRY_COUNT:
+                self.retry_counts.pop(chat_id, None)
+                self.dropped_count += len(texts)
+
+                return
+
+            self.retry_counts[chat_id] = retry_count
+            self.pending[chat_id] = texts + self.pending.get(chat_id, [])
+            self.blocked_until[chat_id] = time.monotonic() + delay
+            self.schedule_chat(chat_id, self.blocked_until[chat_id])
+
+    
+    # 채널의 발송이 끝났음을 기록하고, 그 사이 쌓인 알림이 있으면 다시 예약
+    def finish_batch(self, chat_id: int):
+        with self.condition:
+            self.sending_chats.discard(chat_id)
+
+            if len(self.pending.get(chat_id, [])) > 0:
+                self.schedule_chat(chat_id, self.blocked_until.get(chat_id, time.monotonic()))
+
+    
+    def work(self):
+        while True:
+            batch = self.take_batch()
+            if batch is None:
+                return
+
+            chat_id, texts = batch
+            try:
+                self.send_batch(chat_id, texts)
+
+            finally:
+                self.finish_batch(chat_id)
+
+    
+    def send_batch(self, chat_id: int, texts: list):
+        messages = join_messages(texts)
+
+        for index, message in enumerate(messages):
+            try:
+                self.send_message(chat_id, message)
+
+            except ApiTelegramException as e:
+                if e.error_code == 429:
+                    retry_after = e.result_json.get('parameters', {}).get('retry_after', RETRY_DELAY)
+                    self.reschedule(chat_id, messages[index:], retry_after)
+
+                else:
+                    with self.condition:
+                        self.dropped_count += len(messages) - index
+
+                break
+
+            except Exception:
+                self.reschedule(chat_id, messages[index:], RETRY_DELAY)
+                break
+
+            else:
+                with self.condition:
+                    self.sent_count += 1
+                    self.retry_counts.pop(chat_id, None)
+
+    
+    # 작업 스레드를 멈춤 (대기 중인 알림은 발송하지 않음)
+    def stop(self):
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
+
+        for worker in self.workers:
+            worker.join()
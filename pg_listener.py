@@ -0,0 +1,69 @@
+# PostgreSQL LISTEN/NOTIFY 수신기
+# 별도 커넥션으로 채널을 LISTEN하고, 알림이 오면 백그라운드 스레드에서 handler(채널, 페이로드)를 호출
+# 연결이 끊어진 동안 보낸 알림은 받을 수 없으므로, 필요하면 on_listen으로 (재)연결 시점을 받아 상태를 다시 맞춤
+import select
+import threading
+import time
+
+import psycopg2
+
+from connection import connect
+
+
+RECONNECT_DELAY = 1.0
+POLL_TIMEOUT = 5.0
+
+
+class NotificationListener:
+    # on_listen: LISTEN을 시작할 때마다 (처음 연결과 재연결 모두) 호출할 함수
+    def __init__(self, database_url: str, channels, handler, on_listen=None):
+        self.database_url = database_url
+        self.channels = list(channels)
+        self.handler = handler
+        self.on_listen = on_listen
+
+        self.is_running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    
+    def listen(self):
+        conn = connect(self.database_url)
+        conn.autocommit = True
+
+        with conn.cursor() as cursor:
+            for channel in self.channels:
+                cursor.execute(f"LISTEN {channel}")
+
+        return conn
+
+    
+    def run(self):
+        while self.is_running:
+            conn = None
+            try:
+                conn = self.listen()
+                if self.on_listen is not None:
+                    self.on_listen()
+
+                while self.is_running:
+                    readable, _, _ = select.select([conn], [], [], POLL_TIMEOUT)
+                    if readable == []:
+                        continue
+
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.handler(notify.channel, notify.payload)
+
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                time.sleep(RECONNECT_DELAY)
+
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+    
+    def stop(self):
+        self.is_running = False
+        self.thread.join()
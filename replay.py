@@ -0,0 +1,115 @@
+# 기록된 체결 파일을 네트워크 없이 감지 엔진에 재생해 처리량을 측정하는 도구
+# 실행: python replay.py <체결 파일> <알림 파일> [--repeat N] [--workers N]
+#   체결 감지(Detector)와 지표 감지(IndicatorEngine)를 모두 실행
+#   --workers: 종목을 N개의 작업 프로세스에 나누어 감지 (ShardedDetector)
+#              작업 프로세스 수를 바꿔 가며 실행해 코어 수에 따른 처리량 변화를 비교 (옵션 없이 실행한 결과와 같은 작업량)
+#   체결 파일: TradeRecorder로 기록한 JSON Lines (exchange_id, base_symbol, quote_symbol, price, quantity, timestamp)
+#   알림 파일: Database.select_alarms 행 형식의 JSON Lines (alarm_id, channel_id, exchange_id, base_symbol,
+#             quote_symbol, whale, tick, bollinger_band, rsi)
+import sys
+import json
+import time
+
+from detector import Trade, AlarmRule, AlarmIndex, Detector
+from indicator import IndicatorEngine, add_alarm_or_skip
+from sharded_detector import ShardedDetector
+
+
+def load_trades(file_path: str) -> list:
+    with open(file_path, 'r') as file:
+        return [Trade(**json.loads(line)) for line in file if line.strip() != ""]
+
+
+def load_alarms(file_path: str) -> list:
+    alarms = []
+
+    with open(file_path, 'r') as file:
+        for line in file:
+            if line.strip() == "":
+                continue
+
+            row = json.loads(line)
+            for key in ('whale', 'tick', 'bollinger_band', 'rsi'):
+                row.setdefault(key, None)
+
+            alarms.append(AlarmRule.from_row(row))
+
+    return alarms
+
+
+def load_alarm_index(file_path: str) -> AlarmIndex:
+    alarm_index = AlarmIndex()
+    for alarm in load_alarms(file_path):
+        alarm_index.add(alarm)
+
+    return alarm_index
+
+
+# 체결 목록을 감지 엔진에 repeat번 재생하고 (처리한 체결 수, 감지된 알림 수, 소요 시간)을 반환
+# indicator_engine이 주어지면 작업 프로세스(sharded_detector.run_worker)와 같이 지표 감지도 함께 실행
+def replay(detector: Detector, trades: list, repeat: int = 1, indicator_engine: IndicatorEngine = None) -> tuple:
+    process = detector.process
+    process_indicator = indicator_engine.process if indicator_engine is not None else None
+
+    indicator_alert_count = 0
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for trade in trades:
+            process(trade)
+
+            if process_indicator is not None:
+                indicator_alert_count += len(process_indicator(trade))
+
+    elapsed_time = time.perf_counter() - start_time
+
+    return detector.trade_count, detector.alert_count + indicator_alert_count, elapsed_time
+
+
+# 체결 목록을 다중 프로세스 감지기에 repeat번 재생하고 (보낸 체결 수, 감지된 알림 수, 소요 시간)을 반환
+# 소요 시간은 마지막 체결까지 모든 작업 프로세스가 처리를 마칠 때까지의 시간
+def replay_sharded(sharded_detector: ShardedDetector, trades: list, repeat: int = 1, batch_size: int = 4096) -> tuple:
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for start in range(0, len(trades), batch_size):
+            sharded_detector.process_batch(trades[start:start + batch_size])
+
+    sharded_detector.wait_done()
+    elapsed_time = time.perf_counter() - start_time
+
+    results = sharded_detector.stop()
+    alert_count = sum(alert_count for _, alert_count in results.values())
+
+    return len(trades) * repeat, alert_count, elapsed_time
+
+
+if __name__ == '__main__':
+    trade_file_path, alarm_file_path = sys.argv[1], sys.argv[2]
+
+    repeat = 1
+    if '--repeat' in sys.argv:
+        repeat = int(sys.argv[sys.argv.index('--repeat') + 1])
+
+    trades = load_trades(trade_file_path)
+    alarm_index = load_alarm_index(alarm_file_path)
+
+    if '--workers' in sys.argv:
+        worker_count = int(sys.argv[sys.argv.index('--workers') + 1])
+
+        sharded_detector = ShardedDetector(worker_count)
+        sharded_detector.add_alarms(list(alarm_index.alarms.values()))
+
+        trade_count, alert_count, elapsed_time = replay_sharded(sharded_detector, trades, repeat)
+        print(f"workers: {worker_count}")
+
+    else:
+        detector = Detector(alarm_index)
+
+        indicator_engine = IndicatorEngine()
+        for alarm in alarm_index.alarms.values():
+            add_alarm_or_skip(indicator_engine, alarm)
+
+        trade_count, alert_count, elapsed_time = replay(detector, trades, repeat, indicator_engine)
+
+    print(f"alarms: {len(alarm_index.alarms)}, markets: {len(alarm_index.get_markets())}")
+    print(f"trades: {trade_count}, alerts: {alert_count}, elapsed: {elapsed_time:.3f}s")
+    print(f"throughput: {trade_count / elapsed_time:,.0f} trades/sec")
@@ -0,0 +1,103 @@
+# 리소스 버전 카운터와 직렬화된 응답 캐시
+# 테이블(또는 테이블 안의 범위, 예: 채널별 알림)마다 버전을 두고, 데이터가 바뀔 때 버전을 올림
+# 버전은 ETag로 사용되며, 같은 버전의 응답 본문은 다시 직렬화하지 않고 재사용
+# 여러 프로세스가 같은 데이터베이스를 쓰면 버전 변경을 NOTIFY로 주고받음 (페이로드: '구분자:테이블' 또는 '구분자:테이블:범위')
+import os
+import threading
+from collections import OrderedDict
+
+
+RESPONSE_CACHE_SIZE = 1024
+
+
+class ResourceVersions:
+    def __init__(self):
+        # 프로세스마다 카운터가 따로 증가하므로, 다른 프로세스가 발급한 ETag와 겹치지 않도록 구분자를 붙임
+        self.epoch = os.urandom(4).hex()
+
+        self.table_versions = {}   # 테이블 -> 버전 (테이블 전체가 바뀌면 증가)
+        self.scope_versions = {}   # (테이블, 범위) -> 버전
+        self.lock = threading.Lock()
+
+    
+    # 리소스의 현재 버전 (ETag 값) 반환
+    def get(self, table_name: str, scope=None) -> str:
+        table_version = self.table_versions.get(table_name, 0)
+        if scope is None:
+            return f"{self.epoch}-{table_version}"
+
+        scope_version = self.scope_versions.get((table_name, scope), 0)
+
+        return f"{self.epoch}-{table_version}-{scope_version}"
+
+    
+    # 리소스 버전을 올림 (scope가 None이면 테이블 전체)
+    def bump(self, table_name: str, scope=None):
+        with self.lock:
+            if scope is None:
+                self.table_versions[table_name] = self.table_versions.get(table_name, 0) + 1
+
+            else:
+                key = (table_name, scope)
+                self.scope_versions[key] = self.scope_versions.get(key, 0) + 1
+
+    
+    # 구분자를 새로 만들어 지금까지 발급한 모든 ETag를 무효화
+    # 변경 알림을 받지 못했을 수 있을 때(LISTEN 연결을 새로 맺었을 때) 사용
+    def renew_epoch(self):
+        with self.lock:
+            self.epoch = os.urandom(4).hex()
+
+    
+    # 다른 프로세스에 보낼 버전 변경 알림 페이로드
+    def to_payload(self, table_name: str, scope=None) -> str:
+        payload = f"{self.epoch}:{table_name}"
+        if scope is not None:
+            payload += f":{scope}"
+
+        return payload
+
+    
+    # 다른 프로세스에서 보낸 버전 변경 알림을 반영 (이 프로세스가 보낸 알림은 무시)
+    def on_payload(self, payload: str):
+        epoch, _, resource = payload.partition(':')
+        if epoch == self.epoch:
+            return
+
+        table_name, _, scope = resource.partition(':')
+        if scope == "":
+            self.bump(table_name)
+
+        else:
+            self.bump(table_name, int(scope) if scope.lstrip('-').isdigit() else scope)
+
+
+class ResponseCache:
+    # max_size: 캐시할 최대 응답 수 (가장 오래 사용되지 않은 응답부터 제거)
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+
+        self.entries = OrderedDict()   # 캐시 키 -> (버전, 응답 본문)
+        self.lock = threading.Lock()
+
+    
+    # 해당 버전의 응답 본문 반환 (없거나 버전이 다르면 None)
+    def get(self, key, version: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+
+            self.entries.move_to_end(key)
+
+            return entry[1]
+
+    
+    def set(self, key, version: str, body):
+        with self.lock:
+            self.entries[key] = (version, body)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
@@ -0,0 +1,623 @@
+# 백엔드 라우트 (backend.py의 플라스크 앱과 async_backend.py의 쿼트 앱이 공유)
+# 라우트 처리기는 입출력을 직접 하지 않고, 필요한 작업(Call, Transaction)을 yield하여 앱에 맡기는 제너레이터
+#   - 동기 앱은 run_route로, 비동기 앱은 run_route_async로 처리기를 실행하고, 작업 결과를 yield 식의 값으로 돌려줌
+#   - 작업에서 발생한 예외는 yield 위치에서 다시 발생하므로 처리기 안에서 try/except로 처리할 수 있음
+# 매개변수 검증, 응답 생성, 라우트 로직은 이 모듈에만 있고, 두 앱은 같은 ROUTES 표를 등록함
+#   response = yield call('database', 'select_alarms', channel_id=channel_id)
+import inspect
+import json
+from collections import namedtuple
+
+from telebot import apihelper, asyncio_helper
+from werkzeug.http import quote_etag
+
+from condition import CONDITION_KINDS, InvalidConditionError, validate_condition
+from converter import channel_row_to_dict, alarm_row_to_dict, exchange_row_to_dict
+from response_cache import ResponseCache
+from serializer import JSON_CONTENT_TYPE, dumps, compress_with, select_encoding
+
+
+# 처리기가 앱에 맡기는 작업
+#   Call: service의 method(*args, **kwargs) 호출 (비동기 앱에서는 결과가 awaitable이면 기다림)
+#         service: 'database', 'bot', ('exchange', 거래소 ID)
+#   Transaction: body 제너레이터의 작업을 하나의 데이터베이스 트랜잭션 안에서 실행
+Call = namedtuple('Call', ['service', 'method', 'args', 'kwargs'])
+Transaction = namedtuple('Transaction', ['body'])
+
+# 앱이 처리기에 넘기는 요청 정보
+#   args: 쿼리 문자열 매개변수, data: 요청 본문 (바이트열)
+#   if_none_match: If-None-Match 헤더 (werkzeug ETags), accept_encoding: Accept-Encoding 헤더
+RouteRequest = namedtuple('RouteRequest', ['args', 'data', 'if_none_match', 'accept_encoding'])
+
+# 처리기가 반환하는 응답 (mimetype이 None이면 앱의 기본값)
+RouteResponse = namedtuple('RouteResponse', ['body', 'status', 'mimetype', 'headers'])
+
+# 동기/비동기 텔레그램 클라이언트의 API 오류
+TELEGRAM_ERRORS = (apihelper.ApiTelegramException, asyncio_helper.ApiTelegramException)
+
+
+response_cache = ResponseCache()
+
+
+def call(service, method: str, *args, **kwargs) -> Call:
+    return Call(service, method, args, kwargs)
+
+
+def text_response(text: str, status: int = 200) -> RouteResponse:
+    return RouteResponse(text, status, None, {})
+
+
+# 객체를 JSON으로 직렬화하여 application/json 응답으로 반환
+def json_response(obj, status: int = 200) -> RouteResponse:
+    return RouteResponse(dumps(obj), status, JSON_CONTENT_TYPE, {})
+
+
+# 요청 본문을 JSON으로 파싱 (올바른 JSON 객체가 아니면 None)
+def parse_json_object(data: bytes):
+    try:
+        params = json.loads(data)
+
+    except ValueError:
+        return None
+
+    return params if isinstance(params, dict) else None
+
+
+# 알림 ID 목록이 정수(불리언 제외) 리스트인지 확인
+def is_alarm_id_list(value) -> bool:
+    return isinstance(value, list) and all(type(alarm_id) == int for alarm_id in value)
+
+
+# 처리기 제너레이터를 실행하고 응답을 반환 (동기 앱용)
+# resolve: 서비스 이름 -> 서비스 객체
+def run_route(handler, request: RouteRequest, resolve, **params) -> RouteResponse:
+    return run_operations(handler(request, **params), resolve)
+
+
+def run_operations(generator, resolve):
+    value, error = None, None
+
+    while True:
+        try:
+            operation = generator.send(value) if error is None else generator.throw(error)
+
+        except StopIteration as stop:
+            return stop.value
+
+        try:
+            value, error = perform(operation, resolve), None
+
+        except Exception as e:
+            value, error = None, e
+
+
+def perform(operation, resolve):
+    if isinstance(operation, Transaction):
+        with resolve('database').transaction():
+            return run_operations(operation.body, resolve)
+
+    return getattr(resolve(operation.service), operation.method)(*operation.args, **operation.kwargs)
+
+
+# 처리기 제너레이터를 실행하고 응답을 반환 (비동기 앱용)
+async def run_route_async(handler, request: RouteRequest, resolve, **params) -> RouteResponse:
+    return await run_operations_async(handler(request, **params), resolve)
+
+
+async def run_operations_async(generator, resolve):
+    value, error = None, None
+
+    while True:
+        try:
+            operation = generator.send(value) if error is None else generator.throw(error)
+
+        except StopIteration as stop:
+            return stop.value
+
+        try:
+            value, error = await perform_async(operation, resolve), None
+
+        except Exception as e:
+            value, error = None, e
+
+
+async def perform_async(operation, resolve):
+    if isinstance(operation, Transaction):
+        async with resolve('database').transaction():
+            return await run_operations_async(operation.body, resolve)
+
+    result = getattr(resolve(operation.service), operation.method)(*operation.args, **operation.kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+
+    return result
+
+
+# 리소스 버전을 ETag로 붙여 응답 (압축 여부와 관계없이 내용이 같으므로 약한 ETag 사용)
+# 클라이언트가 같은 버전을 가지고 있으면 본문 없이 304를 반환하고, 같은 버전의 응답이 캐시되어 있으면 다시 직렬화하지 않음
+# 압축한 본문도 압축 방식별로 캐시하여 캐시된 응답을 요청마다 다시 압축하지 않음
+# build_body: 응답 본문(바이트열)을 반환하는 제너레이터 함수
+def versioned_response(request: RouteRequest, cache_key, version: str, build_body):
+    headers = {'ETag': quote_etag(version, weak=True)}
+
+    if request.if_none_match.contains_weak(version):
+        return RouteResponse(b"", 304, None, headers)
+
+    encoding = select_encoding(request.accept_encoding)
+
+    entry = response_cache.get((cache_key, encoding), version)
+    if entry is None:
+        entry = compress_with((yield from build_body()), encoding)
+        response_cache.set((cache_key, encoding), version, entry)
+
+    body, content_encoding = entry
+    if content_encoding is not None:
+        headers['Content-Encoding'] = content_encoding
+
+    headers['Vary'] = 'Accept-Encoding'
+
+    return RouteResponse(body, 200, JSON_CONTENT_TYPE, headers)
+
+
+# 등록되지 않은 채널이면 오류 응답을, 등록된 채널이면 None을 반환
+def check_channel(channel_id: int):
+    if not (yield call('database', 'is_channel_exists', channel_id)):
+        return text_response('등록되지 않은 채널', 400)
+
+    return None
+
+
+# 채널과 알림이 모두 등록되어 있지 않으면 오류 응답을, 등록되어 있으면 None을 반환
+def check_alarm(channel_id: int, alarm_id: int):
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    if not (yield call('database', 'is_alarm_exists', alarm_id)):
+        return text_response('등록되지 않은 알림', 400)
+
+    return None
+
+
+# 알림 규칙이 잘못되었으면 오류 응답을, 올바르면 None을 반환
+def check_condition(condition):
+    try:
+        validate_condition(condition)
+
+    except InvalidConditionError as e:
+        return text_response(f"잘못된 알림 규칙: {e}", 400)
+
+    return None
+
+
+# 알림 ID 목록의 알림을 알림 규칙과 함께 조회하여 {'alarms': [...]} 응답으로 반환
+def alarms_response(alarm_ids: list):
+    result_set = yield call('database', 'select_alarms_in', alarm_ids)
+
+    return json_response({
+        'alarms': [alarm_row_to_dict(row) for row in result_set.values()]
+    })
+
+
+# 채팅 목록 요청
+def get_chats(request: RouteRequest):
+    result_set = yield call('database', 'select', table_name='chat')
+
+    return json_response({
+        'chats': list(result_set.keys())
+    })
+
+
+# 채팅 등록
+def post_chat(request: RouteRequest, chat_id: int):
+    if (yield call('database', 'is_chat_exists', chat_id)):
+        return text_response("이미 등록된 채팅")
+
+    try:
+        yield call('database', 'insert', table_name='chat', chat_id=chat_id)
+
+    except Exception as e:
+        return text_response(f"등록 실패: {e.args[0]}", 400)
+
+    return text_response('등록 성공', 200)
+
+
+# 채팅 삭제
+def delete_chat(request: RouteRequest, chat_id: int):
+    if not (yield call('database', 'is_chat_exists', chat_id)):
+        return text_response('등록되지 않은 채팅', 400)
+
+    try:
+        yield call('database', 'delete', table_name='chat', chat_id=chat_id)
+
+    except Exception as e:
+        return text_response(f"삭제 실패: {e.args[0]}", 400)
+
+    return text_response("삭제 성공", 200)
+
+
+# 채널 목록 요청
+def get_channels(request: RouteRequest):
+    def build_body():
+        result_set = yield call('database', 'select', table_name='channel')
+
+        return dumps({
+            'channels': [channel_row_to_dict(row) for row in result_set.values()]
+        })
+
+    version = yield call('database', 'get_version', 'channel')
+
+    return (yield from versioned_response(request, 'channels', version, build_body))
+
+
+# 채널 등록
+def post_channel(request: RouteRequest):
+    params = parse_json_object(request.data)
+    if params is None or 'channel_id' not in params or 'channel_name' not in params:
+        return text_response("잘못된 매개 변수", 400)
+
+    channel_id, channel_name = params['channel_id'], params['channel_name']
+
+    if (yield call('database', 'is_channel_exists', channel_id)):
+        return text_response('이미 등록된 채널', 400)
+
+    try:
+        yield call('database', 'insert', table_name='channel', channel_id=channel_id, channel_name=channel_name)
+
+    except Exception as e:
+        return text_response(f"등록 실패: {e.args[0]}", 400)
+
+    return text_response('등록 성공', 200)
+
+
+# 채널 삭제
+def delete_channel(request: RouteRequest, channel_id: str):
+    channel_id = int(channel_id)
+
+    if not (yield call('database', 'is_channel_exists', channel_id)):
+        return text_response('등록되지 않은 채팅', 400)
+
+    try:
+        yield call('database', 'delete', table_name='channel', channel_id=channel_id)
+
+    except Exception as e:
+        return text_response(f"삭제 실패: {e.args[0]}", 400)
+
+    return text_response("삭제 성공", 200)
+
+
+# 채널 정보 요청
+def get_channel_info(request: RouteRequest, channel_id: str):
+    channel_id = int(channel_id)
+
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    result_set = yield call('database', 'select', table_name='channel', channel_id=channel_id)
+
+    return json_response(channel_row_to_dict(result_set[channel_id]))
+
+
+# 채널의 알림 목록 요청
+def get_alarms(request: RouteRequest, channel_id: str):
+    channel_id = int(channel_id)
+
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    # 응답을 보내기 전에 결과를 모두 받아 커넥션을 반납 (느린 클라이언트가 풀의 커넥션을 붙잡지 않도록)
+    def build_body():
+        result_set = yield call('database', 'select_alarms', channel_id=channel_id)
+
+        return dumps({
+            'alarms': [alarm_row_to_dict(row) for row in result_set.values()]
+        })
+
+    version = yield call('database', 'get_version', 'alarm', channel_id)
+
+    return (yield from versioned_response(request, ('alarms', channel_id), version, build_body))
+
+
+# 채널에 알림 등록
+def post_alarm(request: RouteRequest, channel_id: str):
+    channel_id = int(channel_id)
+
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    params = parse_json_object(request.data)
+    if params is None:
+        return text_response("잘못된 매개 변수", 400)
+
+    error = check_condition(params.get('condition'))
+    if error is not None:
+        return error
+
+    # 알림 규칙과 알림을 하나의 트랜잭션으로 등록하여, 알림 등록에 실패하면 알림 규칙도 남지 않도록 함
+    added = {}
+
+    def insert_alarm():
+        added['condition_id'] = yield call('database', 'insert_condition', params['condition'])
+
+        return (yield call(
+            'database', 'insert',
+            table_name='alarm',
+            channel_id=params['channel_id'],
+            exchange_id=params['exchange_id'],
+            base_symbol=params['base_symbol'],
+            quote_symbol=params['quote_symbol'],
+            condition_id=added['condition_id']
+        ))
+
+    try:
+        added_alarm_id = yield Transaction(insert_alarm())
+
+    except Exception as e:
+        if 'condition_id' not in added:
+            return text_response("알림 규칙 등록 실패", 400)
+
+        return text_response(f"알림 등록 실패: {e.args[0]}", 400)
+
+    result_set = yield call('database', 'select_alarms', alarm_id=added_alarm_id)
+
+    return json_response(alarm_row_to_dict(result_set[added_alarm_id]))
+
+
+# 채널에 여러 알림을 한 번에 등록
+# 요청 본문: {"alarms": [{"exchange_id", "base_symbol", "quote_symbol", "condition", ("is_enabled")}, ...]}
+def post_alarms_batch(request: RouteRequest, channel_id: str):
+    channel_id = int(channel_id)
+
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    params = parse_json_object(request.data)
+    if params is None or not isinstance(params.get('alarms'), list) \
+            or not all(isinstance(alarm_params, dict) for alarm_params in params['alarms']):
+        return text_response("잘못된 매개변수: 'alarms'는 알림 객체 목록", 400)
+
+    alarm_list = None
+    try:
+        if not all(isinstance(alarm_params.get('is_enabled', True), bool) for alarm_params in params['alarms']):
+            return text_response("잘못된 매개변수: 'is_enabled'는 true 또는 false", 400)
+
+        alarm_list = [
+            {
+                'exchange_id': alarm_params['exchange_id'],
+                'base_symbol': alarm_params['base_symbol'],
+                'quote_symbol': alarm_params['quote_symbol'],
+                'condition': alarm_params['condition'],
+                'is_enabled': alarm_params.get('is_enabled', True)
+            }
+            for alarm_params in params['alarms']
+        ]
+
+    except Exception as e:
+        return text_response("잘못된 매개 변수", 400)
+
+    for alarm in alarm_list:
+        error = check_condition(alarm['condition'])
+        if error is not None:
+            return error
+
+    try:
+        added_alarm_ids = yield call('database', 'insert_alarms', channel_id, alarm_list)
+
+    except Exception as e:
+        return text_response(f"알림 등록 실패: {e.args[0]}", 400)
+
+    return (yield from alarms_response(added_alarm_ids))
+
+
+# 채널의 알림을 한 번에 활성화/비활성화
+# 요청 본문: {"is_enabled": bool, ("alarm_ids": [...])}, alarm_ids가 없으면 채널의 모든 알림을 변경
+def patch_alarms(request: RouteRequest, channel_id: str):
+    channel_id = int(channel_id)
+
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    params = parse_json_object(request.data)
+    if params is None or not 'is_enabled' in params.keys():
+        return text_response("잘못된 매개변수: 'is_enabled' 누락", 400)
+
+    # "false" 같은 문자열이 True로 바뀌지 않도록 JSON 불리언만 허용
+    if not isinstance(params['is_enabled'], bool):
+        return text_response("잘못된 매개변수: 'is_enabled'는 true 또는 false", 400)
+
+    if 'alarm_ids' in params.keys() and not is_alarm_id_list(params['alarm_ids']):
+        return text_response("잘못된 매개변수: 'alarm_ids'는 정수 목록", 400)
+
+    updated_alarm_ids = yield call(
+        'database', 'update_alarms_enabled',
+        channel_id,
+        params['is_enabled'],
+        alarm_ids=params.get('alarm_ids')
+    )
+
+    return (yield from alarms_response(updated_alarm_ids))
+
+
+# 채널의 알림 정보 요청
+def get_alarm_info(request: RouteRequest, channel_id: str, alarm_id: int):
+    channel_id = int(channel_id)
+
+    error = yield from check_channel(channel_id)
+    if error is not None:
+        return error
+
+    result_set = yield call('database', 'select_alarms', alarm_id=alarm_id)
+    if len(result_set) == 0:
+        return text_response('등록되지 않은 알림', 400)
+
+    return json_response(alarm_row_to_dict(result_set[alarm_id]))
+
+
+# 채널의 알림 정보 수정
+def patch_alarm_info(request: RouteRequest, channel_id: str, alarm_id: int):
+    channel_id = int(channel_id)
+
+    error = yield from check_alarm(channel_id, alarm_id)
+    if error is not None:
+        return error
+
+    params = parse_json_object(request.data)
+    if params is None:
+        return text_response("잘못된 매개 변수", 400)
+
+    # 기존 알림 규칙은 올바르므로 바꾸는 항목만 확인
+    if 'condition' in params.keys():
+        error = check_condition(params['condition'])
+        if error is not None:
+            return error
+
+    def update_alarm():
+        if 'condition' in params.keys():
+            # 다른 알림과 공유 중일 수 있으므로 알림 규칙을 직접 수정하지 않고, 수정된 내용의 알림 규칙으로 교체
+            alarm_row = (yield call('database', 'select_alarms', alarm_id=alarm_id))[alarm_id]
+            condition = {kind: alarm_row[kind] for kind in CONDITION_KINDS}
+            condition.update(params['condition'])
+
+            condition_id = yield call('database', 'insert_condition', condition)
+            yield call('database', 'update', table_name='alarm', primary_key=alarm_id, condition_id=condition_id)
+
+        if 'is_enabled' in params.keys():
+            yield call('database', 'update', table_name='alarm', primary_key=alarm_id, is_enabled=params['is_enabled'])
+
+    yield Transaction(update_alarm())
+
+    result_set = yield call('database', 'select_alarms', alarm_id=alarm_id)
+
+    return json_response(alarm_row_to_dict(result_set[alarm_id]))
+
+
+# 채널에서 알림 삭제
+def delete_alarm(request: RouteRequest, channel_id: str, alarm_id: int):
+    channel_id = int(channel_id)
+
+    error = yield from check_alarm(channel_id, alarm_id)
+    if error is not None:
+        return error
+
+    yield call('database', 'delete', table_name='alarm', alarm_id=alarm_id)
+
+    return text_response("삭제 성공", 200)
+
+
+# 거래소 목록 요청
+def get_exchanges(request: RouteRequest):
+    def build_body():
+        result_set = yield call('database', 'select', table_name='exchange')
+
+        return dumps({
+            'exchanges': [exchange_row_to_dict(row) for row in result_set.values()]
+        })
+
+    version = yield call('database', 'get_version', 'exchange')
+
+    return (yield from versioned_response(request, 'exchanges', version, build_body))
+
+
+# 거래소 정보 요청
+def get_exchange_info(request: RouteRequest, exchange_id: int):
+    if not (yield call('database', 'is_exchange_exists', exchange_id)):
+        return text_response("존재하지 않는 거래소", 400)
+
+    def build_body():
+        result_set = yield call('database', 'select', table_name='exchange', exchange_id=exchange_id)
+
+        return dumps(exchange_row_to_dict(result_set[exchange_id]))
+
+    version = yield call('database', 'get_version', 'exchange')
+
+    return (yield from versioned_response(request, ('exchange', exchange_id), version, build_body))
+
+
+# 거래소의 화폐 목록 요청
+def get_currencies(request: RouteRequest, exchange_id: int):
+    if not (yield call('database', 'is_exchange_exists', exchange_id)):
+        return text_response("존재하지 않는 거래소", 400)
+
+    exchange = ('exchange', exchange_id)
+
+    # 'query' 파라미터 존재 시 심볼 검색 결과만 반환 (자동 완성용)
+    args = request.args
+    if 'query' in args.keys():
+        currency_dict_list = yield call(exchange, 'search_currencies', args['query'])
+
+    else:
+        currency_dict_list = yield call(exchange, 'get_currencies')
+
+    return json_response({
+        'currencies': currency_dict_list
+    })
+
+
+# 거래소의 종목 목록 요청
+def get_items(request: RouteRequest, exchange_id: int):
+    if not (yield call('database', 'is_exchange_exists', exchange_id)):
+        return text_response("존재하지 않는 거래소", 400)
+
+    args = request.args
+    quote_symbol = args.get('quote_symbol')
+
+    exchange = ('exchange', exchange_id)
+
+    # 'query' 파라미터 존재 시 기초 자산 심볼 검색 결과를 반환 (자동 완성용)
+    if 'query' in args.keys():
+        item_dict_list = yield call(exchange, 'search_items', args['query'], quote_symbol=quote_symbol)
+
+    elif 'base_symbol' in args.keys():
+        item_dict_list = yield call(exchange, 'get_items', base_symbol=args['base_symbol'], quote_symbol=quote_symbol)
+
+    else:
+        return text_response("잘못된 매개변수: 'base_symbol' 누락", 400)
+
+    return json_response({
+        'items': item_dict_list
+    })
+
+
+# 채널로 테스트 메시지를 보내 채널 ID 확인
+def get_channel_id(request: RouteRequest):
+    if 'channel_link' not in request.args.keys():
+        return text_response("잘못된 매개변수", 400)
+
+    channel_link = request.args['channel_link']
+
+    try:
+        sended_message = yield call('bot', 'send_message', '@' + channel_link, "채널 ID 확인용 메시지입니다.")
+
+    except TELEGRAM_ERRORS as e:
+        return text_response(f'{e.error_code}: {e.description}', 400)
+
+    return json_response({'channel_id': sended_message.chat.id})
+
+
+# (경로, 메서드 목록, 처리기)
+ROUTES = [
+    ('/chats', ['GET'], get_chats),
+    ('/chats/<int:chat_id>', ['POST'], post_chat),
+    ('/chats/<int:chat_id>', ['DELETE'], delete_chat),
+    ('/channels', ['GET'], get_channels),
+    ('/channels', ['POST'], post_channel),
+    ('/channels/<channel_id>', ['DELETE'], delete_channel),
+    ('/channels/<channel_id>', ['GET'], get_channel_info),
+    ('/channels/<channel_id>/alarms', ['GET'], get_alarms),
+    ('/channels/<channel_id>/alarms', ['POST'], post_alarm),
+    ('/channels/<channel_id>/alarms:batch', ['POST'], post_alarms_batch),
+    ('/channels/<channel_id>/alarms', ['PATCH'], patch_alarms),
+    ('/channels/<channel_id>/alarms/<int:alarm_id>', ['GET'], get_alarm_info),
+    ('/channels/<channel_id>/alarms/<int:alarm_id>', ['PATCH'], patch_alarm_info),
+    ('/channels/<channel_id>/alarms/<int:alarm_id>', ['DELETE'], delete_alarm),
+    ('/exchanges', ['GET'], get_exchanges),
+    ('/exchanges/<int:exchange_id>', ['GET'], get_exchange_info),
+    ('/exchanges/<int:exchange_id>/currencies', ['GET'], get_currencies),
+    ('/exchanges/<int:exchange_id>/items', ['GET'], get_items),
+    ('/telegram/get-channel-id', ['GET'], get_channel_id)
+]
@@ -0,0 +1,120 @@
+# API 응답용 JSON 직렬화와 압축
+# orjson이 설치되어 있으면 사용하고, 없으면 표준 json 모듈을 사용
+# 두 직렬화기 모두 공백 없는 UTF-8 JSON 바이트열을 만들어 어느 쪽을 쓰든 응답 형식이 같음
+import gzip
+import json
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+
+except ImportError:
+    brotli = None
+
+
+JSON_CONTENT_TYPE = 'application/json'
+
+# 이 크기(바이트) 이상인 응답만 압축
+COMPRESS_MIN_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class JsonSerializer:
+    name = 'json'
+
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonSerializer:
+    name = 'orjson'
+
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj)
+
+
+serializers = {
+    'json': JsonSerializer
+}
+
+if orjson is not None:
+    serializers['orjson'] = OrjsonSerializer
+
+
+# 이름으로 직렬화기 반환 (None이면 사용 가능한 가장 빠른 직렬화기)
+def get_serializer(name: str = None):
+    if name is None:
+        name = 'orjson' if 'orjson' in serializers else 'json'
+
+    return serializers[name]()
+
+
+serializer = get_serializer()
+
+
+def dumps(obj) -> bytes:
+    return serializer.dumps(obj)
+
+
+# Accept-Encoding 헤더에서 클라이언트가 받을 수 있는 압축 방식 목록을 반환 (q=0인 방식은 제외)
+def parse_accept_encoding(accept_encoding: str) -> set:
+    encodings = set()
+
+    for item in accept_encoding.split(','):
+        encoding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+
+            except ValueError:
+                continue
+
+        encodings.add(encoding.strip().lower())
+
+    return encodings
+
+
+# 클라이언트가 받을 수 있는 압축 방식 중 사용할 방식 (없으면 None)
+def select_encoding(accept_encoding: str) -> str:
+    if not accept_encoding:
+        return None
+
+    encodings = parse_accept_encoding(accept_encoding)
+
+    if brotli is not None and 'br' in encodings:
+        return 'br'
+
+    if 'gzip' in encodings:
+        return 'gzip'
+
+    return None
+
+
+# 응답 본문을 encoding 방식으로 압축하여 (본문, Content-Encoding)을 반환
+# 본문이 작거나 encoding이 None이면 (원래 본문, None)
+def compress_with(body: bytes, encoding: str) -> tuple:
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return body, None
+
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+
+    return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+
+
+# 응답 본문을 클라이언트가 받을 수 있는 방식으로 압축하여 (본문, Content-Encoding)을 반환
+# 본문이 작거나 받을 수 있는 방식이 없으면 (원래 본문, None)
+def compress(body: bytes, accept_encoding: str) -> tuple:
+    return compress_with(body, select_encoding(accept_encoding))
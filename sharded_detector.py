@@ -0,0 +1,419 @@
+# 다중 프로세스 감지기
+# 종목(거래소 ID, 기초 자산, 견적 자산)을 일관된 해싱으로 작업 프로세스에 나누어 배정하고,
+# 각 작업 프로세스는 자기 종목의 알림만 가지고 체결 감지(Detector)와 지표 감지(IndicatorEngine)를 실행
+# 체결은 작업 프로세스마다 하나씩 있는 공유 메모리 링 버퍼(TradeRing)로, 알림 추가/삭제는 제어 큐로 전달
+# 작업 프로세스를 추가하면 새 프로세스가 맡게 된 종목의 알림만 옮겨짐
+# (캔들 저장소 경로가 주어지면 옮겨진 종목의 지표 상태는 저장된 캔들로 다시 계산하고, 아니면 새로 쌓음)
+# 작업 프로세스가 예외 등으로 종료되면 같은 번호로 다시 시작하고 맡던 종목의 알림을 다시 보냄
+# (종료된 프로세스가 처리하지 못한 체결은 버려짐)
+# 체결은 이벤트 루프에서 process로(링이 가득 차도 루프를 막지 않음), 일괄 재생에서는 process_batch로(가득 차면 기다림) 보냄
+import sys
+import time
+import queue
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+
+from detector import AlarmIndex, Detector
+from indicator import IndicatorEngine, add_alarm_or_skip
+from candle_store import CandleStore
+from hash_ring import ConsistentHashRing
+from trade_ring import TradeRing, ConsumerDiedError, TRADE_RING_CAPACITY, FULL_WAIT, encode_symbol
+
+
+# 작업 프로세스가 한 번에 읽는 최대 체결 수
+WORKER_BATCH_SIZE = 1024
+
+# 읽을 체결이 없을 때 작업 프로세스가 기다리는 시간 (초)
+WORKER_IDLE_WAIT = 0.0005
+
+
+# 작업 프로세스 본체
+# alert_queue가 주어지면 감지된 알림을 부모 프로세스로 보내고, 종료할 때 (작업 번호, 처리한 체결 수, 감지된 알림 수)를 result_queue로 보냄
+# 종목마다 맡는 작업 프로세스가 하나뿐이므로 캔들 저장소의 같은 파일에 두 프로세스가 함께 쓰지 않음
+def run_worker(worker_id: int, ring_name: str, ring_lock, ring_capacity: int, control_queue, alert_queue, result_queue,
+               candle_store_path: str = None):
+    trade_ring = TradeRing(ring_capacity, name=ring_name, lock=ring_lock)
+
+    candle_store = None
+    if candle_store_path is not None:
+        candle_store = CandleStore(candle_store_path)
+        candle_store.start_compaction()
+
+    on_alert = alert_queue.put if alert_queue is not None else None
+    alarm_index = AlarmIndex()
+    detector = Detector(alarm_index, on_alert=on_alert)
+    indicator_engine = IndicatorEngine(on_alert=on_alert, candle_store=candle_store)
+
+    indicator_alert_count = 0
+    command_count = 0
+    is_running = True
+    while True:
+        # 제어 명령 처리: ('add', 알림 목록), ('remove', 알림 ID 목록), ('stop', )
+        # 지금까지 보낸 것으로 기록된 명령은 큐에 도착할 때까지 기다려서라도 모두 처리한 뒤 체결을 읽음
+        while command_count < int(trade_ring.commands[0]):
+            command, *args = control_queue.get()
+            command_count += 1
+
+            if command == 'add':
+                for alarm in args[0]:
+                    if alarm_index.add(alarm):
+                        add_alarm_or_skip(indicator_engine, alarm)
+
+            elif command == 'remove':
+                for alarm_id in args[0]:
+                    alarm_index.remove(alarm_id)
+                    indicator_engine.remove_alarm(alarm_id)
+
+            elif command == 'stop':
+                is_running = False
+
+            trade_ring.mark_commands_done(command_count)
+
+        trades = trade_ring.read(WORKER_BATCH_SIZE)
+        if len(trades) == 0:
+            # 종료 명령을 받았으면 이미 기록된 체결까지 처리한 뒤 종료
+            if not is_running:
+                break
+
+            time.sleep(WORKER_IDLE_WAIT)
+            continue
+
+        for trade in trades:
+            detector.process(trade)
+            indicator_alert_count += len(indicator_engine.process(trade))
+
+        trade_ring.mark_done(len(trades))
+
+    result_queue.put((worker_id, detector.trade_count, detector.alert_count + indicator_alert_count))
+    trade_ring.close()
+
+    if candle_store is not None:
+        candle_store.close()
+
+
+class Worker:
+    def __init__(self, worker_id: int, ring_capacity: int, alert_queue, result_queue, candle_store_path: str = None):
+        self.worker_id = worker_id
+        self.trade_ring = TradeRing(ring_capacity)
+        self.control_queue = multiprocessing.Queue()
+
+        # 링이 가득 차 아직 기록하지 못한 체결 (process로 보낸 체결만, 순서대로 기록)
+        # 대기 중인 체결은 그 사이에 보낸 제어 명령이 반영된 뒤에 처리될 수 있음
+        self.pending_trades = deque()
+        self.flush_task = None
+
+        self.process = multiprocessing.Process(
+            target=run_worker,
+            args=(worker_id, self.trade_ring.name, self.trade_ring.lock, ring_capacity, self.control_queue,
+                  alert_queue, result_queue, candle_store_path),
+            daemon=True
+        )
+        self.process.start()
+
+    
+    # 제어 명령을 보냄 (이후에 보내는 체결은 명령이 반영된 뒤에 처리됨)
+    def send(self, *command):
+        self.control_queue.put(command)
+        self.trade_ring.add_command()
+
+    
+    # 체결 목록을 보냄 (작업 프로세스가 종료되었으면 ConsumerDiedError 발생)
+    def write(self, trades):
+        self.trade_ring.write_all(trades, is_alive=self.process.is_alive)
+
+    
+    # 체결 목록을 기다리지 않고 보냄
+    # 먼저 보낸 체결이 대기 중이거나 링에 자리가 없으면 대기 목록에 넣고, 대기 목록을 비우는 중이 아니면 True를 반환
+    def write_nowait(self, trades) -> bool:
+        if len(self.pending_trades) == 0:
+            written_count = self.trade_ring.write(trades)
+            if written_count == len(trades):
+                return False
+
+            trades = trades[written_count:]
+
+        self.pending_trades.extend(trades)
+
+        return self.flush_task is None
+
+    
+    # 대기 목록의 체결을 소비자가 읽는 대로 기록 (링이 가득 찬 동안은 await asyncio.sleep으로 기다림)
+    # 작업 프로세스가 종료되었으면 ConsumerDiedError 발생
+    async def flush(self):
+        pending_trades = self.pending_trades
+
+        while len(pending_trades) > 0:
+            if not self.process.is_alive():
+                raise ConsumerDiedError()
+
+            await asyncio.sleep(FULL_WAIT)
+
+            trades = [pending_trades[index] for index in range(min(len(pending_trades), self.trade_ring.capacity))]
+            for _ in range(self.trade_ring.write(trades)):
+                pending_trades.popleft()
+
+    
+    # 보낸 체결이 모두 처리될 때까지 기다림 (작업 프로세스가 종료되었으면 ConsumerDiedError 발생)
+    def wait_done(self):
+        self.trade_ring.wait_done(is_alive=self.process.is_alive)
+
+    
+    # 보낸 제어 명령이 모두 처리될 때까지 기다림 (작업 프로세스가 종료되었으면 ConsumerDiedError 발생)
+    def wait_commands_done(self):
+        self.trade_ring.wait_commands_done(is_alive=self.process.is_alive)
+
+    
+    def close(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+
+        self.process.join(timeout=10)
+        self.trade_ring.close()
+
+
+class ShardedDetector:
+    # on_alert: 작업 프로세스에서 감지된 알림을 받을 함수 (부모 프로세스의 별도 스레드에서 호출됨)
+    # candle_store_path: 작업 프로세스들이 함께 사용할 캔들 저장소 경로
+    def __init__(self, worker_count: int, on_alert=None, ring_capacity: int = TRADE_RING_CAPACITY, candle_store_path: str = None):
+        self.on_alert = on_alert
+        self.ring_capacity = ring_capacity
+        self.candle_store_path = candle_store_path
+
+        self.hash_ring = ConsistentHashRing()
+        self.workers = {}           # 작업 번호 -> Worker
+        self.alarms = {}            # 알림 ID -> AlarmRule
+        self.market_alarms = {}     # 종목 -> 알림 ID 집합
+        self.market_workers = {}    # 알림이 걸린 종목 -> 작업 번호
+
+        self.alert_queue = multiprocessing.Queue() if on_alert is not None else None
+        self.result_queue = multiprocessing.Queue()
+
+        self.alert_thread = None
+        if on_alert is not None:
+            self.alert_thread = threading.Thread(target=self.deliver_alerts, daemon=True)
+            self.alert_thread.start()
+
+        for _ in range(worker_count):
+            self.add_worker()
+
+    
+    def deliver_alerts(self):
+        while True:
+            alert = self.alert_queue.get()
+            if alert is None:
+                break
+
+            self.on_alert(alert)
+
+    
+    # 작업 프로세스를 하나 추가하고, 새 프로세스가 맡게 된 종목의 알림을 옮김
+    def add_worker(self) -> int:
+        worker_id = max(self.workers.keys(), default=-1) + 1
+        self.workers[worker_id] = Worker(worker_id, self.ring_capacity, self.alert_queue, self.result_queue, self.candle_store_path)
+        self.hash_ring.add_node(worker_id)
+
+        moved_alarms = {}   # 이전 작업 번호 -> 옮길 알림 목록
+        for market, previous_worker_id in self.market_workers.items():
+            current_worker_id = self.hash_ring.get_node(market)
+            if current_worker_id == previous_worker_id:
+                continue
+
+            self.market_workers[market] = current_worker_id
+            moved_alarms.setdefault(previous_worker_id, []).extend(
+                self.alarms[alarm_id] for alarm_id in self.market_alarms[market]
+            )
+
+        # 옮겨지는 종목의 체결이 이전 작업 프로세스에서 모두 처리된 뒤에 옮김
+        for previous_worker_id, alarms in moved_alarms.items():
+            self.wait_worker_done(previous_worker_id)
+            self.workers[previous_worker_id].send('remove', [alarm.alarm_id for alarm in alarms])
+
+        # 이전 작업 프로세스가 옮겨지는 종목의 캔들 파일을 닫은 뒤에 새 작업 프로세스가 열도록 함
+        for previous_worker_id in moved_alarms.keys():
+            try:
+                self.workers[previous_worker_id].wait_commands_done()
+
+            except ConsumerDiedError:
+                self.restart_worker(previous_worker_id)
+
+        added_alarms = [alarm for alarms in moved_alarms.values() for alarm in alarms]
+        if len(added_alarms) > 0:
+            self.workers[worker_id].send('add', added_alarms)
+
+        return worker_id
+
+    
+    # 종료된 작업 프로세스를 같은 번호로 다시 시작하고, 맡고 있던 종목의 알림을 다시 보냄
+    def restart_worker(self, worker_id: int):
+        worker = self.workers[worker_id]
+        print(f"worker {worker_id} exited with code {worker.process.exitcode}, restarting", file=sys.stderr)
+
+        worker.close()
+        self.workers[worker_id] = Worker(worker_id, self.ring_capacity, self.alert_queue, self.result_queue, self.candle_store_path)
+
+        alarms = [
+            self.alarms[alarm_id]
+            for market, market_worker_id in self.market_workers.items() if market_worker_id == worker_id
+            for alarm_id in self.market_alarms[market]
+        ]
+        if len(alarms) > 0:
+            self.workers[worker_id].send('add', alarms)
+
+    
+    # 작업 프로세스로 체결 목록을 보냄 (작업 프로세스가 종료되었으면 다시 시작하고 남은 체결은 버림)
+    def write_worker(self, worker_id: int, trades):
+        try:
+            self.workers[worker_id].write(trades)
+
+        except ConsumerDiedError:
+            self.restart_worker(worker_id)
+
+    
+    # 작업 프로세스가 보낸 체결을 모두 처리할 때까지 기다림 (작업 프로세스가 종료되었으면 다시 시작)
+    def wait_worker_done(self, worker_id: int):
+        try:
+            self.workers[worker_id].wait_done()
+
+        except ConsumerDiedError:
+            self.restart_worker(worker_id)
+
+    
+    def add_alarm(self, alarm):
+        self.add_alarms([alarm])
+
+    
+    # 알림을 종목별 작업 프로세스에 나누어 한 번에 등록
+    # 심볼이 링의 심볼 필드보다 긴 종목의 알림은 체결을 보낼 수 없으므로 로그를 남기고 건너뜀
+    def add_alarms(self, alarms):
+        for alarm in alarms:
+            self.remove_alarm(alarm.alarm_id)
+
+        alarms = [alarm for alarm in alarms if self.check_symbols(alarm)]
+
+        alarms_by_worker = {}
+        for alarm in alarms:
+            market = alarm.get_market()
+
+            self.alarms[alarm.alarm_id] = alarm
+            self.market_alarms.setdefault(market, set()).add(alarm.alarm_id)
+
+            worker_id = self.market_workers.get(market)
+            if worker_id is None:
+                worker_id = self.market_workers[market] = self.hash_ring.get_node(market)
+
+            alarms_by_worker.setdefault(worker_id, []).append(alarm)
+
+        for worker_id, worker_alarms in alarms_by_worker.items():
+            self.workers[worker_id].send('add', worker_alarms)
+
+    
+    def remove_alarm(self, alarm_id: int):
+        alarm = self.alarms.pop(alarm_id, None)
+        if alarm is None:
+            return
+
+        market = alarm.get_market()
+        worker_id = self.market_workers[market]
+
+        self.market_alarms[market].discard(alarm_id)
+        if len(self.market_alarms[market]) == 0:
+            del self.market_alarms[market]
+            del self.market_workers[market]
+
+        self.workers[worker_id].send('remove', [alarm_id])
+
+    
+    @staticmethod
+    def check_symbols(alarm) -> bool:
+        try:
+            encode_symbol(alarm.base_symbol)
+            encode_symbol(alarm.quote_symbol)
+
+        except ValueError as e:
+            print(f"skipping alarm {alarm.alarm_id}: {e}", file=sys.stderr)
+            return False
+
+        return True
+
+    
+    # 체결 하나를 해당 종목을 맡은 작업 프로세스로 보냄 (알림이 없는 종목의 체결은 버림)
+    # 이벤트 루프에서 호출하며, 링이 가득 차면 기다리지 않고 작업별 대기 목록에 넣은 뒤 루프의 태스크가 이어서 기록
+    def process(self, trade):
+        worker_id = self.market_workers.get((trade.exchange_id, trade.base_symbol, trade.quote_symbol))
+        if worker_id is None:
+            return
+
+        worker = self.workers[worker_id]
+        if worker.write_nowait([trade]):
+            worker.flush_task = asyncio.get_running_loop().create_task(self.flush_worker(worker_id, worker))
+
+    
+    # 작업 프로세스의 대기 목록을 비움 (작업 프로세스가 종료되었으면 다시 시작하고 남은 체결은 버림)
+    async def flush_worker(self, worker_id: int, worker: Worker):
+        try:
+            await worker.flush()
+
+        except ConsumerDiedError:
+            # 다시 시작하며 이전 작업 프로세스를 닫을 때 이 태스크를 취소하지 않도록 먼저 비움
+            worker.flush_task = None
+            if self.workers.get(worker_id) is worker:
+                self.restart_worker(worker_id)
+
+        finally:
+            worker.flush_task = None
+
+    
+    # process로 보낸 체결 중 링이 가득 차 대기 중인 체결이 모두 기록될 때까지 기다림
+    async def flush(self):
+        while True:
+            tasks = [worker.flush_task for worker in self.workers.values() if worker.flush_task is not None]
+            if len(tasks) == 0:
+                return
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    
+    # 체결 목록을 작업 프로세스별로 나누어 한 번에 보냄
+    def process_batch(self, trades):
+        market_workers = self.market_workers
+
+        trades_by_worker = {}
+        for trade in trades:
+            worker_id = market_workers.get((trade.exchange_id, trade.base_symbol, trade.quote_symbol))
+            if worker_id is not None:
+                trades_by_worker.setdefault(worker_id, []).append(trade)
+
+        for worker_id, worker_trades in trades_by_worker.items():
+            self.write_worker(worker_id, worker_trades)
+
+    
+    # 지금까지 보낸 체결이 모두 처리될 때까지 기다림
+    def wait_done(self):
+        for worker_id in list(self.workers.keys()):
+            self.wait_worker_done(worker_id)
+
+    
+    # 작업 프로세스를 모두 종료하고 작업 번호 -> (처리한 체결 수, 감지된 알림 수)를 반환
+    def stop(self) -> dict:
+        for worker in self.workers.values():
+            worker.send('stop')
+
+        results = {}
+        for _ in range(len(self.workers)):
+            try:
+                worker_id, trade_count, alert_count = self.result_queue.get(timeout=10)
+                results[worker_id] = (trade_count, alert_count)
+
+            except queue.Empty:
+                break
+
+        for worker in self.workers.values():
+            worker.close()
+
+        if self.alert_thread is not None:
+            self.alert_queue.put(None)
+            self.alert_thread.join()
+
+        return results
@@ -0,0 +1,58 @@
+# 지표 계산 구독 레지스트리
+# 같은 종목에 내용이 같은 지표 조건(예: 1분봉 14기간 RSI 70/30)을 건 알림은 하나의 구독을 공유
+# 구독마다 지표를 한 번만 평가하고 그 결과를 구독 중인 모든 알림에 전달
+from condition import get_content_hash
+
+
+class Subscription:
+    __slots__ = ('key', 'market', 'kind', 'spec', 'alarms')
+
+    def __init__(self, key: tuple, market: tuple, kind: str, spec: dict):
+        self.key = key
+        self.market = market
+        self.kind = kind
+        self.spec = spec
+        self.alarms = {}    # 알림 ID -> AlarmRule
+
+    
+    # 구독 중인 알림 수 (참조 횟수)
+    def __len__(self):
+        return len(self.alarms)
+
+
+class SubscriptionRegistry:
+    def __init__(self):
+        self.subscriptions = {}     # (종목, 지표 종류, 조건 해시) -> Subscription
+        self.alarm_keys = {}        # 알림 ID -> 알림이 구독 중인 구독 키 목록
+
+    
+    # 알림을 해당 지표 조건의 구독에 추가하고 (구독, 새로 만들어진 구독인지 여부)를 반환
+    def subscribe(self, alarm, kind: str, spec: dict) -> tuple:
+        market = alarm.get_market()
+        key = (market, kind, get_content_hash(spec))
+
+        subscription = self.subscriptions.get(key)
+        is_new = subscription is None
+        if is_new:
+            subscription = Subscription(key, market, kind, spec)
+            self.subscriptions[key] = subscription
+
+        subscription.alarms[alarm.alarm_id] = alarm
+        self.alarm_keys.setdefault(alarm.alarm_id, []).append(key)
+
+        return subscription, is_new
+
+    
+    # 알림의 모든 구독을 해제하고, 구독 중인 알림이 없어 삭제된 구독 목록을 반환
+    def unsubscribe(self, alarm_id: int) -> list:
+        removed_subscriptions = []
+
+        for key in self.alarm_keys.pop(alarm_id, []):
+            subscription = self.subscriptions[key]
+            subscription.alarms.pop(alarm_id, None)
+
+            if len(subscription) == 0:
+                del self.subscriptions[key]
+                removed_subscriptions.append(subscription)
+
+        return removed_subscriptions
@@ -0,0 +1,33 @@
+# 텔레그램 봇 클라이언트
+# 봇은 프로세스 전체에서 하나만 만들어 재사용하고, 토큰 파일의 봇 토큰이 바뀌면 다시 만듦
+# 텔레그램 API 요청은 keep-alive 커넥션 풀을 가진 공유 HTTP 세션으로 보냄
+import threading
+
+from telebot import TeleBot, apihelper
+
+from config import tokens
+from http_client import create_session
+
+
+bot = None
+bot_token = None
+bot_lock = threading.Lock()
+
+
+def get_bot() -> TeleBot:
+    global bot, bot_token
+
+    token = tokens['telegram_token']
+    if bot is not None and token == bot_token:
+        return bot
+
+    with bot_lock:
+        if bot is None or token != bot_token:
+            # telebot은 apihelper.session이 지정되어 있으면 모든 스레드에서 그 세션을 사용
+            if apihelper.session is None:
+                apihelper.session = create_session()
+
+            bot = TeleBot(token)
+            bot_token = token
+
+        return bot
@@ -0,0 +1,58 @@
+# candle_store.py 캔들 저장소 테스트
+import os
+
+import pytest
+
+from candle_store import CandleStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandleStore(str(tmp_path / 'candles'))
+    yield store
+    store.close()
+
+
+def test_append_and_read(store):
+    market = (1, 'BTC', 'KRW')
+    for open_time in range(5):
+        store.append(market, '1m', open_time * 60, 100.0 + open_time)
+
+    open_times, closes = store.read(market, '1m', 3)
+
+    assert open_times.tolist() == [120, 180, 240]
+    assert closes.tolist() == [102.0, 103.0, 104.0]
+
+
+@pytest.mark.parametrize('market', [
+    (1, '../../..', 'KRW'),
+    (1, 'BTC', '/etc'),
+    (1, '..', '..'),
+    (1, 'BTC/../../x', 'KRW')
+])
+def test_symbols_stay_inside_root(store, market):
+    path = store.get_series_path(market, '1m')
+
+    assert os.path.commonpath([store.root, path]) == store.root
+    assert os.path.dirname(os.path.dirname(path)) == os.path.join(store.root, '1')
+
+
+@pytest.mark.parametrize('market, interval', [
+    ((1, 'BTC', 'KRW'), '../1m'),
+    ((1, 'BTC', 'KRW'), '1m/../..'),
+    ((1, 'BTC', 'KRW'), '/tmp'),
+    ((1, 'BTC', 'KRW'), ''),
+    (('../1', 'BTC', 'KRW'), '1m'),
+    ((1, '', 'KRW'), '1m')
+])
+def test_invalid_path_components_rejected(store, market, interval):
+    with pytest.raises(ValueError):
+        store.get_series(market, interval)
+
+    assert store.series == {}
+
+
+# 구분자 '_'도 인코딩하므로 서로 다른 종목이 같은 디렉터리를 쓰지 않음
+def test_symbol_encoding_is_unambiguous(store):
+    assert store.get_series_path((1, 'A_B', 'C'), '1m') != store.get_series_path((1, 'A', 'B_C'), '1m')
+    assert store.get_series_path((1, 'BTC', 'KRW'), '1m') == os.path.join(store.root, '1', 'BTC_KRW', '1m')
@@ -0,0 +1,108 @@
+# detector.py 알림 색인과 alarm_feed.py 변경 반영 테스트
+import asyncio
+
+import pytest
+
+import alarm_feed
+from alarm_feed import AlarmChangeFeed
+from condition import InvalidConditionError, validate_condition
+from detector import AlarmIndex, AlarmRule, Detector, Trade
+
+
+MARKET = (1, 'BTC', 'KRW')
+
+
+def make_alarm(alarm_id: int, condition: dict) -> AlarmRule:
+    return AlarmRule(alarm_id, 1, *MARKET, condition)
+
+
+def make_trade(price: float, quantity: float) -> Trade:
+    return Trade(*MARKET, price, quantity, 0)
+
+
+@pytest.mark.parametrize('condition', [
+    {'whale': {}},
+    {'whale': {'quantity': '100'}},
+    {'tick': {'quantity': None}},
+    {'tick': {'quantity': -1}},
+    {'tick': {'quantity': float('nan')}},
+    {'whale': 100}
+])
+def test_invalid_threshold_rejected_at_write_time(condition):
+    with pytest.raises(InvalidConditionError):
+        validate_condition(condition)
+
+
+def test_detector_matches_thresholds():
+    index = AlarmIndex()
+    index.add(make_alarm(1, {'whale': {'quantity': 1000}}))
+    index.add(make_alarm(2, {'tick': {'quantity': 5}}))
+
+    detector = Detector(index)
+
+    assert [(alert.kind, alert.alarm.alarm_id) for alert in detector.process(make_trade(100, 10))] == [('whale', 1), ('tick', 2)]
+    assert detector.process(make_trade(100, 1)) == []
+
+
+def test_invalid_stored_alarm_skipped(capsys):
+    index = AlarmIndex()
+    index.add(make_alarm(1, {'whale': {'quantity': 1000}}))
+
+    # 같은 ID의 알림이 잘못된 조건으로 바뀌면 기존 항목도 제거
+    assert index.add(make_alarm(1, {'whale': {'quantity': 'a lot'}})) is False
+    assert index.add(make_alarm(2, {'tick': {}})) is False
+    assert index.add(make_alarm(3, {'tick': {'quantity': 5}})) is True
+
+    assert 'skipping alarm 1' in capsys.readouterr().err
+    assert list(index.alarms.keys()) == [3]
+    assert MARKET not in index.whale
+    assert Detector(index).process(make_trade(1000, 10))[0].alarm.alarm_id == 3
+
+
+class FakeListener:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+    def stop(self):
+        pass
+
+
+# 반영 중 예외가 나도 watch가 끝나지 않고, 전체를 다시 맞춰 반영함
+def test_watch_survives_apply_failure(monkeypatch, capsys):
+    monkeypatch.setattr(alarm_feed, 'NotificationListener', FakeListener)
+    monkeypatch.setattr(alarm_feed, 'RETRY_DELAY', 0.01)
+
+    feed = AlarmChangeFeed(database=None, database_url='')
+    alarm = make_alarm(1, {'tick': {'quantity': 5}})
+    monkeypatch.setattr(feed, 'fetch_changes', lambda: (True, {1: alarm}, set()))
+
+    applied = []
+
+    class FailingEngine:
+        def add_alarm(self, alarm):
+            if len(applied) == 0:
+                applied.append('failed')
+                raise RuntimeError('engine busy')
+
+            applied.append(alarm.alarm_id)
+
+
+        def remove_alarm(self, alarm_id):
+            pass
+
+    index = AlarmIndex()
+
+    async def run_watch():
+        task = asyncio.create_task(feed.watch(index, FailingEngine()))
+
+        while len(applied) < 2:
+            await asyncio.sleep(0.01)
+
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(run_watch(), 5))
+
+    assert applied == ['failed', 1]
+    assert list(index.alarms.keys()) == [1]
+    assert 'failed to apply changes' in capsys.readouterr().err
@@ -0,0 +1,151 @@
+# indicator.py 지표 계산과 알림 규칙 검증 테스트
+import numpy as np
+import pytest
+
+from condition import InvalidConditionError, validate_condition
+from database import QueryBuilder
+from detector import AlarmRule
+from indicator import Candle, IndicatorEngine, RingBuffer, RollingStats, WilderRSI, add_alarm_or_skip
+
+
+# StockCharts의 14기간 RSI 예제 종가
+# 예제 표는 평균 상승/하락폭을 소수 둘째 자리로 반올림해 첫 RSI를 70.53으로 적지만, 반올림하지 않으면 70.46
+RSI_CLOSES = [
+    44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08,
+    45.89, 46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64
+]
+RSI_EXPECTED = [70.46, 66.25, 66.48, 69.35, 66.29, 57.92]
+
+MARKET = (1, 'BTC', 'KRW')
+
+
+def make_alarm(alarm_id: int, condition: dict) -> AlarmRule:
+    return AlarmRule(alarm_id, 1, *MARKET, condition)
+
+
+def test_wilder_rsi_matches_reference():
+    rsi = WilderRSI(14)
+
+    values = []
+    for previous, close in zip(RSI_CLOSES, RSI_CLOSES[1:]):
+        rsi.add_change(close - previous)
+        if rsi.is_ready():
+            values.append(rsi.get_value())
+
+    assert values == pytest.approx(RSI_EXPECTED, abs=0.005)
+
+
+def test_wilder_rsi_warm_up_matches_incremental():
+    rsi = WilderRSI(14)
+    rsi.warm_up(np.array(RSI_CLOSES))
+
+    assert rsi.get_value() == pytest.approx(RSI_EXPECTED[-1], abs=0.005)
+
+
+def test_wilder_rsi_without_losses():
+    rsi = WilderRSI(3)
+    rsi.warm_up(np.array([1.0, 2.0, 3.0, 4.0]))
+
+    assert rsi.get_value() == 100.0
+
+
+# 이동 평균과 모표준편차(ddof=0)를 매번 창 전체로 계산한 값과 비교
+def test_rolling_stats_match_window():
+    closes = np.random.default_rng(0).normal(100, 5, 500)
+    length = 20
+
+    buffer = RingBuffer(length + 1)
+    stats = RollingStats(length)
+
+    for index, close in enumerate(closes):
+        buffer.append(close)
+        stats.update(buffer)
+
+        if stats.is_ready(buffer):
+            window = closes[index + 1 - length:index + 1]
+            assert stats.get_mean() == pytest.approx(window.mean())
+            assert stats.get_stddev() == pytest.approx(window.std())
+
+
+# 밴드는 새 종가를 포함한 최근 length개로 계산하므로, length가 5이면 |z|가 (5 - 1) / √5 ≈ 1.79를 넘을 수 없음
+def test_bollinger_band_alert_when_close_leaves_band():
+    engine = IndicatorEngine()
+    engine.add_alarm(make_alarm(1, {'bollinger_band': {'length': 5, 'interval': '1m', 'coefficient': 1.5}}))
+
+    closes = [100, 101, 99, 100, 101, 100, 130]
+    detected = []
+    for open_time, close in enumerate(closes):
+        detected.append(engine.on_candle(Candle(MARKET, '1m', open_time * 60, close)))
+
+    assert all(len(candle_alerts) == 0 for candle_alerts in detected[:-1])
+
+    window = np.array(closes[-5:], dtype=np.float64)
+    assert abs(closes[-1] - window.mean()) > 1.5 * window.std()
+
+    alert, = detected[-1]
+    assert alert.kind == 'bollinger_band'
+    assert alert.alarm.alarm_id == 1
+    assert alert.value == pytest.approx(np.mean(closes[-5:]))
+
+
+def test_rsi_alert_against_reference():
+    engine = IndicatorEngine()
+    engine.add_alarm(make_alarm(1, {'rsi': {'length': 14, 'interval': '1m', 'max_value': 70, 'min_value': 30}}))
+
+    alerts = []
+    for open_time, close in enumerate(RSI_CLOSES):
+        alerts.extend(engine.on_candle(Candle(MARKET, '1m', open_time * 60, close)))
+
+    # 첫 RSI(70.46)만 max_value 이상
+    alert, = alerts
+    assert alert.kind == 'rsi'
+    assert alert.value == pytest.approx(RSI_EXPECTED[0], abs=0.005)
+
+
+@pytest.mark.parametrize('condition', [
+    {'rsi': {'length': 14, 'interval': 'minute', 'max_value': 70, 'min_value': 30}},
+    {'rsi': {'length': 14, 'max_value': 70, 'min_value': 30}},
+    {'rsi': {'length': 14, 'interval': '0m', 'max_value': 70, 'min_value': 30}},
+    {'rsi': {'length': 14, 'interval': '1m', 'max_value': 170, 'min_value': 30}},
+    {'rsi': {'length': 0, 'interval': '1m', 'max_value': 70, 'min_value': 30}},
+    {'bollinger_band': {'length': 20, 'interval': '1x', 'coefficient': 2}},
+    {'bollinger_band': {'length': 20.5, 'interval': '1m', 'coefficient': 2}},
+    {'bollinger_band': {'length': 20, 'interval': '1m', 'coefficient': '2'}},
+    {'bollinger_band': {'length': 20, 'interval': '1m'}},
+    {'bollinger_band': [20, '1m', 2]},
+    {'macd': {}},
+    [1, 2]
+])
+def test_invalid_condition_rejected_at_write_time(condition):
+    with pytest.raises(InvalidConditionError):
+        validate_condition(condition)
+
+    with pytest.raises(InvalidConditionError):
+        QueryBuilder.to_condition_values(condition)
+
+
+def test_valid_condition_accepted():
+    condition = {
+        'bollinger_band': {'length': 20.0, 'interval': '15m', 'coefficient': 2.5},
+        'rsi': {'length': 14, 'interval': '4h', 'max_value': 70, 'min_value': 30}
+    }
+
+    validate_condition(condition)
+    assert QueryBuilder.to_condition_values(condition)[2] == {'length': 20, 'interval': '15m', 'coefficient': 2.5}
+
+
+# 이미 저장된 잘못된 알림은 건너뛰고, 엔진 상태를 바꾸지 않으며, 나머지 알림은 등록됨
+def test_invalid_stored_alarm_skipped(capsys):
+    engine = IndicatorEngine()
+    bad_alarm = make_alarm(1, {
+        'bollinger_band': {'length': 20, 'interval': '1m', 'coefficient': 2},
+        'rsi': {'length': 14, 'interval': None, 'max_value': 70, 'min_value': 30}
+    })
+    good_alarm = make_alarm(2, {'rsi': {'length': 14, 'interval': '1m', 'max_value': 70, 'min_value': 30}})
+
+    assert add_alarm_or_skip(engine, bad_alarm) is False
+    assert add_alarm_or_skip(engine, good_alarm) is True
+
+    assert 'skipping alarm 1' in capsys.readouterr().err
+    assert list(engine.series.keys()) == [(MARKET, '1m')]
+    assert 1 not in engine.registry.alarm_keys
@@ -0,0 +1,79 @@
+# exchange.iter_json_array 스트리밍 JSON 배열 파서 테스트
+# 응답을 여러 크기의 청크로 나누어 넣어도 한 번에 파싱한 결과와 같아야 하고, 잘못된 배열은 ValueError
+import json
+import time
+
+import pytest
+
+from exchange import MarketCache, iter_json_array
+
+
+DOCUMENT = json.dumps({
+    'timezone': 'UTC',
+    'symbols': [
+        {'symbol': 'BTCUSDT', 'baseAsset': 'BTC', 'quoteAsset': 'USDT', 'filters': [{'tickSize': '0.01'}]},
+        {'symbol': 'ETHBTC', 'baseAsset': 'ETH', 'quoteAsset': 'BTC', 'name': '이더리움 "ETH"'},
+        123456,
+        2.5e-3,
+        -1,
+        True,
+        None,
+        []
+    ]
+}, ensure_ascii=False, indent=1).encode()
+
+
+def split_chunks(data: bytes, size: int) -> list:
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+# 청크 경계가 여러 바이트 문자, 문자열, 숫자 중간에 걸쳐도 같은 결과
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, len(DOCUMENT)])
+def test_split_chunks(chunk_size):
+    elements = list(iter_json_array(split_chunks(DOCUMENT, chunk_size), 'symbols'))
+
+    assert elements == json.loads(DOCUMENT)['symbols']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('[]', []),
+    (' [ ] ', []),
+    ('[1,2 , 3]', [1, 2, 3]),
+    ('[{"a": [1, 2]}, "]"]', [{'a': [1, 2]}, ']']),
+])
+def test_top_level_array(text, expected):
+    for chunk_size in [1, len(text)]:
+        assert list(iter_json_array(split_chunks(text.encode(), chunk_size))) == expected
+
+
+@pytest.mark.parametrize('text', [
+    '[1 2]',                # 구분자 없음
+    '[{"a": 1}{"a": 2}]',
+    '[1,]',                 # 끝에 남는 구분자
+    '[1,,2]',
+    '[,1]',
+    '[1, 2',                # 닫히지 않은 배열
+    '[1, 2,',
+    '[1, 12',               # 잘린 마지막 원소
+    '[1, {"a": ',
+    '[1, "abc',
+    '{"other": []}',        # 배열 없음
+])
+def test_malformed_array(text):
+    for chunk_size in [1, 3, len(text)]:
+        with pytest.raises(ValueError):
+            list(iter_json_array(split_chunks(text.encode(), chunk_size), None if text.startswith('[') else 'symbols'))
+
+
+# 잘린 응답으로 갱신하지 못하면 캐시는 이전 값을 유지
+def test_market_cache_keeps_value_on_malformed_response():
+    responses = [b'[1, 2, 3]', b'[1, 2, 3']
+    cache = MarketCache(lambda: list(iter_json_array(split_chunks(responses.pop(0), 4))), ttl=0.01, stale_ttl=0)
+
+    assert cache.get() == [1, 2, 3]
+    time.sleep(0.02)
+
+    with pytest.raises(ValueError):
+        cache.get()
+
+    assert cache.value == [1, 2, 3]
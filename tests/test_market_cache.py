@@ -0,0 +1,178 @@
+# exchange.py 시장 정보 캐시(MarketCache) 테스트
+# 업비트 /v1/market/all 형식으로 응답하는 로컬 HTTP 스텁에 실제로 요청을 보내고, 스텁이 받은 요청 수를 셈
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import exchange
+from exchange import Upbit
+
+
+# 요청 수, 지연 시간, 응답 상태 코드를 테스트에서 바꿀 수 있는 스텁
+class MarketStub:
+    def __init__(self):
+        self.request_count = 0
+        self.latency = 0.0
+        self.status = 200
+        self.markets = ['KRW-BTC', 'KRW-ETH']
+        self.lock = threading.Lock()
+
+
+    def make_body(self) -> bytes:
+        return json.dumps([
+            {'market': market, 'english_name': market.split('-')[1], 'korean_name': ""} for market in self.markets
+        ]).encode()
+
+
+def make_handler(stub: MarketStub):
+    class MarketHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with stub.lock:
+                stub.request_count += 1
+
+            time.sleep(stub.latency)
+
+            body = stub.make_body() if stub.status == 200 else b'{}'
+            self.send_response(stub.status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+        def log_message(self, *args):
+            pass
+
+    return MarketHandler
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(exchange, 'market_caches', {})
+
+    stub = MarketStub()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(stub))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield stub
+
+    server.shutdown()
+    server.server_close()
+
+
+# 재시도 없는 세션을 쓰는 업비트 클라이언트 (실패한 요청이 그대로 실패하도록)
+def make_upbit(stub: MarketStub, ttl: float = 60, stale_ttl: float = 600) -> Upbit:
+    upbit = Upbit(domain=stub.url, session=requests.Session())
+    upbit.market_cache_ttl = ttl
+    upbit.market_cache_stale_ttl = stale_ttl
+
+    return upbit
+
+
+def get_symbols(upbit: Upbit) -> list:
+    return [currency['symbol'] for currency in upbit.get_currencies()]
+
+
+def wait_until(predicate, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_fresh_value_served_from_cache(stub):
+    upbit = make_upbit(stub)
+
+    assert get_symbols(upbit) == ['BTC', 'ETH']
+    assert upbit.get_items(quote_symbol='KRW')[0] == {'base_symbol': 'BTC', 'quote_symbol': 'KRW'}
+    assert upbit.search_currencies('et') == [{'symbol': 'ETH', 'english_name': 'ETH', 'korean_name': ""}]
+
+    assert stub.request_count == 1
+
+
+# 같은 거래소의 인스턴스들은 캐시를 공유
+def test_cache_shared_between_instances(stub):
+    get_symbols(make_upbit(stub))
+    get_symbols(make_upbit(stub))
+
+    assert stub.request_count == 1
+
+
+# 캐시가 비어 있을 때 동시에 들어온 요청은 거래소에 한 번만 요청하고 같은 결과를 받음
+def test_single_flight_on_empty_cache(stub):
+    stub.latency = 0.2
+    upbit = make_upbit(stub)
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(upbit.get_markets())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert stub.request_count == 1
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+
+
+# TTL이 지나면 이전 값을 바로 반환하고 백그라운드에서 한 번만 갱신
+def test_stale_value_served_while_refreshing(stub):
+    upbit = make_upbit(stub, ttl=0.05)
+    get_symbols(upbit)
+
+    time.sleep(0.1)
+    stub.latency = 0.3
+    stub.markets = ['KRW-BTC', 'KRW-ETH', 'KRW-XRP']
+
+    started_at = time.monotonic()
+    for _ in range(5):
+        assert get_symbols(upbit) == ['BTC', 'ETH']
+
+    assert time.monotonic() - started_at < 0.2
+
+    wait_until(lambda: get_symbols(upbit) == ['BTC', 'ETH', 'XRP'])
+    assert stub.request_count == 2
+
+
+# 백그라운드 갱신이 실패하면 이전 값을 계속 반환
+def test_failed_background_refresh_keeps_previous_value(stub):
+    upbit = make_upbit(stub, ttl=0.05)
+    get_symbols(upbit)
+
+    time.sleep(0.1)
+    stub.status = 500
+
+    assert get_symbols(upbit) == ['BTC', 'ETH']
+    wait_until(lambda: stub.request_count == 2 and not upbit.get_market_cache().is_refreshing)
+
+    assert get_symbols(upbit) == ['BTC', 'ETH']
+
+
+# TTL과 stale TTL이 모두 지나면 요청한 스레드가 갱신될 때까지 기다리고, 실패하면 예외를 전달
+def test_expired_value_refreshed_synchronously(stub):
+    upbit = make_upbit(stub, ttl=0.05, stale_ttl=0.05)
+    get_symbols(upbit)
+
+    time.sleep(0.15)
+    stub.markets = ['KRW-XRP']
+
+    assert get_symbols(upbit) == ['XRP']
+    assert stub.request_count == 2
+
+    time.sleep(0.15)
+    stub.status = 500
+
+    with pytest.raises(requests.HTTPError):
+        upbit.get_markets()
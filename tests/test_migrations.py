@@ -0,0 +1,169 @@
+# migrations.py 마이그레이션 목록과 migrate.apply_migration 테스트
+# 실제 PostgreSQL 대신 알림 규칙/알림 행을 메모리에 두고 마이그레이션이 보내는 쿼리문을 처리하는 가짜 커서를 사용
+import re
+
+import pytest
+
+from condition import CONDITION_KINDS, get_condition_hash
+from migrate import apply_migration
+from migrations import MIGRATIONS, Migration, backfill_condition_hashes
+
+
+INDEX_NAME_PATTERN = re.compile(r'CREATE INDEX CONCURRENTLY (?:IF NOT EXISTS )?(\w+)')
+
+
+class FakeCursor:
+    def __init__(self, conditions: dict = None, alarms: dict = None):
+        self.conditions = conditions or {}  # 알림 규칙 ID -> {종류: 값, 'condition_hash': 해시}
+        self.alarms = alarms or {}          # 알림 ID -> 알림 규칙 ID
+        self.rows = []
+        self.queries = []
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        pass
+
+
+    def execute(self, query: str, params: tuple = ()):
+        self.queries.append(query)
+
+        if query.startswith('SELECT condition_id, '):
+            self.rows = [
+                (condition_id, *(condition.get(kind) for kind in CONDITION_KINDS), condition['condition_hash'])
+                for condition_id, condition in sorted(self.conditions.items())
+            ]
+
+        elif query.startswith('UPDATE condition '):
+            self.conditions[params[1]]['condition_hash'] = params[0]
+
+        elif query.startswith('UPDATE alarm '):
+            for alarm_id, condition_id in self.alarms.items():
+                if condition_id == params[1]:
+                    self.alarms[alarm_id] = params[0]
+
+        elif query.startswith('DELETE FROM condition '):
+            del self.conditions[params[0]]
+
+
+    def fetchall(self) -> list:
+        return self.rows
+
+
+# 해시가 비어 있는 알림 규칙은 해시를 채우고, 내용이 같은 알림 규칙은 ID가 가장 작은 행으로 합침
+def test_backfill_condition_hashes():
+    whale = {'whale': {'quantity': 10}}
+    tick = {'tick': {'quantity': 5}}
+    conditions = {
+        1: {**whale, 'condition_hash': None},
+        2: {**tick, 'condition_hash': get_condition_hash(tick)},
+        3: {**whale, 'condition_hash': None},
+        4: {**tick, 'condition_hash': None}
+    }
+    alarms = {1: 1, 2: 2, 3: 3, 4: 4}
+
+    cursor = FakeCursor(conditions, alarms)
+    backfill_condition_hashes(cursor)
+
+    assert sorted(conditions.keys()) == [1, 2]
+    assert conditions[1]['condition_hash'] == get_condition_hash(whale)
+    assert alarms == {1: 1, 2: 2, 3: 1, 4: 2}
+
+    # 다시 실행해도 바뀌지 않음
+    backfill_condition_hashes(cursor)
+    assert sorted(conditions.keys()) == [1, 2]
+
+
+# 트랜잭션 여부와 커밋/롤백을 기록하는 커넥션
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = True
+        self.cursors = []
+        self.events = []
+
+
+    def cursor(self) -> FakeCursor:
+        cursor = FakeCursor()
+        self.cursors.append(cursor)
+
+        return cursor
+
+
+    def commit(self):
+        self.events.append('commit')
+
+
+    def rollback(self):
+        self.events.append('rollback')
+
+
+def get_migration(version: int) -> Migration:
+    return next(migration for migration in MIGRATIONS if migration.version == version)
+
+
+def get_index_names(migration: Migration) -> list:
+    return [match.group(1) for statement in migration.statements if isinstance(statement, str)
+            for match in [INDEX_NAME_PATTERN.search(statement)] if match is not None]
+
+
+def test_versions_are_sequential():
+    assert [migration.version for migration in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
+
+
+# CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없음
+def test_concurrent_statements_not_transactional():
+    for migration in MIGRATIONS:
+        if any('CONCURRENTLY' in statement for statement in migration.statements if isinstance(statement, str)):
+            assert not migration.transactional, migration.name
+
+
+# 이미 적용된 2, 3, 5번 마이그레이션은 그대로 두고, 7번이 같은 색인을 지우고 다시 만듦
+def test_rebuild_migration_covers_concurrent_indexes():
+    index_names = [name for version in (2, 3, 5) for name in get_index_names(get_migration(version))]
+    assert len(index_names) == 7
+
+    for version in (2, 3, 5):
+        assert all('IF NOT EXISTS' in statement for statement in get_migration(version).statements)
+
+    rebuild = get_migration(7)
+    assert get_index_names(rebuild) == index_names
+    assert rebuild.statements[::2] == [f"DROP INDEX CONCURRENTLY IF EXISTS {name}" for name in index_names]
+
+
+# 트랜잭션 밖에서 실행하는 마이그레이션은 autocommit으로 한 문장씩 실행하고 마지막에 버전을 기록
+def test_apply_non_transactional_migration():
+    conn = FakeConnection()
+    rebuild = get_migration(7)
+
+    apply_migration(conn, rebuild)
+
+    assert conn.cursors[0].queries == [*rebuild.statements, "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)"]
+    assert conn.events == []
+    assert conn.autocommit is True
+
+
+# 함수 단계는 같은 트랜잭션의 커서를 받고, 실패하면 롤백되어 버전이 기록되지 않음
+def test_apply_transactional_migration_with_function_step():
+    conn = FakeConnection()
+    autocommits = []
+
+    def step(cursor):
+        autocommits.append(conn.autocommit)
+        cursor.execute("SELECT 1")
+
+    apply_migration(conn, Migration(100, 'step', ["SELECT 0", step], True))
+    assert conn.cursors[0].queries[:2] == ["SELECT 0", "SELECT 1"]
+    assert autocommits == [False]
+    assert conn.events == ['commit']
+
+    def failing_step(cursor):
+        raise RuntimeError('failed')
+
+    with pytest.raises(RuntimeError):
+        apply_migration(conn, Migration(101, 'failing_step', [failing_step], True))
+
+    assert conn.events == ['commit', 'rollback']
+    assert conn.cursors[1].queries == []
@@ -0,0 +1,147 @@
+# notifier.py 토큰 버킷과 NotificationDispatcher 발송 순서/재시도/버킷 정리 테스트
+# 텔레그램 대신 발송한 메시지를 기록하는 가짜 발송 함수를 사용
+import threading
+import time
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import notifier
+from notifier import NotificationDispatcher, TokenBucket
+
+
+# 테스트에서 시각을 직접 옮기는 시계
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# 받은 메시지를 (시각, 채널 ID, 알림 목록)으로 기록하고, 정해 둔 오류를 차례로 발생시키는 발송 함수
+class FakeSender:
+    def __init__(self):
+        self.sent = []
+        self.errors = []
+        self.lock = threading.Lock()
+
+
+    def __call__(self, chat_id: int, text: str):
+        with self.lock:
+            if len(self.errors) > 0:
+                raise self.errors.pop(0)
+
+            self.sent.append((time.monotonic(), chat_id, text.split("\n")))
+
+
+    def get_texts(self, chat_id: int) -> list:
+        with self.lock:
+            return [text for _, sent_chat_id, texts in self.sent if sent_chat_id == chat_id for text in texts]
+
+
+def make_too_many_requests(retry_after: float) -> ApiTelegramException:
+    return ApiTelegramException('sendMessage', None, {
+        'error_code': 429, 'description': 'Too Many Requests', 'parameters': {'retry_after': retry_after}
+    })
+
+
+def wait_until(predicate, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def sender() -> FakeSender:
+    return FakeSender()
+
+
+@pytest.fixture
+def make_dispatcher(sender):
+    dispatchers = []
+
+    def make(**kwargs) -> NotificationDispatcher:
+        dispatcher = NotificationDispatcher(sender, **kwargs)
+        dispatchers.append(dispatcher)
+
+        return dispatcher
+
+    yield make
+
+    for dispatcher in dispatchers:
+        dispatcher.stop()
+
+
+def test_token_bucket(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(notifier.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.take() for _ in range(3)] == [0, 0, 0]
+    assert bucket.take() == pytest.approx(0.5)
+    assert not bucket.is_full()
+
+    # 토큰이 없으면 사용하지 않으므로, 기다린 뒤에는 바로 사용할 수 있음
+    clock.now += 0.5
+    assert bucket.take() == 0
+    assert bucket.get_delay() == pytest.approx(0.5)
+
+    # 용량보다 많이 쌓이지 않음
+    clock.now += 10
+    assert bucket.is_full()
+    assert [bucket.take() for _ in range(4)][-1] == pytest.approx(0.5)
+
+
+# 429 응답을 받으면 retry_after초 뒤에 실패한 메시지부터 다시 발송
+def test_too_many_requests_retried_after(make_dispatcher, sender):
+    sender.errors.append(make_too_many_requests(0.2))
+    dispatcher = make_dispatcher(chat_rate=100, chat_burst=10)
+
+    started_at = time.monotonic()
+    dispatcher.enqueue(1, 'a')
+    wait_until(lambda: dispatcher.sent_count == 1)
+
+    assert sender.get_texts(1) == ['a']
+    assert sender.sent[0][0] - started_at >= 0.2
+    assert dispatcher.retry_counts == {}
+
+
+# 여러 작업 스레드가 발송하고 중간에 실패해도, 한 채널의 알림은 넣은 순서대로 발송
+def test_chat_order_kept(monkeypatch, make_dispatcher, sender):
+    monkeypatch.setattr(notifier, 'RETRY_DELAY', 0.01)
+    sender.errors.extend([RuntimeError('connection reset'), make_too_many_requests(0.01), RuntimeError('timeout')])
+    dispatcher = make_dispatcher(worker_count=4, chat_rate=1000, chat_burst=1000, global_rate=1000)
+
+    for index in range(200):
+        dispatcher.enqueue(index % 3, f"{index % 3}:{index}")
+        if index % 20 == 0:
+            time.sleep(0.005)
+
+    wait_until(lambda: sum(len(sender.get_texts(chat_id)) for chat_id in range(3)) == 200)
+
+    for chat_id in range(3):
+        assert sender.get_texts(chat_id) == [f"{chat_id}:{index}" for index in range(chat_id, 200, 3)]
+
+    assert dispatcher.dropped_count == 0
+
+
+# 발송이 끝나고 토큰이 다시 가득 찬 채널의 버킷은 정리됨
+def test_idle_chat_buckets_evicted(monkeypatch, make_dispatcher, sender):
+    monkeypatch.setattr(notifier, 'BUCKET_SWEEP_INTERVAL', 0.0)
+    dispatcher = make_dispatcher(chat_rate=100, chat_burst=1)
+
+    for chat_id in range(10):
+        dispatcher.enqueue(chat_id, 'a')
+
+    wait_until(lambda: dispatcher.sent_count == 10)
+    time.sleep(0.05)
+
+    # 다음 발송 때 정리되고, 방금 발송한 채널의 버킷만 남을 수 있음
+    dispatcher.enqueue(100, 'b')
+    wait_until(lambda: dispatcher.sent_count == 11)
+
+    with dispatcher.condition:
+        assert set(dispatcher.chat_buckets.keys()) <= {100}
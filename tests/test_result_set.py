@@ -0,0 +1,113 @@
+# database.py 결과 행(Row)과 결과 집합(ResultSet) 테스트
+import json
+from collections.abc import Mapping
+
+import pytest
+
+from converter import alarm_row_to_dict
+from database import Database, ResultSet, get_row_class
+
+
+ALARM_COLUMNS = ['alarm_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'is_enabled',
+                 'whale', 'tick', 'bollinger_band', 'rsi']
+
+
+def make_result_set(alarm_ids: list) -> ResultSet:
+    return ResultSet(ALARM_COLUMNS, [
+        [alarm_id, 1, 'BTC', 'KRW', True, {'quantity': 10}, None, None, None] for alarm_id in alarm_ids
+    ])
+
+
+# 같은 컬럼 구성의 결과 행은 클래스 하나를 공유하고, 컬럼 이름은 클래스에만 있음
+def test_row_class_shared_per_columns():
+    row_class = get_row_class(ALARM_COLUMNS)
+
+    assert get_row_class(tuple(ALARM_COLUMNS)) is row_class
+    assert get_row_class(ALARM_COLUMNS[:2]) is not row_class
+    assert type(make_result_set([1])[1]) is row_class
+    assert row_class.columns == tuple(ALARM_COLUMNS)
+
+
+# 스키마의 모든 테이블에 대한 결과 행 클래스는 미리 만들어져 있음
+@pytest.mark.parametrize('table_name', Database.schema.keys())
+def test_row_classes_generated_from_schema(table_name):
+    columns = tuple(Database.schema[table_name].keys())
+
+    assert get_row_class(columns).columns == columns
+
+
+def test_row_has_no_instance_dict():
+    row = make_result_set([1])[1]
+
+    assert not hasattr(row, '__dict__')
+    with pytest.raises(AttributeError):
+        row.extra = 1
+
+
+def test_row_access():
+    row = make_result_set([7])[7]
+
+    assert row['base_symbol'] == 'BTC'
+    assert row[2] == 'BTC'
+    assert row[:2] == (7, 1)
+    assert tuple(row.keys()) == tuple(ALARM_COLUMNS)
+    assert row.get('tick') is None
+    assert row.get('unknown', 'default') == 'default'
+    assert row.to_dict() == dict(zip(ALARM_COLUMNS, [7, 1, 'BTC', 'KRW', True, {'quantity': 10}, None, None, None]))
+    assert dict(row.to_dict()) == {column: row[column] for column in row.keys()}
+
+    with pytest.raises(KeyError):
+        row['unknown']
+
+
+# 결과 행은 튜플이므로 그대로 JSON 배열로 직렬화됨
+def test_row_is_tuple():
+    row = make_result_set([7])[7]
+
+    assert isinstance(row, tuple)
+    assert json.loads(json.dumps(row))[:3] == [7, 1, 'BTC']
+
+
+# 기본 키 색인은 처음 키로 조회할 때 만들어짐
+def test_index_built_lazily():
+    result_set = make_result_set([3, 1, 2])
+
+    assert result_set.index is None
+    assert [row[0] for row in result_set.to_list()] == [3, 1, 2]
+    assert result_set.index is None
+
+    assert result_set[1]['alarm_id'] == 1
+    assert result_set.index is not None
+
+
+def test_result_set_mapping():
+    result_set = make_result_set([3, 1, 2])
+
+    assert isinstance(result_set, Mapping)
+    assert list(result_set) == [3, 1, 2]
+    assert len(result_set) == 3
+    assert 2 in result_set and 4 not in result_set
+    assert [row['alarm_id'] for row in result_set.values()] == [3, 1, 2]
+    assert result_set.get(4) is None
+
+    # 결과 행 목록을 그대로 보관하므로 같은 객체가 반환됨
+    assert result_set[1] is result_set.to_list()[1]
+
+
+def test_empty_result_set():
+    result_set = ResultSet(ALARM_COLUMNS, [])
+
+    assert len(result_set) == 0
+    assert result_set.to_list() == []
+    assert list(result_set.values()) == []
+
+
+# 변환기는 컬럼 순서가 아닌 컬럼 이름으로 값을 꺼냄
+def test_converter_reads_rows_by_column():
+    columns = ALARM_COLUMNS[::-1]
+    values = [None, None, None, {'quantity': 10}, True, 'KRW', 'BTC', 1, 7]
+    alarm = alarm_row_to_dict(ResultSet(columns, [values]).to_list()[0])
+
+    assert alarm == alarm_row_to_dict(make_result_set([7])[7])
+    assert alarm['id'] == 7
+    assert alarm['item'] == {'exchange_id': 1, 'base_symbol': 'BTC', 'quote_symbol': 'KRW'}
@@ -0,0 +1,170 @@
+# routes.py 라우트 처리기 테스트
+# 처리기를 run_route로 직접 실행하고, 데이터베이스는 호출을 기록하는 가짜 객체를 사용
+import json
+from contextlib import contextmanager
+
+import pytest
+from werkzeug.datastructures import ETags, MultiDict
+
+import routes
+from database import ResultSet
+from routes import RouteRequest, run_route
+
+
+ALARM_COLUMNS = ['alarm_id', 'exchange_id', 'base_symbol', 'quote_symbol', 'is_enabled',
+                 'whale', 'tick', 'bollinger_band', 'rsi']
+
+
+# 채널 1과 알림 1, 2가 등록되어 있는 가짜 데이터베이스
+class FakeDatabase:
+    def __init__(self):
+        self.calls = []
+
+
+    def record(self, method: str, *args, **kwargs):
+        self.calls.append((method, args, kwargs))
+
+
+    def is_channel_exists(self, channel_id: int) -> bool:
+        self.record('is_channel_exists', channel_id)
+        return channel_id == 1
+
+
+    def get_version(self, table_name: str, scope=None) -> str:
+        self.record('get_version', table_name, scope)
+        return 'v1'
+
+
+    def select_alarms(self, **conditions) -> ResultSet:
+        self.record('select_alarms', **conditions)
+        return self.alarm_rows([1, 2])
+
+
+    def select_alarms_in(self, alarm_ids: list) -> ResultSet:
+        self.record('select_alarms_in', alarm_ids)
+        return self.alarm_rows(alarm_ids)
+
+
+    def update_alarms_enabled(self, channel_id: int, is_enabled: bool, alarm_ids: list = None) -> list:
+        self.record('update_alarms_enabled', channel_id, is_enabled, alarm_ids=alarm_ids)
+        return [1, 2] if alarm_ids is None else alarm_ids
+
+
+    def insert_alarms(self, channel_id: int, alarm_list: list) -> list:
+        self.record('insert_alarms', channel_id, alarm_list)
+        return list(range(1, len(alarm_list) + 1))
+
+
+    @contextmanager
+    def transaction(self):
+        self.record('transaction')
+        yield None
+
+
+    @staticmethod
+    def alarm_rows(alarm_ids: list) -> ResultSet:
+        return ResultSet(ALARM_COLUMNS, [
+            [alarm_id, 1, 'BTC', 'KRW', True, {'quantity': 10}, None, None, None] for alarm_id in alarm_ids
+        ])
+
+
+@pytest.fixture
+def db() -> FakeDatabase:
+    return FakeDatabase()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache(monkeypatch):
+    monkeypatch.setattr(routes, 'response_cache', routes.ResponseCache())
+
+
+def make_request(body=None, args=None, if_none_match=None, accept_encoding='') -> RouteRequest:
+    return RouteRequest(
+        args=MultiDict(args or {}),
+        data=b'' if body is None else json.dumps(body).encode(),
+        if_none_match=if_none_match or ETags(),
+        accept_encoding=accept_encoding
+    )
+
+
+def run(db: FakeDatabase, handler, body=None, **params):
+    return run_route(handler, make_request(body), lambda service: db, **params)
+
+
+@pytest.mark.parametrize('alarm_ids', ['1,2', 1, [1, '2'], [1, True], [1.0], None])
+def test_patch_alarms_rejects_invalid_alarm_ids(db, alarm_ids):
+    response = run(db, routes.patch_alarms, {'is_enabled': False, 'alarm_ids': alarm_ids}, channel_id='1')
+
+    assert response.status == 400
+    assert not any(method == 'update_alarms_enabled' for method, _, _ in db.calls)
+
+
+def test_patch_alarms_with_alarm_ids(db):
+    response = run(db, routes.patch_alarms, {'is_enabled': False, 'alarm_ids': [2]}, channel_id='1')
+
+    assert response.status == 200
+    assert ('update_alarms_enabled', (1, False), {'alarm_ids': [2]}) in db.calls
+    assert [alarm['id'] for alarm in json.loads(response.body)['alarms']] == [2]
+
+
+def test_patch_alarms_without_alarm_ids_updates_channel(db):
+    response = run(db, routes.patch_alarms, {'is_enabled': True}, channel_id='1')
+
+    assert response.status == 200
+    assert ('update_alarms_enabled', (1, True), {'alarm_ids': None}) in db.calls
+
+
+@pytest.mark.parametrize('is_enabled', ['false', 0, None])
+def test_patch_alarms_rejects_non_boolean(db, is_enabled):
+    response = run(db, routes.patch_alarms, {'is_enabled': is_enabled}, channel_id='1')
+
+    assert response.status == 400
+
+
+@pytest.mark.parametrize('body', [{}, {'alarms': {'exchange_id': 1}}, {'alarms': [1, 2]}, {'alarms': 'x'}, [1]])
+def test_post_alarms_batch_rejects_invalid_alarm_list(db, body):
+    response = run(db, routes.post_alarms_batch, body, channel_id='1')
+
+    assert response.status == 400
+    assert not any(method == 'insert_alarms' for method, _, _ in db.calls)
+
+
+def test_post_alarms_batch(db):
+    alarm = {'exchange_id': 1, 'base_symbol': 'BTC', 'quote_symbol': 'KRW', 'condition': {'whale': {'quantity': 10}}}
+    response = run(db, routes.post_alarms_batch, {'alarms': [alarm, dict(alarm, is_enabled=False)]}, channel_id='1')
+
+    assert response.status == 200
+    assert len(json.loads(response.body)['alarms']) == 2
+
+    _, (channel_id, alarm_list), _ = next(call for call in db.calls if call[0] == 'insert_alarms')
+    assert channel_id == 1
+    assert [alarm['is_enabled'] for alarm in alarm_list] == [True, False]
+
+
+def test_unknown_channel(db):
+    response = run(db, routes.patch_alarms, {'is_enabled': True}, channel_id='2')
+
+    assert response.status == 400
+    assert response.body == '등록되지 않은 채널'
+
+
+@pytest.mark.parametrize('handler, body', [
+    (routes.post_alarm, {'channel_id': 1, 'exchange_id': 1, 'base_symbol': 'BTC', 'quote_symbol': 'KRW',
+                         'condition': {'rsi': {'length': 14, 'interval': '1y', 'max_value': 70, 'min_value': 30}}}),
+    (routes.post_alarms_batch, {'alarms': [{'exchange_id': 1, 'base_symbol': 'BTC', 'quote_symbol': 'KRW',
+                                            'condition': {'bollinger_band': {'length': 20, 'coefficient': 2}}}]})
+])
+def test_invalid_indicator_condition_rejected(db, handler, body):
+    response = run(db, handler, body, channel_id='1')
+
+    assert response.status == 400
+    assert response.body.startswith('잘못된 알림 규칙')
+    assert not any(method in ('transaction', 'insert_alarms') for method, _, _ in db.calls)
+
+
+def test_invalid_threshold_condition_rejected(db):
+    alarm = {'exchange_id': 1, 'base_symbol': 'BTC', 'quote_symbol': 'KRW', 'condition': {'whale': {'quantity': '1e9'}}}
+    response = run(db, routes.post_alarms_batch, {'alarms': [alarm]}, channel_id='1')
+
+    assert response.status == 400
+    assert response.body.startswith('잘못된 알림 규칙')
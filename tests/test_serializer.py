@@ -0,0 +1,148 @@
+# serializer.py 직렬화/압축과 routes.versioned_response 응답 캐시 테스트
+import brotli
+import gzip
+import json
+
+import pytest
+from werkzeug.datastructures import ETags, MultiDict
+
+import routes
+import serializer
+from routes import RouteRequest, call, run_route, versioned_response
+from serializer import JsonSerializer, OrjsonSerializer, compress_with, get_serializer, parse_accept_encoding, select_encoding
+
+
+PAYLOADS = [
+    {'alarms': [{'id': 1, 'item': {'exchange_id': 1, 'base_symbol': 'BTC', 'quote_symbol': 'KRW'},
+                 'condition': {'whale': {'quantity': 1000}, 'tick': None}, 'is_enabled': True}]},
+    {'currencies': [{'symbol': 'BTC', 'english_name': 'Bitcoin', 'korean_name': '비트코인'}]},
+    {'channel_id': -1001234567890, 'ratio': 0.5, 'empty': [], 'nested': {'a': {'b': [1, 2.25, False]}}},
+    [],
+    "따옴표\"와 역슬래시\\, 줄바꿈\n"
+]
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_serializers_produce_same_bytes(payload):
+    body = JsonSerializer().dumps(payload)
+
+    assert body == OrjsonSerializer().dumps(payload)
+    assert json.loads(body) == payload
+
+
+def test_json_output_is_compact_utf8():
+    assert JsonSerializer().dumps({'a': [1, '비트코인']}) == '{"a":[1,"비트코인"]}'.encode('utf-8')
+
+
+def test_get_serializer_falls_back_to_json(monkeypatch):
+    assert get_serializer().name == 'orjson'
+
+    monkeypatch.setattr(serializer, 'serializers', {'json': JsonSerializer})
+    assert get_serializer().name == 'json'
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, deflate, br', {'gzip', 'deflate', 'br'}),
+    ('GZIP;q=0.5, br; q=1.0', {'gzip', 'br'}),
+    ('br;q=0, gzip', {'gzip'}),
+    ('gzip;q=0.0', set()),
+    ('gzip;q=abc, br', {'br'}),
+])
+def test_parse_accept_encoding(accept_encoding, expected):
+    assert parse_accept_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('', None),
+    (None, None),
+    ('identity', None),
+    ('gzip, br', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+])
+def test_select_encoding(accept_encoding, expected):
+    assert select_encoding(accept_encoding) == expected
+
+
+def test_select_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(serializer, 'brotli', None)
+
+    assert select_encoding('br, gzip') == 'gzip'
+    assert select_encoding('br') is None
+
+
+def test_small_body_not_compressed():
+    body = b'x' * (serializer.COMPRESS_MIN_SIZE - 1)
+
+    assert compress_with(body, 'gzip') == (body, None)
+    assert compress_with(body * 2, None) == (body * 2, None)
+
+
+@pytest.mark.parametrize('encoding, decompress', [('gzip', gzip.decompress), ('br', brotli.decompress)])
+def test_compression_round_trip(encoding, decompress):
+    body = JsonSerializer().dumps({'items': [{'base_symbol': f"C{index}", 'quote_symbol': 'USDT'} for index in range(500)]})
+
+    compressed, content_encoding = compress_with(body, encoding)
+
+    assert content_encoding == encoding
+    assert len(compressed) < len(body)
+    assert decompress(compressed) == body
+
+
+# 버전 'v1'의 큰 응답을 돌려주는 처리기 (본문을 만든 횟수를 셈)
+class VersionedHandler:
+    def __init__(self):
+        self.build_count = 0
+
+
+    def __call__(self, request: RouteRequest):
+        def build_body():
+            self.build_count += 1
+            items = yield call('database', 'select_items')
+
+            return serializer.dumps({'items': items})
+
+        return (yield from versioned_response(request, 'items', 'v1', build_body))
+
+
+class FakeDatabase:
+    def select_items(self) -> list:
+        return [{'base_symbol': f"C{index}", 'quote_symbol': 'USDT'} for index in range(500)]
+
+
+def make_request(accept_encoding: str = '', if_none_match: ETags = None) -> RouteRequest:
+    return RouteRequest(MultiDict(), b'', if_none_match or ETags(), accept_encoding)
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache(monkeypatch):
+    monkeypatch.setattr(routes, 'response_cache', routes.ResponseCache())
+
+
+def test_versioned_response_cached_per_encoding():
+    handler, db = VersionedHandler(), FakeDatabase()
+
+    plain = run_route(handler, make_request(), lambda service: db)
+    compressed = run_route(handler, make_request('gzip'), lambda service: db)
+    compressed_again = run_route(handler, make_request('gzip, deflate'), lambda service: db)
+
+    # 압축 방식별로 한 번씩만 직렬화/압축
+    assert handler.build_count == 2
+    assert compressed_again.body is compressed.body
+
+    assert plain.mimetype == 'application/json'
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.body) == plain.body
+    assert plain.headers['ETag'] == compressed.headers['ETag'] == 'W/"v1"'
+
+
+def test_versioned_response_not_modified():
+    handler, db = VersionedHandler(), FakeDatabase()
+
+    response = run_route(handler, make_request('br', ETags(weak_etags=['v1'])), lambda service: db)
+
+    assert response.status == 304
+    assert response.body == b""
+    assert handler.build_count == 0
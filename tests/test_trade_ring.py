@@ -0,0 +1,128 @@
+# trade_ring.py 공유 메모리 링 버퍼와 sharded_detector.py 체결 전달 테스트
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from detector import AlarmRule, Trade
+from sharded_detector import ShardedDetector
+from trade_ring import TradeRing
+
+
+def make_trades(count: int, base_symbol: str = 'BTC') -> list:
+    return [Trade(1, base_symbol, 'KRW', 100.0 + index, 1.0, index) for index in range(count)]
+
+
+@pytest.fixture
+def ring():
+    ring = TradeRing(8)
+    yield ring
+    ring.close()
+
+
+# 링 끝을 넘어가도 기록한 순서대로 읽힘
+def test_write_and_read_wrap_around(ring):
+    assert ring.write(make_trades(6)) == 6
+    assert [trade.timestamp for trade in ring.read(4)] == [0, 1, 2, 3]
+
+    # 남은 자리(6개)만큼만 기록
+    assert ring.write(make_trades(14)[6:]) == 6
+    assert len(ring) == 8
+    assert ring.write(make_trades(1)) == 0
+
+    assert ring.read(100) == make_trades(12)[4:]
+    assert ring.read(100) == []
+
+
+def test_non_ascii_symbol_round_trip(ring):
+    ring.write(make_trades(1, base_symbol='币安人生'))
+
+    assert ring.read(1)[0].base_symbol == '币安人生'
+
+
+# 심볼 필드보다 긴 심볼은 잘리지 않고 ValueError (묶음 전체를 기록하지 않음)
+def test_long_symbol_rejected(ring):
+    trades = make_trades(2) + make_trades(1, base_symbol='A' * 17)
+
+    with pytest.raises(ValueError):
+        ring.write(trades)
+
+    assert len(ring) == 0
+
+
+def test_attach_requires_lock(ring):
+    with pytest.raises(ValueError):
+        TradeRing(8, name=ring.name)
+
+
+def consume(ring_name: str, lock, count: int, result_queue):
+    ring = TradeRing(8, name=ring_name, lock=lock)
+
+    timestamps = []
+    while len(timestamps) < count:
+        timestamps.extend(trade.timestamp for trade in ring.read(8))
+
+    result_queue.put(timestamps)
+    ring.close()
+
+
+# 다른 프로세스의 소비자가 작은 링을 통해 모든 체결을 순서대로 받음
+def test_cross_process_order(ring):
+    result_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=consume, args=(ring.name, ring.lock, 1000, result_queue))
+    process.start()
+
+    ring.write_all(make_trades(1000), is_alive=process.is_alive)
+
+    assert result_queue.get(timeout=10) == list(range(1000))
+    process.join(10)
+
+
+def test_sharded_detector_skips_long_symbols(capsys):
+    detector = ShardedDetector(1)
+
+    try:
+        detector.add_alarms([
+            AlarmRule(1, 1, 1, 'A' * 17, 'KRW', {'tick': {'quantity': 1}}),
+            AlarmRule(2, 1, 1, 'BTC', 'KRW', {'tick': {'quantity': 1}})
+        ])
+
+        assert list(detector.alarms.keys()) == [2]
+        assert 'skipping alarm 1' in capsys.readouterr().err
+
+    finally:
+        detector.stop()
+
+
+# 이벤트 루프에서 보낸 체결은 링이 가득 차도 기다리지 않고, 루프가 도는 동안 모두 전달됨
+def test_process_does_not_block_event_loop():
+    detector = ShardedDetector(1, ring_capacity=16)
+    detector.add_alarm(AlarmRule(1, 1, 1, 'BTC', 'KRW', {'tick': {'quantity': 1000}}))
+    worker = detector.workers[0]
+
+    async def send():
+        started_at = time.perf_counter()
+        for trade in make_trades(2000):
+            detector.process(trade)
+
+        elapsed = time.perf_counter() - started_at
+
+        assert len(worker.pending_trades) > 0
+        assert worker.flush_task is not None
+
+        await asyncio.wait_for(detector.flush(), 10)
+
+        return elapsed
+
+    try:
+        elapsed = asyncio.run(send())
+        detector.wait_done()
+
+        assert elapsed < 1
+        assert len(worker.pending_trades) == 0
+
+    finally:
+        results = detector.stop()
+
+    assert results == {0: (2000, 0)}
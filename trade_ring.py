@@ -0,0 +1,251 @@
+# 프로세스 간 체결 전달용 공유 메모리 링 버퍼
+# 생산자 하나(체결을 받는 프로세스)와 소비자 하나(감지 작업 프로세스)만 사용하는 SPSC 큐
+# 헤더의 카운터는 생산자만 쓰는 head(기록한 체결 수)와 commands(보낸 제어 명령 수),
+# 소비자만 쓰는 tail(읽은 체결 수), done(처리를 마친 체결 수)과 commands_done(처리를 마친 제어 명령 수)
+# 서로 다른 캐시 라인에 두어 두 프로세스가 같은 캐시 라인을 번갈아 쓰지 않도록 함
+# 체결을 다 기록한 뒤에 head를 올리고, 다 읽은 뒤에 tail을 올림
+# head/tail은 두 프로세스가 공유하는 락 안에서만 읽고 씀 (락의 메모리 장벽으로 레코드와 카운터 사이의 순서를 보장)
+#   - 생산자: 레코드 기록 -> 락 안에서 head 갱신 / 소비자: 락 안에서 head 읽기 -> 레코드 읽기
+#   - 저장 순서를 보장하지 않는 CPU(ARM 등)에서도 소비자가 기록이 끝나지 않은 레코드를 읽지 않음
+#   - 락은 카운터 하나를 읽고 쓰는 동안만 잡으므로 체결 묶음마다 짧게 한 번씩만 경합
+import multiprocessing
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from detector import Trade
+
+
+TRADE_RING_CAPACITY = 1 << 16
+
+# 심볼 필드 크기 (UTF-8 바이트 수, 넘는 심볼은 잘리지 않도록 기록할 때 ValueError)
+SYMBOL_SIZE = 16
+
+TRADE_DTYPE = np.dtype([
+    ('exchange_id', '<i4'),
+    ('base_symbol', f'S{SYMBOL_SIZE}'),
+    ('quote_symbol', f'S{SYMBOL_SIZE}'),
+    ('price', '<f8'),
+    ('quantity', '<f8'),
+    ('timestamp', '<i8')
+])
+
+CACHE_LINE_SIZE = 64
+HEAD_OFFSET = 0
+TAIL_OFFSET = CACHE_LINE_SIZE
+DONE_OFFSET = CACHE_LINE_SIZE * 2
+COMMANDS_OFFSET = CACHE_LINE_SIZE * 3
+COMMANDS_DONE_OFFSET = CACHE_LINE_SIZE * 4
+HEADER_SIZE = CACHE_LINE_SIZE * 5
+
+# 링이 가득 찼을 때 생산자가 기다리는 시간 (초)
+FULL_WAIT = 0.0002
+
+
+# 생산자가 기다리는 동안 소비자 프로세스가 종료된 경우
+class ConsumerDiedError(Exception):
+    def __init__(self):
+        super().__init__('The trade ring consumer is no longer running.')
+
+
+# 심볼을 링에 기록할 바이트열로 변환 (SYMBOL_SIZE 바이트를 넘으면 ValueError)
+def encode_symbol(symbol: str) -> bytes:
+    encoded = symbol.encode('utf-8')
+    if len(encoded) > SYMBOL_SIZE:
+        raise ValueError(f"symbol longer than {SYMBOL_SIZE} bytes: {symbol!r}")
+
+    return encoded
+
+
+class TradeRing:
+    # capacity: 담을 수 있는 체결 수 (2의 거듭제곱)
+    # name이 None이면 새 공유 메모리와 락을 만들고, 아니면 다른 프로세스가 만든 공유 메모리에 연결
+    # lock: 다른 프로세스가 만든 링에 연결할 때 그 링의 lock (프로세스 인자로 전달)
+    def __init__(self, capacity: int = TRADE_RING_CAPACITY, name: str = None, lock=None):
+        if capacity & (capacity - 1) != 0:
+            raise ValueError("capacity must be a power of two")
+
+        self.capacity = capacity
+        self.mask = capacity - 1
+
+        self.is_owner = name is None
+        if not self.is_owner and lock is None:
+            raise ValueError("lock of the existing ring is required")
+
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+
+        if self.is_owner:
+            self.shm = SharedMemory(create=True, size=HEADER_SIZE + capacity * TRADE_DTYPE.itemsize)
+
+        else:
+            self.shm = SharedMemory(name=name)
+
+        self.head = np.ndarray((1, ), dtype=np.int64, buffer=self.shm.buf, offset=HEAD_OFFSET)
+        self.tail = np.ndarray((1, ), dtype=np.int64, buffer=self.shm.buf, offset=TAIL_OFFSET)
+        self.done = np.ndarray((1, ), dtype=np.int64, buffer=self.shm.buf, offset=DONE_OFFSET)
+        self.commands = np.ndarray((1, ), dtype=np.int64, buffer=self.shm.buf, offset=COMMANDS_OFFSET)
+        self.commands_done = np.ndarray((1, ), dtype=np.int64, buffer=self.shm.buf, offset=COMMANDS_DONE_OFFSET)
+        self.records = np.ndarray((capacity, ), dtype=TRADE_DTYPE, buffer=self.shm.buf, offset=HEADER_SIZE)
+
+        if self.is_owner:
+            self.head[0] = self.tail[0] = self.done[0] = self.commands[0] = self.commands_done[0] = 0
+
+        # 심볼 바이트열 -> 문자열 (소비자 측 디코딩 캐시)
+        self.symbols = {}
+
+        # 심볼 문자열 -> 바이트열 (생산자 측 인코딩 캐시)
+        self.encoded_symbols = {}
+
+    
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    
+    # 공유 카운터를 락 안에서 읽음
+    def load(self, counter: np.ndarray) -> int:
+        with self.lock:
+            return int(counter[0])
+
+    
+    # 공유 카운터를 락 안에서 갱신 (그 전에 쓴 레코드가 상대 프로세스에 먼저 보이도록)
+    def publish(self, counter: np.ndarray, value: int):
+        with self.lock:
+            counter[0] = value
+
+    
+    # 아직 읽지 않은 체결 수
+    def __len__(self):
+        with self.lock:
+            return int(self.head[0] - self.tail[0])
+
+    
+    def get_encoded_symbol(self, symbol: str) -> bytes:
+        encoded = self.encoded_symbols.get(symbol)
+        if encoded is None:
+            encoded = self.encoded_symbols[symbol] = encode_symbol(symbol)
+
+        return encoded
+
+    
+    # 체결 목록을 가능한 만큼 기록하고 기록한 수를 반환 (생산자 전용)
+    # 심볼이 SYMBOL_SIZE 바이트를 넘는 체결이 있으면 아무것도 기록하지 않고 ValueError
+    def write(self, trades) -> int:
+        head = int(self.head[0])
+        count = min(len(trades), self.capacity - (head - self.load(self.tail)))
+        if count <= 0:
+            return 0
+
+        encode = self.get_encoded_symbol
+        records = np.array([
+            (exchange_id, encode(base_symbol), encode(quote_symbol), price, quantity, timestamp)
+            for exchange_id, base_symbol, quote_symbol, price, quantity, timestamp in trades[:count]
+        ], dtype=TRADE_DTYPE)
+
+        # 링 끝을 넘어가면 두 구간으로 나누어 기록
+        start = head & self.mask
+        first_count = min(count, self.capacity - start)
+        self.records[start:start + first_count] = records[:first_count]
+        self.records[:count - first_count] = records[first_count:]
+
+        self.publish(self.head, head + count)
+
+        return count
+
+    
+    # 체결 목록을 모두 기록 (링이 가득 차면 소비자가 읽을 때까지 기다림)
+    # is_alive: 소비자가 살아 있는지 확인하는 함수 (기다리는 중 False를 반환하면 ConsumerDiedError 발생)
+    def write_all(self, trades, is_alive=None):
+        written_count = self.write(trades)
+
+        while written_count < len(trades):
+            if is_alive is not None and not is_alive():
+                raise ConsumerDiedError()
+
+            time.sleep(FULL_WAIT)
+            written_count += self.write(trades[written_count:])
+
+    
+    # 최대 max_count개의 체결을 읽어 레코드 배열로 반환 (소비자 전용)
+    def read_records(self, max_count: int) -> np.ndarray:
+        tail = int(self.tail[0])
+        count = min(max_count, self.load(self.head) - tail)
+        if count <= 0:
+            return self.records[:0].copy()
+
+        start = tail & self.mask
+        first_count = min(count, self.capacity - start)
+
+        if first_count == count:
+            records = self.records[start:start + count].copy()
+
+        else:
+            records = np.concatenate((self.records[start:], self.records[:count - first_count]))
+
+        self.publish(self.tail, tail + count)
+
+        return records
+
+    
+    # 최대 max_count개의 체결을 읽어 Trade 목록으로 반환 (소비자 전용)
+    def read(self, max_count: int) -> list:
+        symbols = self.symbols
+
+        trades = []
+        for exchange_id, base_symbol, quote_symbol, price, quantity, timestamp in self.read_records(max_count).tolist():
+            base = symbols.get(base_symbol)
+            if base is None:
+                base = symbols[base_symbol] = base_symbol.decode('utf-8')
+
+            quote = symbols.get(quote_symbol)
+            if quote is None:
+                quote = symbols[quote_symbol] = quote_symbol.decode('utf-8')
+
+            trades.append(Trade(exchange_id, base, quote, price, quantity, timestamp))
+
+        return trades
+
+    
+    # 제어 명령을 하나 보냈음을 기록 (생산자 전용)
+    # 소비자는 체결을 읽기 전에 이 수만큼의 제어 명령을 먼저 처리하므로, 명령 뒤에 기록한 체결은 항상 명령이 반영된 뒤에 처리됨
+    def add_command(self):
+        self.commands[0] = self.commands[0] + 1
+
+    
+    # 처리를 마친 제어 명령 수를 기록 (소비자 전용)
+    def mark_commands_done(self, count: int):
+        self.commands_done[0] = count
+
+    
+    # 보낸 제어 명령이 모두 처리될 때까지 기다림 (생산자 측, is_alive는 write_all과 같음)
+    def wait_commands_done(self, poll_interval: float = 0.001, is_alive=None):
+        while int(self.commands_done[0]) < int(self.commands[0]):
+            if is_alive is not None and not is_alive():
+                raise ConsumerDiedError()
+
+            time.sleep(poll_interval)
+
+    
+    # 처리를 마친 체결 수를 기록 (소비자 전용)
+    def mark_done(self, count: int):
+        self.done[0] = self.done[0] + count
+
+    
+    # 기록된 체결이 모두 처리될 때까지 기다림 (생산자 측)
+    # is_alive: write_all과 같음
+    def wait_done(self, poll_interval: float = 0.001, is_alive=None):
+        while int(self.done[0]) < int(self.head[0]):
+            if is_alive is not None and not is_alive():
+                raise ConsumerDiedError()
+
+            time.sleep(poll_interval)
+
+    
+    def close(self):
+        # 공유 메모리를 가리키는 배열을 먼저 해제해야 닫을 수 있음
+        self.head = self.tail = self.done = self.commands = self.commands_done = self.records = None
+        self.shm.close()
+
+        if self.is_owner:
+            self.shm.unlink()
@@ -0,0 +1,123 @@
+# 거래소 실시간 체결 스트림 (웹소켓)
+import asyncio
+import json
+import sys
+import uuid
+
+import websockets
+
+from detector import Trade
+
+
+UPBIT_EXCHANGE_ID = 1
+BINANCE_EXCHANGE_ID = 2
+
+UPBIT_WEBSOCKET_URL = "wss://api.upbit.com/websocket/v1"
+BINANCE_WEBSOCKET_URL = "wss://stream.binance.com:9443/stream"
+
+# 바이낸스는 한 연결에 구독할 수 있는 스트림 수가 제한되어 있으므로 나누어 연결
+BINANCE_STREAMS_PER_CONNECTION = 200
+
+RECONNECT_DELAY = 1.0
+
+
+# 업비트 체결 메시지 -> Trade
+def parse_upbit_trade(message: dict) -> Trade:
+    if message.get('type') != 'trade':
+        return None
+
+    quote_symbol, base_symbol = message['code'].split('-')
+
+    return Trade(
+        UPBIT_EXCHANGE_ID, base_symbol, quote_symbol,
+        float(message['trade_price']), float(message['trade_volume']), message['trade_timestamp']
+    )
+
+
+# 바이낸스 체결 메시지 -> Trade
+# symbol_map: 바이낸스 심볼(예: 'BTCUSDT') -> (기초 자산, 견적 자산)
+def parse_binance_trade(message: dict, symbol_map: dict) -> Trade:
+    data = message.get('data', message)
+    if data.get('e') != 'trade':
+        return None
+
+    base_symbol, quote_symbol = symbol_map[data['s']]
+
+    return Trade(
+        BINANCE_EXCHANGE_ID, base_symbol, quote_symbol,
+        float(data['p']), float(data['q']), data['T']
+    )
+
+
+# 웹소켓에 연결해 받은 체결 메시지를 Trade로 변환해 on_trade에 전달
+# 연결이 끊어지거나 연결/핸드셰이크에 실패하면 (거래소 점검 중의 HTTP 오류 응답 등) RECONNECT_DELAY초 후 다시 연결
+# 형식이 잘못된 메시지는 기록만 하고 건너뜀
+async def stream_trades(url: str, subscribe_message, parse, on_trade):
+    while True:
+        try:
+            async with websockets.connect(url, ping_interval=20) as websocket:
+                if subscribe_message is not None:
+                    await websocket.send(json.dumps(subscribe_message))
+
+                async for message in websocket:
+                    try:
+                        trade = parse(json.loads(message))
+
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
+                        print(f"{url}: skipping malformed message ({e!r}): {message[:200]!r}", file=sys.stderr)
+                        continue
+
+                    if trade is not None:
+                        on_trade(trade)
+
+        except (websockets.WebSocketException, OSError) as e:
+            print(f"{url}: connection failed ({e}), reconnecting in {RECONNECT_DELAY:g}s", file=sys.stderr)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+# 업비트 체결 스트림 구독
+# markets: (기초 자산, 견적 자산) 목록
+async def stream_upbit_trades(markets, on_trade):
+    subscribe_message = [
+        {'ticket': str(uuid.uuid4())},
+        {'type': 'trade', 'codes': [f"{quote_symbol}-{base_symbol}" for base_symbol, quote_symbol in markets]}
+    ]
+
+    await stream_trades(UPBIT_WEBSOCKET_URL, subscribe_message, parse_upbit_trade, on_trade)
+
+
+# 바이낸스 체결 스트림 구독
+# markets: (기초 자산, 견적 자산) 목록
+async def stream_binance_trades(markets, on_trade):
+    symbol_map = {f"{base_symbol}{quote_symbol}": (base_symbol, quote_symbol) for base_symbol, quote_symbol in markets}
+    stream_names = [f"{symbol.lower()}@trade" for symbol in symbol_map.keys()]
+
+    parse = lambda message: parse_binance_trade(message, symbol_map)
+
+    tasks = []
+    for start in range(0, len(stream_names), BINANCE_STREAMS_PER_CONNECTION):
+        streams = '/'.join(stream_names[start:start + BINANCE_STREAMS_PER_CONNECTION])
+        tasks.append(stream_trades(f"{BINANCE_WEBSOCKET_URL}?streams={streams}", None, parse, on_trade))
+
+    await asyncio.gather(*tasks)
+
+
+# 거래소 ID -> 체결 스트림 구독 함수
+trade_streams = {
+    UPBIT_EXCHANGE_ID: stream_upbit_trades,
+    BINANCE_EXCHANGE_ID: stream_binance_trades
+}
+
+
+# 체결 정보를 JSON Lines 파일로 기록 (replay.py로 재생 가능)
+class TradeRecorder:
+    def __init__(self, file_path: str):
+        self.file = open(file_path, 'a')
+
+    
+    def __call__(self, trade: Trade):
+        self.file.write(json.dumps(trade._asdict()) + '\n')
+
+    
+    def close(self):
+        self.file.close()